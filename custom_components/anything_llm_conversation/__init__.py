@@ -13,6 +13,7 @@ from homeassistant.helpers import (
     device_registry as dr,
     entity_registry as er,
 )
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
 
 from .const import (
@@ -25,11 +26,22 @@ from .const import (
     CONF_ENABLE_HEALTH_CHECK,
     CONF_HEALTH_CHECK_TIMEOUT,
     CONF_CHAT_TIMEOUT,
+    CONF_DEEP_PROBE_WORKSPACE,
+    CONF_LOAD_BALANCING,
+    CONF_ROUTING_AFFINITY,
+    CONF_WORKSPACE_MAP,
     DEFAULT_ENABLE_HEALTH_CHECK,
     DEFAULT_HEALTH_CHECK_TIMEOUT,
     DEFAULT_CHAT_TIMEOUT,
+    DEFAULT_LOAD_BALANCING,
+    DEFAULT_ROUTING_AFFINITY,
+    DEFAULT_WORKSPACE_MAP,
     DOMAIN,
+    HEALTH_STORAGE_VERSION,
+    RESPONSE_CACHE_STORAGE_VERSION,
 )
+from .command_router import parse_workspace_aliases
+from .entity_tracker import async_get_entity_tracker
 from .helpers import AnythingLLMClient, get_anythingllm_client
 from .services import async_setup_services
 
@@ -66,6 +78,20 @@ async def async_setup_entry(
             enable_health_check=entry.data.get(CONF_ENABLE_HEALTH_CHECK, DEFAULT_ENABLE_HEALTH_CHECK),
             health_check_timeout=float(entry.data.get(CONF_HEALTH_CHECK_TIMEOUT, DEFAULT_HEALTH_CHECK_TIMEOUT)),
             chat_timeout=float(entry.data.get(CONF_CHAT_TIMEOUT, DEFAULT_CHAT_TIMEOUT)),
+            deep_probe_workspace=entry.data.get(CONF_DEEP_PROBE_WORKSPACE),
+            endpoints=[
+                (
+                    subentry.subentry_id,
+                    subentry.title,
+                    subentry.data[CONF_BASE_URL],
+                    subentry.data[CONF_API_KEY],
+                    parse_workspace_aliases(subentry.data.get(CONF_WORKSPACE_MAP, DEFAULT_WORKSPACE_MAP)),
+                )
+                for subentry in entry.subentries.values()
+                if subentry.subentry_type == "endpoint"
+            ],
+            load_balancing=entry.data.get(CONF_LOAD_BALANCING, DEFAULT_LOAD_BALANCING),
+            routing_affinity=entry.data.get(CONF_ROUTING_AFFINITY, DEFAULT_ROUTING_AFFINITY),
         )
     except Exception as err:
         _LOGGER.error("Failed to connect to AnythingLLM: %s", err)
@@ -73,9 +99,23 @@ async def async_setup_entry(
 
     entry.runtime_data = client
 
+    # Disk tier of the response cache lives in .storage and survives restarts.
+    await client.response_cache.async_attach_store(_response_cache_store(hass, entry))
+
+    # All agents on this hass read one event-driven exposed-entity snapshot.
+    tracker = async_get_entity_tracker(hass)
+    tracker.async_acquire()
+    entry.async_on_unload(tracker.async_release)
+
+    # Start from the last known endpoint health so a primary that was down
+    # before a restart is not tried first.
+    await client.async_attach_health_store(_health_store(hass, entry))
+
     # Start the background health monitor so it never blocks a voice request.
+    # Its first cycle probes every endpoint concurrently, right away.
     client.start_health_monitor()
     entry.async_on_unload(client.stop_health_monitor)
+    entry.async_on_unload(client.stop_keep_warm)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(update_listener))
@@ -87,6 +127,31 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the persisted response cache and health when the entry is removed."""
+    await _response_cache_store(hass, entry).async_remove()
+    await _health_store(hass, entry).async_remove()
+
+
+def _response_cache_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    """Return the Store backing the disk tier of the response cache."""
+    return Store(
+        hass,
+        RESPONSE_CACHE_STORAGE_VERSION,
+        f"{DOMAIN}.response_cache_{entry.entry_id}",
+        private=True,
+    )
+
+
+def _health_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    """Return the Store holding the last known endpoint health."""
+    return Store(
+        hass,
+        HEALTH_STORAGE_VERSION,
+        f"{DOMAIN}.health_{entry.entry_id}",
+    )
+
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
     await hass.config_entries.async_reload(entry.entry_id)
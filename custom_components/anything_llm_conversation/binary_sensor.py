@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+import re
 
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
@@ -26,21 +27,39 @@ async def async_setup_entry(
     entry: AnythingLLMConfigEntry,
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
-    """Set up the AnythingLLM connectivity sensor for a config entry."""
-    async_add_entities([AnythingLLMConnectivitySensor(entry)])
+    """Set up the AnythingLLM connectivity sensors for a config entry."""
+    sensors = [AnythingLLMConnectivitySensor(entry)]
+    if "failover" in entry.runtime_data.endpoint_health:
+        sensors.append(AnythingLLMConnectivitySensor(entry, "failover"))
+    async_add_entities(sensors)
+    # Pool endpoints are named after their subentry and removed with it.
+    for subentry in entry.subentries.values():
+        if subentry.subentry_id in entry.runtime_data.endpoint_health:
+            async_add_entities(
+                [AnythingLLMConnectivitySensor(entry, subentry.subentry_id)],
+                config_subentry_id=subentry.subentry_id,
+            )
 
 
 class AnythingLLMConnectivitySensor(BinarySensorEntity):
-    """Binary sensor showing whether the AnythingLLM primary endpoint is reachable."""
+    """Binary sensor showing whether an AnythingLLM endpoint is reachable."""
 
     _attr_has_entity_name = True
-    _attr_name = "Connectivity"
     _attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
 
-    def __init__(self, entry: AnythingLLMConfigEntry) -> None:
-        """Initialize the sensor."""
+    def __init__(self, entry: AnythingLLMConfigEntry, endpoint: str = "primary") -> None:
+        """Initialize the sensor for "primary", "failover" or a pool endpoint."""
         self._entry = entry
-        self._attr_unique_id = f"{entry.entry_id}_connectivity"
+        self._endpoint = endpoint
+        if endpoint == "primary":
+            self._attr_name = "Connectivity"
+            self._attr_unique_id = f"{entry.entry_id}_connectivity"
+        elif endpoint == "failover":
+            self._attr_name = f"{endpoint.capitalize()} connectivity"
+            self._attr_unique_id = f"{entry.entry_id}_{endpoint}_connectivity"
+        else:
+            self._attr_name = f"{entry.runtime_data.endpoint_titles[endpoint]} connectivity"
+            self._attr_unique_id = f"{entry.entry_id}_{endpoint}_connectivity"
         self._attr_device_info = dr.DeviceInfo(
             identifiers={(DOMAIN, entry.entry_id)},
             name="AnythingLLM Server",
@@ -50,8 +69,45 @@ class AnythingLLMConnectivitySensor(BinarySensorEntity):
 
     @property
     def is_on(self) -> bool | None:
-        """Return True when the primary endpoint is reachable."""
-        return self._entry.runtime_data._primary_healthy
+        """Return True when the endpoint is reachable."""
+        return self._entry.runtime_data.endpoint_health.get(self._endpoint)
+
+    def _shows(self, name: str) -> bool:
+        """Return True if attributes of endpoint name belong on this sensor."""
+        # The primary sensor has always shown the failover's attributes too.
+        if self._endpoint == "primary":
+            return name in ("primary", "failover")
+        return name == self._endpoint
+
+    def _prefix(self, name: str) -> str:
+        """Return the attribute prefix of endpoint name, e.g. "failover" or "node_3"."""
+        if name in ("primary", "failover"):
+            return name
+        title = self._entry.runtime_data.endpoint_titles[name]
+        return re.sub(r"[^a-z0-9]+", "_", title.lower()).strip("_") or "endpoint"
+
+    @property
+    def extra_state_attributes(self) -> dict[str, str | float | bool | None]:
+        """Expose circuit breaker state, latencies, degradation and brownout."""
+        client = self._entry.runtime_data
+        attributes: dict[str, str | float | bool | None] = {
+            f"{self._prefix(name)}_circuit": state
+            for name, state in client.breaker_states.items()
+            if self._shows(name)
+        }
+        for name, p95 in client.latency_p95.items():
+            if self._shows(name):
+                attributes[f"{self._prefix(name)}_latency_p95"] = round(p95, 2) if p95 is not None else None
+        for name, seconds in client.probe_latency.items():
+            if self._shows(name):
+                attributes[f"{self._prefix(name)}_probe_latency"] = round(seconds, 3) if seconds is not None else None
+        for name, degraded in client.endpoint_degraded.items():
+            if self._shows(name):
+                attributes[f"{self._prefix(name)}_degraded"] = degraded
+        for name, brownout in client.endpoint_brownout.items():
+            if self._shows(name):
+                attributes[f"{self._prefix(name)}_brownout"] = brownout
+        return attributes
 
     async def async_added_to_hass(self) -> None:
         """Register health callback so the sensor updates immediately on change."""
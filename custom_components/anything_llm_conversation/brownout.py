@@ -0,0 +1,160 @@
+"""Per-workspace latency SLOs and latency brownout detection per endpoint."""
+
+import time
+from collections import deque
+from typing import Callable
+
+BROWNOUT_WINDOW = 300.0  # seconds a latency sample counts
+BROWNOUT_MIN_SAMPLES = 5
+# Median latency, as a multiple of the workspace SLO, above which an endpoint
+# browns out and below which it recovers. The gap is the hysteresis band.
+BROWNOUT_ENTER_RATIO = 1.0
+BROWNOUT_EXIT_RATIO = 0.8
+BROWNOUT_HOLD = 60.0  # seconds a condition must hold before the state flips
+_MAX_SAMPLES = 50
+
+# SLO key that applies to every workspace without its own entry.
+SLO_WILDCARD = "*"
+
+
+def parse_latency_slos(text: str) -> dict[str, float]:
+    """Parse latency SLOs written as "slug=seconds, *=seconds".
+
+    Malformed, empty or non-positive entries are skipped.
+    """
+    slos = {}
+    for entry in text.split(","):
+        slug, sep, seconds = entry.partition("=")
+        slug = slug.strip().lower()
+        try:
+            value = float(seconds)
+        except ValueError:
+            continue
+        if sep and slug and value > 0:
+            slos[slug] = value
+    return slos
+
+
+class LatencySLOs:
+    """Latency SLOs registered by each agent, merged per workspace.
+
+    When agents disagree about a workspace, the strictest SLO wins.
+    """
+
+    def __init__(self) -> None:
+        """Initialize without SLOs."""
+        self._owners: dict[str, dict[str, float]] = {}
+        self._merged: dict[str, float] = {}
+
+    @property
+    def active(self) -> bool:
+        """Return True if any workspace has an SLO."""
+        return bool(self._merged)
+
+    def set(self, owner: str, slos: dict[str, float]) -> None:
+        """Register (or replace) the SLOs of one agent."""
+        if slos:
+            self._owners[owner] = dict(slos)
+        else:
+            self._owners.pop(owner, None)
+        merged: dict[str, float] = {}
+        for owner_slos in self._owners.values():
+            for slug, seconds in owner_slos.items():
+                merged[slug] = min(seconds, merged.get(slug, seconds))
+        self._merged = merged
+
+    def remove(self, owner: str) -> None:
+        """Forget the SLOs of one agent."""
+        self.set(owner, {})
+
+    def get(self, slug: str | None) -> float | None:
+        """Return the SLO in seconds for slug, or None if it has none."""
+        if slug in self._merged:
+            return self._merged[slug]
+        return self._merged.get(SLO_WILDCARD)
+
+    @property
+    def stats(self) -> dict[str, float]:
+        """Return the merged SLO per workspace."""
+        return dict(sorted(self._merged.items()))
+
+
+class BrownoutDetector:
+    """Detect an endpoint that answers, but too slowly.
+
+    Each sample is a latency divided by the SLO of its workspace, so
+    workspaces with different SLOs share one window. The endpoint enters
+    brownout once the median of the last window seconds has stayed above
+    enter_ratio for hold seconds, and leaves it once the median has stayed
+    below exit_ratio, or there have been too few samples to judge, for hold
+    seconds. Without fresh samples an endpoint in brownout is therefore
+    given another chance once its old samples have aged out.
+    """
+
+    def __init__(
+        self,
+        window: float = BROWNOUT_WINDOW,
+        min_samples: int = BROWNOUT_MIN_SAMPLES,
+        enter_ratio: float = BROWNOUT_ENTER_RATIO,
+        exit_ratio: float = BROWNOUT_EXIT_RATIO,
+        hold: float = BROWNOUT_HOLD,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize outside brownout with an empty window."""
+        self.window = window
+        self.min_samples = min_samples
+        self.enter_ratio = enter_ratio
+        self.exit_ratio = exit_ratio
+        self.hold = hold
+        self._clock = clock
+        self._samples: deque[tuple[float, float]] = deque(maxlen=_MAX_SAMPLES)
+        self._pending_since: float | None = None
+        self.active = False
+        self.brownouts = 0
+
+    def record(self, seconds: float, slo: float) -> bool:
+        """Add a latency sample for a workspace with the given SLO."""
+        self._samples.append((self._clock(), seconds / slo))
+        return self.update()
+
+    @property
+    def score(self) -> float | None:
+        """Return the median latency/SLO ratio, or None with too few samples."""
+        cutoff = self._clock() - self.window
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        if len(self._samples) < self.min_samples:
+            return None
+        ratios = sorted(ratio for _at, ratio in self._samples)
+        return ratios[(len(ratios) - 1) // 2]
+
+    def update(self) -> bool:
+        """Re-evaluate the brownout state and return it."""
+        score = self.score
+        if self.active:
+            flip = score is None or score < self.exit_ratio
+        else:
+            flip = score is not None and score > self.enter_ratio
+        if not flip:
+            self._pending_since = None
+            return self.active
+        now = self._clock()
+        if self._pending_since is None:
+            self._pending_since = now
+        if now - self._pending_since >= self.hold:
+            self.active = not self.active
+            self._pending_since = None
+            if self.active:
+                self.brownouts += 1
+        return self.active
+
+    @property
+    def stats(self) -> dict:
+        """Return the brownout state, median ratio and sample count."""
+        score = self.score
+        return {
+            "brownout": self.active,
+            "score": None if score is None else round(score, 2),
+            "samples": len(self._samples),
+            "brownouts": self.brownouts,
+        }
@@ -0,0 +1,209 @@
+"""Single-pass local router for workspace and mode commands."""
+
+import re
+
+COMMAND_WORKSPACE_QUERY = "workspace_query"
+COMMAND_WORKSPACE_SWITCH = "workspace_switch"
+COMMAND_MODE_QUERY = "mode_query"
+COMMAND_AFFIRMATIVE = "affirmative"
+COMMAND_PASS_THROUGH = "pass_through"
+
+# Affirmative replies that confirm a pending mode suggestion.
+AFFIRMATIVE_PHRASES = (
+    r"yes", r"yeah", r"yep", r"sure", r"ok(?:ay)?", r"please", r"go\s+ahead",
+    r"absolutely", r"of\s+course", r"do\s+it", r"sounds?\s+good",
+)
+
+_RE_UNSAFE_SLUG = re.compile(r"[^a-z0-9_-]")
+_RE_HYPHENS = re.compile(r"-+")
+
+
+def _alternation(phrases) -> str:
+    """Return a longest-first regex alternation of literal phrases."""
+    return "|".join(re.escape(p) for p in sorted(set(phrases), key=len, reverse=True))
+
+
+def sanitize_workspace_slug(name: str) -> str:
+    """Turn a spoken workspace name into a URL-safe slug.
+
+    Everything that is not a letter, digit, underscore or hyphen becomes a
+    hyphen (this also prevents path traversal via the slug interpolated into
+    the URL); repeated hyphens collapse and leading/trailing ones are dropped,
+    so trailing punctuation from voice input ("finance.") disappears.
+    """
+    slug = _RE_UNSAFE_SLUG.sub("-", name.strip().lower())
+    return _RE_HYPHENS.sub("-", slug).strip("-")
+
+
+def parse_workspace_aliases(text: str) -> dict[str, str]:
+    """Parse user aliases written as "spoken name=slug, other=slug".
+
+    Both sides are sanitized like a spoken workspace name, so "home office"
+    becomes "home-office". Malformed or empty entries are skipped.
+    """
+    aliases = {}
+    for entry in text.split(","):
+        alias, sep, slug = entry.partition("=")
+        alias = sanitize_workspace_slug(alias)
+        slug = sanitize_workspace_slug(slug)
+        if sep and alias and slug:
+            aliases[alias] = slug
+    return aliases
+
+
+class AliasTrie:
+    """Longest whole-token alias lookup over hyphen-separated slugs.
+
+    Aliases are split on hyphens into a token trie, so "code-review" is two
+    tokens. resolve() walks the trie from each token of the slug and keeps
+    the longest alias (in characters) that ends on a token boundary; ties go
+    to the leftmost one. An exact alias is simply the longest possible match.
+    """
+
+    _SLUG = object()
+
+    def __init__(self, aliases: dict[str, str]) -> None:
+        """Build the trie from {alias: slug}."""
+        self._root: dict = {}
+        for alias, slug in aliases.items():
+            node = self._root
+            for token in alias.split("-"):
+                node = node.setdefault(token, {})
+            node[self._SLUG] = (len(alias), slug)
+        self._size = len(aliases)
+
+    def __len__(self) -> int:
+        """Return the number of aliases."""
+        return self._size
+
+    def resolve(self, slug: str) -> str | None:
+        """Return the target of the longest alias in slug, or None."""
+        tokens = slug.split("-")
+        best = None
+        for start in range(len(tokens)):
+            node = self._root
+            for token in tokens[start:]:
+                node = node.get(token)
+                if node is None:
+                    break
+                match = node.get(self._SLUG)
+                if match is not None and (best is None or match[0] > best[0]):
+                    best = match
+        return best[1] if best else None
+
+
+class CommandDecision:
+    """Routing decision for one utterance."""
+
+    __slots__ = ("kind", "workspace")
+
+    def __init__(self, kind: str, workspace: str | None = None) -> None:
+        """Initialize the decision.
+
+        Args:
+            kind: One of the COMMAND_* constants
+            workspace: Target slug for COMMAND_WORKSPACE_SWITCH ("" if the
+                requested name sanitized to nothing)
+        """
+        self.kind = kind
+        self.workspace = workspace
+
+    def __eq__(self, other: object) -> bool:
+        """Compare by kind and workspace."""
+        if not isinstance(other, CommandDecision):
+            return NotImplemented
+        return (self.kind, self.workspace) == (other.kind, other.workspace)
+
+    def __repr__(self) -> str:
+        """Return a debug representation."""
+        return f"CommandDecision({self.kind!r}, {self.workspace!r})"
+
+
+class CommandRouter:
+    """Classify an utterance as a local command or a pass-through to the LLM.
+
+    The utterance is normalized once and matched against a single compiled
+    regex whose alternatives are ordered by precedence:
+
+    1. workspace query   "!workspace", "what/which workspace ...", "current ... workspace"
+    2. workspace switch  "!workspace <name>", "switch to/use <name> workspace",
+                         "change/switch workspace to <name>", the same four
+                         forms with "mode", and "... <mode keyword>" ending in "mode"
+    3. mode query        "what mode", "current workspace", ... anywhere in the text
+    4. affirmative       "yes", "sure", "go ahead", ...
+
+    Adding a phrasing adds an alternative to the same regex, not another
+    pass. Switch targets are sanitized and mapped through the spoken aliases;
+    build a new router when the alias table changes.
+    """
+
+    def __init__(
+        self,
+        aliases: dict[str, str],
+        mode_keywords: dict[str, list[str]],
+        mode_to_workspace: dict[str, str],
+        mode_query_keywords: list[str],
+    ) -> None:
+        """Compile the router from the alias and keyword tables."""
+        self._aliases = AliasTrie(aliases)
+        self._keyword_workspace: dict[str, str] = {}
+        for mode_key, keywords in mode_keywords.items():
+            for keyword in keywords:
+                self._keyword_workspace.setdefault(
+                    keyword, mode_to_workspace.get(mode_key, mode_key)
+                )
+        mode_query = _alternation(mode_query_keywords)
+        self._re_mode_query = re.compile(mode_query)
+        self._re = re.compile(
+            r"^(?:"
+            r"(?P<workspace_query>!workspace$|what workspace|which workspace|current(?=.*workspace))"
+            r"|!workspace (?P<bang>.*)"
+            r"|(?:switch to|use)(?=.* workspace) (?P<named_workspace>.*)"
+            r"|(?:change|switch) (?:workspace|mode) to (?P<to>.*)"
+            r"|(?:switch to|use)(?=.* mode) (?P<named_mode>.*)"
+            r"|(?=.*mode$).*(?P<mode_keyword>" + _alternation(self._keyword_workspace) + r")"
+            r"|.*?(?P<mode_query>" + mode_query + r")"
+            r"|(?P<affirmative>(?:" + "|".join(AFFIRMATIVE_PHRASES) + r")\s*[.!]?$)"
+            r")",
+            re.DOTALL,
+        )
+
+    def route(self, text: str) -> CommandDecision:
+        """Return the decision for one utterance."""
+        text_lower = text.lower().strip()
+        match = self._re.match(text_lower)
+        if match is None:
+            return CommandDecision(COMMAND_PASS_THROUGH)
+
+        group = match.lastgroup
+        if group == "workspace_query":
+            return CommandDecision(COMMAND_WORKSPACE_QUERY)
+        if group == "mode_query":
+            return CommandDecision(COMMAND_MODE_QUERY)
+        if group == "affirmative":
+            return CommandDecision(COMMAND_AFFIRMATIVE)
+        if group == "mode_keyword":
+            # The last keyword wins: "switch from guest mode to analysis mode".
+            name = self._keyword_workspace[match.group(group)]
+        else:
+            name = match.group(group)
+            if group == "named_workspace":
+                name = name.replace(" workspace", "")
+            elif group == "named_mode":
+                name = name.replace(" mode", "")
+            name = name.strip()
+            if not name:
+                # "use  mode" names nothing to switch to.
+                if self._re_mode_query.search(text_lower):
+                    return CommandDecision(COMMAND_MODE_QUERY)
+                return CommandDecision(COMMAND_PASS_THROUGH)
+        return CommandDecision(COMMAND_WORKSPACE_SWITCH, self.resolve_workspace(name))
+
+    def resolve_workspace(self, name: str) -> str:
+        """Sanitize a requested workspace name and map spoken aliases to slugs.
+
+        The longest alias among the slug's tokens wins, e.g. "the-analysis"
+        from "switch to the analysis workspace" resolves to "analysis".
+        """
+        slug = sanitize_workspace_slug(name)
+        return self._aliases.resolve(slug) or slug
@@ -5,6 +5,7 @@ from __future__ import annotations
 import logging
 import re
 import types
+from collections.abc import Mapping
 from typing import Any
 
 import voluptuous as vol
@@ -46,10 +47,31 @@ from .const import (
     CONF_ENABLE_AGENT_PREFIX,
     CONF_AGENT_KEYWORDS,
     CONF_ENABLE_HEALTH_CHECK,
+    CONF_ENABLE_STREAMING,
+    CONF_RESPONSE_CACHE_WORKSPACES,
+    CONF_RESPONSE_CACHE_TTL,
+    CONF_RESPONSE_CACHE_PERSIST,
+    CONF_WORKSPACE_ALIASES,
+    CONF_ENABLE_LOCAL_ANSWERS,
+    CONF_ENABLE_LOCAL_INTENTS,
+    CONF_KEEP_WARM_WORKSPACES,
+    CONF_KEEP_WARM_HOURS,
+    CONF_LATENCY_SLOS,
     CONF_HEALTH_CHECK_TIMEOUT,
     DEFAULT_HEALTH_CHECK_TIMEOUT,
     CONF_CHAT_TIMEOUT,
     DEFAULT_CHAT_TIMEOUT,
+    CONF_DEEP_PROBE_WORKSPACE,
+    DEFAULT_DEEP_PROBE_WORKSPACE,
+    CONF_LOAD_BALANCING,
+    DEFAULT_LOAD_BALANCING,
+    CONF_ROUTING_AFFINITY,
+    DEFAULT_ROUTING_AFFINITY,
+    ROUTING_AFFINITY_CONVERSATION,
+    ROUTING_AFFINITY_OFF,
+    ROUTING_AFFINITY_WORKSPACE,
+    CONF_WORKSPACE_MAP,
+    DEFAULT_WORKSPACE_MAP,
     DEFAULT_ATTACH_USERNAME,
     DEFAULT_WORKSPACE_SLUG,
     DEFAULT_CONF_BASE_URL,
@@ -64,12 +86,30 @@ from .const import (
     DEFAULT_ENABLE_AGENT_PREFIX,
     DEFAULT_AGENT_KEYWORDS,
     DEFAULT_ENABLE_HEALTH_CHECK,
+    DEFAULT_ENABLE_STREAMING,
+    DEFAULT_RESPONSE_CACHE_WORKSPACES,
+    DEFAULT_RESPONSE_CACHE_TTL,
+    DEFAULT_RESPONSE_CACHE_PERSIST,
+    DEFAULT_WORKSPACE_ALIASES,
+    DEFAULT_ENABLE_LOCAL_ANSWERS,
+    DEFAULT_ENABLE_LOCAL_INTENTS,
+    DEFAULT_KEEP_WARM_WORKSPACES,
+    DEFAULT_KEEP_WARM_HOURS,
+    DEFAULT_LATENCY_SLOS,
     DOMAIN,
 )
 from .helpers import get_anythingllm_client
 
 _LOGGER = logging.getLogger(__name__)
 
+ROUTING_AFFINITY_SELECTOR = SelectSelector(
+    SelectSelectorConfig(
+        options=[ROUTING_AFFINITY_OFF, ROUTING_AFFINITY_CONVERSATION, ROUTING_AFFINITY_WORKSPACE],
+        mode=SelectSelectorMode.DROPDOWN,
+        translation_key=CONF_ROUTING_AFFINITY,
+    )
+)
+
 
 def _sanitize_slug(value: str) -> str:
     """Sanitize a workspace or thread slug for safe URL interpolation."""
@@ -99,6 +139,21 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
             default=DEFAULT_CHAT_TIMEOUT,
             description="Chat completion timeout (seconds)"
         ): NumberSelector(NumberSelectorConfig(min=5, max=600, step=1)),
+        vol.Optional(
+            CONF_DEEP_PROBE_WORKSPACE,
+            default=DEFAULT_DEEP_PROBE_WORKSPACE,
+            description="Canary workspace slug for deep health probes (empty disables them)"
+        ): str,
+        vol.Optional(
+            CONF_LOAD_BALANCING,
+            default=DEFAULT_LOAD_BALANCING,
+            description="Balance requests across all endpoints"
+        ): bool,
+        vol.Optional(
+            CONF_ROUTING_AFFINITY,
+            default=DEFAULT_ROUTING_AFFINITY,
+            description="Keep conversations on one endpoint"
+        ): ROUTING_AFFINITY_SELECTOR,
     }
 )
 
@@ -117,6 +172,16 @@ DEFAULT_OPTIONS = types.MappingProxyType(
         CONF_ENABLE_HEALTH_CHECK: DEFAULT_ENABLE_HEALTH_CHECK,
         CONF_HEALTH_CHECK_TIMEOUT: DEFAULT_HEALTH_CHECK_TIMEOUT,
         CONF_CHAT_TIMEOUT: DEFAULT_CHAT_TIMEOUT,
+        CONF_ENABLE_STREAMING: DEFAULT_ENABLE_STREAMING,
+        CONF_RESPONSE_CACHE_WORKSPACES: DEFAULT_RESPONSE_CACHE_WORKSPACES,
+        CONF_RESPONSE_CACHE_TTL: DEFAULT_RESPONSE_CACHE_TTL,
+        CONF_RESPONSE_CACHE_PERSIST: DEFAULT_RESPONSE_CACHE_PERSIST,
+        CONF_WORKSPACE_ALIASES: DEFAULT_WORKSPACE_ALIASES,
+        CONF_ENABLE_LOCAL_ANSWERS: DEFAULT_ENABLE_LOCAL_ANSWERS,
+        CONF_ENABLE_LOCAL_INTENTS: DEFAULT_ENABLE_LOCAL_INTENTS,
+        CONF_KEEP_WARM_WORKSPACES: DEFAULT_KEEP_WARM_WORKSPACES,
+        CONF_KEEP_WARM_HOURS: DEFAULT_KEEP_WARM_HOURS,
+        CONF_LATENCY_SLOS: DEFAULT_LATENCY_SLOS,
     }
 )
 
@@ -184,6 +249,7 @@ class ConfigFlowHandler(ConfigFlow, domain=DOMAIN):
                     **user_input,
                     CONF_HEALTH_CHECK_TIMEOUT: float(user_input.get(CONF_HEALTH_CHECK_TIMEOUT, DEFAULT_HEALTH_CHECK_TIMEOUT)),
                     CONF_CHAT_TIMEOUT: float(user_input.get(CONF_CHAT_TIMEOUT, DEFAULT_CHAT_TIMEOUT)),
+                    CONF_DEEP_PROBE_WORKSPACE: _sanitize_slug(user_input.get(CONF_DEEP_PROBE_WORKSPACE, DEFAULT_DEEP_PROBE_WORKSPACE)),
                 },
                 subentries=[
                     {
@@ -219,7 +285,10 @@ class ConfigFlowHandler(ConfigFlow, domain=DOMAIN):
             else:
                 return self.async_update_reload_and_abort(
                     entry,
-                    data=user_input,
+                    data={
+                        **user_input,
+                        CONF_DEEP_PROBE_WORKSPACE: _sanitize_slug(user_input.get(CONF_DEEP_PROBE_WORKSPACE, DEFAULT_DEEP_PROBE_WORKSPACE)),
+                    },
                 )
             
             # Show form again with errors
@@ -231,6 +300,9 @@ class ConfigFlowHandler(ConfigFlow, domain=DOMAIN):
                     vol.Optional(CONF_FAILOVER_API_KEY, default=user_input.get(CONF_FAILOVER_API_KEY, "")): str,
                     vol.Optional(CONF_FAILOVER_BASE_URL, default=user_input.get(CONF_FAILOVER_BASE_URL, "")): str,
                     vol.Optional(CONF_FAILOVER_WORKSPACE_SLUG, default=user_input.get(CONF_FAILOVER_WORKSPACE_SLUG, "")): str,
+                    vol.Optional(CONF_DEEP_PROBE_WORKSPACE, default=user_input.get(CONF_DEEP_PROBE_WORKSPACE, DEFAULT_DEEP_PROBE_WORKSPACE)): str,
+                    vol.Optional(CONF_LOAD_BALANCING, default=user_input.get(CONF_LOAD_BALANCING, DEFAULT_LOAD_BALANCING)): BooleanSelector(),
+                    vol.Optional(CONF_ROUTING_AFFINITY, default=user_input.get(CONF_ROUTING_AFFINITY, DEFAULT_ROUTING_AFFINITY)): ROUTING_AFFINITY_SELECTOR,
                 }
             )
             return self.async_show_form(
@@ -249,6 +321,9 @@ class ConfigFlowHandler(ConfigFlow, domain=DOMAIN):
                 vol.Optional(CONF_FAILOVER_BASE_URL, default=entry.data.get(CONF_FAILOVER_BASE_URL, "")): str,
                 vol.Optional(CONF_FAILOVER_WORKSPACE_SLUG, default=entry.data.get(CONF_FAILOVER_WORKSPACE_SLUG, "")): str,
                 vol.Optional(CONF_ENABLE_HEALTH_CHECK, default=entry.data.get(CONF_ENABLE_HEALTH_CHECK, DEFAULT_ENABLE_HEALTH_CHECK)): BooleanSelector(),
+                vol.Optional(CONF_DEEP_PROBE_WORKSPACE, default=entry.data.get(CONF_DEEP_PROBE_WORKSPACE, DEFAULT_DEEP_PROBE_WORKSPACE)): str,
+                vol.Optional(CONF_LOAD_BALANCING, default=entry.data.get(CONF_LOAD_BALANCING, DEFAULT_LOAD_BALANCING)): BooleanSelector(),
+                vol.Optional(CONF_ROUTING_AFFINITY, default=entry.data.get(CONF_ROUTING_AFFINITY, DEFAULT_ROUTING_AFFINITY)): ROUTING_AFFINITY_SELECTOR,
             }
         )
         return self.async_show_form(
@@ -262,7 +337,10 @@ class ConfigFlowHandler(ConfigFlow, domain=DOMAIN):
         cls, config_entry: ConfigEntry
     ) -> dict[str, type[ConfigSubentryFlow]]:
         """Return subentries supported by this integration."""
-        return {"conversation": AnythingLLMSubentryFlowHandler}
+        return {
+            "conversation": AnythingLLMSubentryFlowHandler,
+            "endpoint": EndpointSubentryFlowHandler,
+        }
 
 
 class AnythingLLMSubentryFlowHandler(ConfigSubentryFlow):
@@ -399,4 +477,113 @@ class AnythingLLMSubentryFlowHandler(ConfigSubentryFlow):
                 description={"suggested_value": options.get(CONF_ENABLE_HEALTH_CHECK)},
                 default=options.get(CONF_ENABLE_HEALTH_CHECK, entry.data.get(CONF_ENABLE_HEALTH_CHECK, DEFAULT_ENABLE_HEALTH_CHECK)),
             ): BooleanSelector(),
+            vol.Optional(
+                CONF_ENABLE_STREAMING,
+                description={"suggested_value": options.get(CONF_ENABLE_STREAMING)},
+                default=options.get(CONF_ENABLE_STREAMING, DEFAULT_ENABLE_STREAMING),
+            ): BooleanSelector(),
+            vol.Optional(
+                CONF_RESPONSE_CACHE_WORKSPACES,
+                description={"suggested_value": options.get(CONF_RESPONSE_CACHE_WORKSPACES)},
+                default=options.get(CONF_RESPONSE_CACHE_WORKSPACES, DEFAULT_RESPONSE_CACHE_WORKSPACES),
+            ): str,
+            vol.Optional(
+                CONF_RESPONSE_CACHE_TTL,
+                description={"suggested_value": options.get(CONF_RESPONSE_CACHE_TTL)},
+                default=options.get(CONF_RESPONSE_CACHE_TTL, DEFAULT_RESPONSE_CACHE_TTL),
+            ): NumberSelector(NumberSelectorConfig(min=60, max=604800, step=60)),
+            vol.Optional(
+                CONF_RESPONSE_CACHE_PERSIST,
+                description={"suggested_value": options.get(CONF_RESPONSE_CACHE_PERSIST)},
+                default=options.get(CONF_RESPONSE_CACHE_PERSIST, DEFAULT_RESPONSE_CACHE_PERSIST),
+            ): BooleanSelector(),
+            vol.Optional(
+                CONF_WORKSPACE_ALIASES,
+                description={"suggested_value": options.get(CONF_WORKSPACE_ALIASES)},
+                default=options.get(CONF_WORKSPACE_ALIASES, DEFAULT_WORKSPACE_ALIASES),
+            ): str,
+            vol.Optional(
+                CONF_ENABLE_LOCAL_ANSWERS,
+                description={"suggested_value": options.get(CONF_ENABLE_LOCAL_ANSWERS)},
+                default=options.get(CONF_ENABLE_LOCAL_ANSWERS, DEFAULT_ENABLE_LOCAL_ANSWERS),
+            ): BooleanSelector(),
+            vol.Optional(
+                CONF_ENABLE_LOCAL_INTENTS,
+                description={"suggested_value": options.get(CONF_ENABLE_LOCAL_INTENTS)},
+                default=options.get(CONF_ENABLE_LOCAL_INTENTS, DEFAULT_ENABLE_LOCAL_INTENTS),
+            ): BooleanSelector(),
+            vol.Optional(
+                CONF_KEEP_WARM_WORKSPACES,
+                description={"suggested_value": options.get(CONF_KEEP_WARM_WORKSPACES)},
+                default=options.get(CONF_KEEP_WARM_WORKSPACES, DEFAULT_KEEP_WARM_WORKSPACES),
+            ): str,
+            vol.Optional(
+                CONF_KEEP_WARM_HOURS,
+                description={"suggested_value": options.get(CONF_KEEP_WARM_HOURS)},
+                default=options.get(CONF_KEEP_WARM_HOURS, DEFAULT_KEEP_WARM_HOURS),
+            ): str,
+            vol.Optional(
+                CONF_LATENCY_SLOS,
+                description={"suggested_value": options.get(CONF_LATENCY_SLOS)},
+                default=options.get(CONF_LATENCY_SLOS, DEFAULT_LATENCY_SLOS),
+            ): str,
         }
+
+
+class EndpointSubentryFlowHandler(ConfigSubentryFlow):
+    """Flow for adding an AnythingLLM endpoint to the pool."""
+
+    async def async_step_user(
+        self, user_input: dict[str, Any] | None = None
+    ) -> SubentryFlowResult:
+        """Add a pool endpoint."""
+        if user_input is not None:
+            title = user_input.pop(CONF_NAME)
+            return self.async_create_entry(title=title, data=_endpoint_data(user_input))
+        return self.async_show_form(
+            step_id="user",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_NAME): str,
+                    **_endpoint_schema({}),
+                }
+            ),
+        )
+
+    async def async_step_reconfigure(
+        self, user_input: dict[str, Any] | None = None
+    ) -> SubentryFlowResult:
+        """Change a pool endpoint."""
+        subentry = self._get_reconfigure_subentry()
+        if user_input is not None:
+            return self.async_update_and_abort(
+                self._get_entry(),
+                subentry,
+                data=_endpoint_data(user_input),
+            )
+        return self.async_show_form(
+            step_id="reconfigure",
+            data_schema=vol.Schema(_endpoint_schema(subentry.data)),
+        )
+
+
+def _endpoint_schema(data: Mapping[str, Any]) -> dict:
+    """Return the schema fields of a pool endpoint, defaulting to data."""
+    return {
+        vol.Required(CONF_BASE_URL, default=data.get(CONF_BASE_URL, DEFAULT_CONF_BASE_URL)): str,
+        vol.Required(CONF_API_KEY, default=data.get(CONF_API_KEY, "")): str,
+        vol.Optional(
+            CONF_WORKSPACE_MAP,
+            description={"suggested_value": data.get(CONF_WORKSPACE_MAP)},
+            default=data.get(CONF_WORKSPACE_MAP, DEFAULT_WORKSPACE_MAP),
+        ): str,
+    }
+
+
+def _endpoint_data(user_input: dict[str, Any]) -> dict[str, Any]:
+    """Normalize submitted pool endpoint fields."""
+    return {
+        CONF_BASE_URL: user_input[CONF_BASE_URL].strip().rstrip("/"),
+        CONF_API_KEY: user_input[CONF_API_KEY].strip(),
+        CONF_WORKSPACE_MAP: user_input.get(CONF_WORKSPACE_MAP, DEFAULT_WORKSPACE_MAP),
+    }
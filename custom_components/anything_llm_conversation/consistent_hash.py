@@ -0,0 +1,120 @@
+"""Route conversations to endpoints by consistent hashing with bounded loads."""
+
+import bisect
+import hashlib
+import math
+
+AFFINITY_VIRTUAL_NODES = 100  # ring points per endpoint
+# An endpoint takes a key's request only while its requests in flight stay
+# below this multiple of the average; otherwise the request spills to the
+# next endpoint on the ring.
+AFFINITY_LOAD_FACTOR = 2.0
+
+
+def routing_key(
+    conversation_id: str | None, workspace_slug: str, per_conversation: bool
+) -> str:
+    """Return the ring key of a chat.
+
+    Per conversation, every turn with the same conversation ID gets the same
+    key, whichever workspace it uses; without an ID the workspace is used.
+    """
+    if per_conversation and conversation_id:
+        return f"conversation:{conversation_id}"
+    return f"workspace:{workspace_slug}"
+
+
+def _point(text: str) -> int:
+    """Return a ring position that is stable across restarts."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class AffinityRouter:
+    """Map a routing key (conversation ID or workspace slug) to endpoints.
+
+    Each endpoint owns AFFINITY_VIRTUAL_NODES points on a hash ring, placed
+    by its name only, so removing an endpoint moves just the keys it owned
+    and adding one takes over only its share. A key's endpoints are the
+    ring order from the key's point; the first one with room under the load
+    bound goes first and the rest follow in ring order.
+    """
+
+    def __init__(
+        self,
+        virtual_nodes: int = AFFINITY_VIRTUAL_NODES,
+        load_factor: float = AFFINITY_LOAD_FACTOR,
+    ) -> None:
+        """Initialize with no rings built."""
+        self.virtual_nodes = virtual_nodes
+        self.load_factor = load_factor
+        self._rings: dict[frozenset[str], tuple[list[int], list[str]]] = {}
+        self.routed = 0
+        self.spilled = 0
+
+    def _ring(self, names) -> tuple[list[int], list[str]]:
+        """Return the sorted ring points and their owners for names."""
+        key = frozenset(names)
+        ring = self._rings.get(key)
+        if ring is None:
+            points = sorted(
+                (_point(f"{name}#{index}"), name)
+                for name in key
+                for index in range(self.virtual_nodes)
+            )
+            ring = ([point for point, _name in points], [name for _point, name in points])
+            # Membership only changes on reload, so one ring is all we keep.
+            self._rings = {key: ring}
+        return ring
+
+    def ring_order(self, key: str, names: list[str]) -> list[str]:
+        """Return names in ring order starting at key's position."""
+        if len(names) < 2:
+            return list(names)
+        points, owners = self._ring(names)
+        start = bisect.bisect(points, _point(key))
+        order: list[str] = []
+        for index in range(len(owners)):
+            owner = owners[(start + index) % len(owners)]
+            if owner not in order:
+                order.append(owner)
+                if len(order) == len(names):
+                    break
+        return order
+
+    def capacity(self, outstanding: dict[str, int], names: list[str]) -> int:
+        """Return the requests in flight an endpoint may have and still take one more."""
+        total = sum(outstanding.get(name, 0) for name in names) + 1
+        return math.ceil(self.load_factor * total / len(names))
+
+    def route(
+        self,
+        key: str,
+        names: list[str],
+        outstanding: dict[str, int],
+        candidates: list[str] | None = None,
+    ) -> list[str]:
+        """Return names in the order to try them for key.
+
+        candidates are the endpoints eligible to go first (the healthy ones;
+        all names when None). The load bound is computed over them.
+        """
+        order = self.ring_order(key, names)
+        eligible = [name for name in order if candidates is None or name in candidates]
+        if not eligible:
+            return order
+        self.routed += 1
+        limit = self.capacity(outstanding, eligible)
+        # With a load factor of at least 1 the least loaded endpoint is always
+        # below the limit, so the loop always finds one.
+        chosen = next(
+            (name for name in eligible if outstanding.get(name, 0) < limit), eligible[0]
+        )
+        if chosen != eligible[0]:
+            self.spilled += 1
+        order.remove(chosen)
+        return [chosen, *order]
+
+    @property
+    def stats(self) -> dict:
+        """Return how many requests were routed and how many spilled."""
+        return {"routed": self.routed, "spilled": self.spilled}
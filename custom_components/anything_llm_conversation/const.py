@@ -18,6 +18,19 @@ CONF_HEALTH_CHECK_TIMEOUT = "health_check_timeout"
 DEFAULT_HEALTH_CHECK_TIMEOUT = 3.0  # Quick health check for endpoint availability
 CONF_CHAT_TIMEOUT = "chat_timeout"
 DEFAULT_CHAT_TIMEOUT = 60.0  # Timeout for chat completion requests
+CONF_DEEP_PROBE_WORKSPACE = "deep_probe_workspace"
+DEFAULT_DEEP_PROBE_WORKSPACE = ""  # canary workspace slug; empty disables deep probes
+CONF_LOAD_BALANCING = "load_balancing"
+DEFAULT_LOAD_BALANCING = False  # balance across all endpoints instead of ordered failover
+CONF_ROUTING_AFFINITY = "routing_affinity"
+ROUTING_AFFINITY_OFF = "off"
+ROUTING_AFFINITY_CONVERSATION = "conversation"  # keep each conversation on one endpoint
+ROUTING_AFFINITY_WORKSPACE = "workspace"  # keep each workspace on one endpoint
+DEFAULT_ROUTING_AFFINITY = ROUTING_AFFINITY_OFF
+
+# Pool endpoints ("endpoint" subentries) beyond primary and failover
+CONF_WORKSPACE_MAP = "workspace_map"
+DEFAULT_WORKSPACE_MAP = ""  # "primary slug=endpoint slug" pairs; unmapped slugs are used as-is
 
 EVENT_CONVERSATION_FINISHED = "anything_llm_conversation.conversation.finished"
 
@@ -56,3 +69,58 @@ CONF_AGENT_KEYWORDS = "agent_keywords"
 DEFAULT_AGENT_KEYWORDS = "search, lookup, find online, web search, google, browse, check online, look up, scrape"
 CONF_ENABLE_HEALTH_CHECK = "enable_health_check"
 DEFAULT_ENABLE_HEALTH_CHECK = True
+CONF_ENABLE_STREAMING = "enable_streaming"
+DEFAULT_ENABLE_STREAMING = False
+CONF_RESPONSE_CACHE_WORKSPACES = "response_cache_workspaces"
+DEFAULT_RESPONSE_CACHE_WORKSPACES = ""  # comma-separated slugs; empty disables the cache
+CONF_RESPONSE_CACHE_TTL = "response_cache_ttl"
+DEFAULT_RESPONSE_CACHE_TTL = 3600  # seconds
+CONF_RESPONSE_CACHE_PERSIST = "response_cache_persist"
+DEFAULT_RESPONSE_CACHE_PERSIST = False
+RESPONSE_CACHE_STORAGE_VERSION = 1
+HEALTH_STORAGE_VERSION = 1
+CONF_WORKSPACE_ALIASES = "workspace_aliases"
+CONF_ENABLE_LOCAL_ANSWERS = "enable_local_answers"
+DEFAULT_ENABLE_LOCAL_ANSWERS = False
+CONF_ENABLE_LOCAL_INTENTS = "enable_local_intents"
+DEFAULT_ENABLE_LOCAL_INTENTS = False
+DEFAULT_WORKSPACE_ALIASES = ""  # "spoken name=slug" pairs, comma-separated
+CONF_KEEP_WARM_WORKSPACES = "keep_warm_workspaces"
+DEFAULT_KEEP_WARM_WORKSPACES = ""  # comma-separated slugs; empty disables keep-warm
+CONF_KEEP_WARM_HOURS = "keep_warm_hours"
+DEFAULT_KEEP_WARM_HOURS = "06:00-23:00"  # local time; empty means all day
+CONF_LATENCY_SLOS = "latency_slos"
+DEFAULT_LATENCY_SLOS = ""  # "slug=seconds" pairs, "*" for any other workspace; empty disables brownout failover
+
+# Circuit breaker: consecutive failed chat requests before an endpoint is
+# skipped, and how long it stays skipped before a single trial request.
+DEFAULT_BREAKER_FAILURE_THRESHOLD = 2
+DEFAULT_BREAKER_RECOVERY_TIMEOUT = 30.0  # seconds
+
+# Hedged requests: if the first endpoint has not answered within its observed
+# p95 latency (clamped to the bounds below), the same payload is also sent to
+# the other endpoint and whichever answers first wins.
+DEFAULT_HEDGE_DELAY = 4.0  # seconds, used until enough latency samples exist
+HEDGE_MIN_DELAY = 0.5
+HEDGE_MAX_DELAY = 15.0
+HEDGE_MIN_SAMPLES = 5
+DEFAULT_MAX_HEDGED_REQUESTS = 2  # hedged requests allowed in flight at once
+
+# Active health probes: real chat outcomes count as checks, so an endpoint is
+# probed only after HEALTH_PROBE_INTERVAL without any check, with exponential
+# backoff while it is down, and not at all after HEALTH_IDLE_SUSPEND without
+# conversation activity.
+HEALTH_PROBE_INTERVAL = 30.0  # seconds
+HEALTH_PROBE_BACKOFF_BASE = 5.0  # seconds
+HEALTH_PROBE_BACKOFF_MAX = 300.0  # seconds
+HEALTH_IDLE_SUSPEND = 3 * 3600.0  # seconds
+# Deep probes: a tiny chat to the canary workspace, at most once per
+# DEEP_PROBE_INTERVAL per endpoint, checks the LLM behind the API server. No
+# answer within DEEP_PROBE_TIMEOUT marks the endpoint down; an answer slower
+# than DEEP_PROBE_DEGRADED_AFTER marks it degraded.
+DEEP_PROBE_INTERVAL = 300.0  # seconds
+DEEP_PROBE_TIMEOUT = 30.0  # seconds, capped by the chat timeout
+DEEP_PROBE_DEGRADED_AFTER = 10.0  # seconds
+# Persisted endpoint health older than this is ignored at startup.
+HEALTH_STATE_MAX_AGE = 3600.0  # seconds
+HEALTH_SAVE_DELAY = 10  # seconds
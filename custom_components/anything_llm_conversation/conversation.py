@@ -17,14 +17,12 @@ from homeassistant.components.conversation import (
     ConversationResult,
     async_get_chat_log,
 )
-from homeassistant.components.homeassistant.exposed_entities import async_should_expose
 from homeassistant.config_entries import ConfigSubentry
 from homeassistant.const import ATTR_NAME, MATCH_ALL
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError, TemplateError
 from homeassistant.helpers import (
     device_registry as dr,
-    entity_registry as er,
     intent,
     template,
 )
@@ -44,6 +42,16 @@ from .const import (
     CONF_ENABLE_AGENT_PREFIX,
     CONF_AGENT_KEYWORDS,
     CONF_ENABLE_HEALTH_CHECK,
+    CONF_ENABLE_STREAMING,
+    CONF_RESPONSE_CACHE_WORKSPACES,
+    CONF_RESPONSE_CACHE_TTL,
+    CONF_RESPONSE_CACHE_PERSIST,
+    CONF_WORKSPACE_ALIASES,
+    CONF_ENABLE_LOCAL_ANSWERS,
+    CONF_ENABLE_LOCAL_INTENTS,
+    CONF_KEEP_WARM_WORKSPACES,
+    CONF_KEEP_WARM_HOURS,
+    CONF_LATENCY_SLOS,
     DEFAULT_ATTACH_USERNAME,
     DEFAULT_WORKSPACE_SLUG,
     DEFAULT_MAX_TOKENS,
@@ -55,23 +63,66 @@ from .const import (
     DEFAULT_ENABLE_AGENT_PREFIX,
     DEFAULT_AGENT_KEYWORDS,
     DEFAULT_ENABLE_HEALTH_CHECK,
+    DEFAULT_ENABLE_STREAMING,
+    DEFAULT_RESPONSE_CACHE_WORKSPACES,
+    DEFAULT_RESPONSE_CACHE_TTL,
+    DEFAULT_RESPONSE_CACHE_PERSIST,
+    DEFAULT_WORKSPACE_ALIASES,
+    DEFAULT_ENABLE_LOCAL_ANSWERS,
+    DEFAULT_ENABLE_LOCAL_INTENTS,
+    DEFAULT_KEEP_WARM_WORKSPACES,
+    DEFAULT_KEEP_WARM_HOURS,
+    DEFAULT_LATENCY_SLOS,
     DOMAIN,
     EVENT_CONVERSATION_FINISHED,
 )
+from .command_router import (
+    COMMAND_AFFIRMATIVE,
+    COMMAND_MODE_QUERY,
+    COMMAND_PASS_THROUGH,
+    COMMAND_WORKSPACE_QUERY,
+    COMMAND_WORKSPACE_SWITCH,
+    CommandDecision,
+    CommandRouter,
+    parse_workspace_aliases,
+    sanitize_workspace_slug,
+)
+from .entity_tracker import async_get_entity_tracker
 from .helpers import (
-    detect_mode_switch,
+    MODE_TO_WORKSPACE,
+    EndpointUnavailableError,
     detect_suggested_modes,
-    is_mode_query,
     get_mode_name,
     get_mode_prompt,
     get_workspace_prompt,
     get_workspace_prompt_config,
     should_apply_tts_cleaning_for_workspace,
 )
+from .brownout import SLO_WILDCARD, parse_latency_slos
+from .keep_warm import parse_hours
+from .local_answers import LocalStateAnswerer
+from .mode_patterns import MODE_KEYWORDS, MODE_QUERY_KEYWORDS, response_mode_hint
+from .pipeline_stats import (
+    STAGE_COMMANDS,
+    STAGE_LLM,
+    STAGE_LOCAL_ANSWERS,
+    STAGE_LOCAL_INTENTS,
+    STAGE_RESPONSE_CACHE,
+    PipelineStats,
+)
+from .prompt_renderer import (
+    ENTITIES_CSV_VARIABLE,
+    CompiledPromptCache,
+    render_entities_csv,
+    rewrite_entity_block,
+    uses_entities_csv,
+)
+from .response_cache import make_cache_key
 from .response_processor import (
     clean_response_for_tts,
     should_continue_conversation,
     QueryResponse,
+    StreamingTTSCleaner,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -87,35 +138,6 @@ def _capped_set(d: dict, key: str, value) -> None:
         del d[next(iter(d))]
 
 
-# L1: single regex scan for the configured affirmative replies to mode suggestions.
-_RE_AFFIRMATIVE = re.compile(
-    r'^\s*(?:yes|yeah|yep|sure|ok(?:ay)?|please|go\s+ahead|absolutely|of\s+course|do\s+it|sounds?\s+good)\s*[.!]?\s*$',
-    re.IGNORECASE,
-)
-
-# L5: maps the lowercase display-name fragment to its mode key, used to detect
-# when the LLM's response is asking the user to confirm a mode switch.
-_RESPONSE_MODE_HINTS: dict[str, str] = {
-    "analysis mode": "analysis",
-    "research mode": "research",
-    "code review mode": "code_review",
-    "troubleshooting mode": "troubleshooting",
-    "guest mode": "guest",
-    "security mode": "security",
-    "default mode": "default",
-}
-# H2: also strip { and } to prevent Jinja2 expression injection from entity names
-# sourced from third-party integrations (Z-Wave, MQTT, cloud bridges).
-# Commas are stripped because entity data is embedded in CSV context blocks;
-# an unescaped comma in a device name would shift columns for the LLM.
-_RE_UNSAFE_PROMPT = re.compile(r'[\r\n\t`|{},]')
-
-
-def _sanitize_prompt_value(value: str) -> str:
-    """Strip control/structural characters from a value before prompt insertion."""
-    return _RE_UNSAFE_PROMPT.sub(' ', str(value)).strip()
-
-
 WORKSPACE_SLUG_ALIASES = {
     "adventure": "adventure",
     "author": "adventure",
@@ -155,6 +177,12 @@ WORKSPACE_SLUG_ALIASES = {
     "visitor": "default",
 }
 
+# Workspace/mode commands and affirmative replies (L1) are classified by one
+# compiled router before anything is sent to the LLM.
+_COMMAND_ROUTER = CommandRouter(
+    WORKSPACE_SLUG_ALIASES, MODE_KEYWORDS, MODE_TO_WORKSPACE, MODE_QUERY_KEYWORDS
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -216,12 +244,45 @@ class AnythingLLMAgentEntity(
 
         self.options = subentry.data
         self._attr_unique_id = subentry.subentry_id
+        # Lets the Assist pipeline start TTS on the first streamed sentence.
+        self._attr_supports_streaming = self.options.get(
+            CONF_ENABLE_STREAMING, DEFAULT_ENABLE_STREAMING
+        )
         
-        # Caching for performance optimization
-        # NOTE: Only entity list is cached; system prompt is NOT cached because it
-        # embeds live entity states and would return stale data after state changes.
-        self._exposed_entities_cache: list[dict[str, any]] | None = None
-        self._last_states_hash: int = 0
+        # Exposed entities are tracked from state/registry/exposure events in
+        # one snapshot shared by every agent, so a turn reads the current
+        # version instead of rescanning every state.
+        # NOTE: the system prompt is NOT cached because it embeds live entity
+        # states and would return stale data after state changes.
+        self._entity_tracker = async_get_entity_tracker(hass)
+        # CSV rendering of the snapshot tuple it was built from; the tuple is
+        # replaced on every snapshot version, so identity means "unchanged".
+        self._entities_csv_source: tuple[dict, ...] | None = None
+        self._entities_csv = ""
+        # Compiled prompt templates keyed by (workspace, mode, prompt text), so
+        # HA does not re-parse the same prompt every turn. Cleared whenever the
+        # options object changes.
+        self.prompt_cache = CompiledPromptCache()
+        self._prompt_cache_options = None
+
+        # Workspaces whose non-thread answers may be served from the response cache.
+        self._response_cache_workspaces = {
+            slug.strip().lower()
+            for slug in self.options.get(
+                CONF_RESPONSE_CACHE_WORKSPACES, DEFAULT_RESPONSE_CACHE_WORKSPACES
+            ).split(",")
+            if slug.strip()
+        }
+
+        # Answers simple state questions from the exposed-entity snapshot.
+        self.local_answers = LocalStateAnswerer()
+        # Hit rate and timing of each stage a turn passes through.
+        self.pipeline_stats = PipelineStats()
+
+        # Command router with the built-in plus user-defined workspace aliases;
+        # rebuilt only when the alias option changes.
+        self._workspace_aliases_str: str | None = None
+        self._command_router = _COMMAND_ROUTER
 
         # L1: cache compiled agent-keyword regex; invalidated when options change.
         self._agent_keywords_str: str | None = None
@@ -241,9 +302,40 @@ class AnythingLLMAgentEntity(
         # Register entity reference so reset_thread service can look it up by subentry_id.
         hass.data[f"{DOMAIN}_entity_{subentry.subentry_id}"] = self
 
+    async def async_added_to_hass(self) -> None:
+        """Register this agent's latency SLOs and keep-warm workspaces with the client."""
+        await super().async_added_to_hass()
+        slos = parse_latency_slos(self.options.get(CONF_LATENCY_SLOS, DEFAULT_LATENCY_SLOS))
+        self.client.latency_slos.set(
+            self._attr_unique_id,
+            {
+                slug if slug == SLO_WILDCARD else sanitize_workspace_slug(slug): seconds
+                for slug, seconds in slos.items()
+            },
+        )
+        workspaces = {
+            sanitize_workspace_slug(slug)
+            for slug in self.options.get(
+                CONF_KEEP_WARM_WORKSPACES, DEFAULT_KEEP_WARM_WORKSPACES
+            ).split(",")
+        }
+        workspaces.discard("")
+        if not workspaces:
+            return
+        hours = self.options.get(CONF_KEEP_WARM_HOURS, DEFAULT_KEEP_WARM_HOURS)
+        window = parse_hours(hours)
+        if window is None:
+            _LOGGER.warning(
+                "Invalid keep-warm hours %r (expected HH:MM-HH:MM); keep-warm disabled", hours
+            )
+            return
+        self.client.set_keep_warm(self._attr_unique_id, workspaces, window)
+
     async def async_will_remove_from_hass(self) -> None:
         """Clean up entity reference when removed."""
         self.hass.data.pop(f"{DOMAIN}_entity_{self._attr_unique_id}", None)
+        self.client.keep_warm.remove(self._attr_unique_id)
+        self.client.latency_slos.remove(self._attr_unique_id)
 
     @property
     def supported_languages(self) -> list[str] | Literal["*"]:
@@ -266,15 +358,42 @@ class AnythingLLMAgentEntity(
         """Call the API."""
         conversation_id = chat_log.conversation_id
         
-        # Check for workspace switch command
-        workspace_switch_result = self._check_workspace_switch(user_input.text, conversation_id, user_input.language)
+        # Any turn counts as activity for the health probe schedule.
+        self.client.note_activity()
+
+        # One local routing pass decides whether this turn is a command.
+        turn_started = self.pipeline_stats.begin_turn()
+        decision = self._get_command_router().route(user_input.text)
+        self.pipeline_stats.record(
+            STAGE_COMMANDS,
+            decision.kind != COMMAND_PASS_THROUGH
+            and (
+                decision.kind != COMMAND_AFFIRMATIVE
+                or conversation_id in self._pending_mode_suggestions
+            ),
+            turn_started,
+        )
+
+        # Check for workspace switch command; switches are validated against the
+        # cached workspace list. A stale list is refreshed in the background,
+        # never on the voice path, and not while the primary is failing.
+        if (
+            decision.kind == COMMAND_WORKSPACE_SWITCH
+            and decision.workspace not in ("", "default")
+            and self.client.workspaces_refreshable
+        ):
+            self.hass.async_create_background_task(
+                self.client.async_refresh_workspaces(),
+                "anything_llm_conversation workspace refresh",
+            )
+        workspace_switch_result = self._check_workspace_switch(decision, conversation_id, user_input.language)
         if workspace_switch_result:
             return workspace_switch_result
 
         current_workspace = self._get_active_workspace(conversation_id)
         
         # Check for mode query first
-        if is_mode_query(user_input.text):
+        if decision.kind == COMMAND_MODE_QUERY:
             mode_name = get_mode_name(current_workspace)
             _LOGGER.debug("Mode/workspace query detected, current workspace: %s", mode_name)
             
@@ -288,7 +407,7 @@ class AnythingLLMAgentEntity(
         # L5: if the previous response suggested a workspace switch and this reply
         # is affirmative, apply the pending switch without an extra API call.
         pending_mode = self._pending_mode_suggestions.pop(conversation_id, None)
-        if pending_mode and _RE_AFFIRMATIVE.match(user_input.text):
+        if pending_mode and decision.kind == COMMAND_AFFIRMATIVE:
             old_workspace = current_workspace
             _capped_set(self.conversation_workspaces, conversation_id, pending_mode)
             mode_name = get_mode_name(pending_mode)
@@ -311,6 +430,45 @@ class AnythingLLMAgentEntity(
                 response=intent_response, conversation_id=conversation_id
             )
 
+        # Hybrid pipeline: Home Assistant's own sentence triggers and intents
+        # ("turn on the kitchen lights") run locally; only unmatched
+        # utterances continue towards AnythingLLM.
+        if self.options.get(CONF_ENABLE_LOCAL_INTENTS, DEFAULT_ENABLE_LOCAL_INTENTS):
+            started = self.pipeline_stats.start()
+            intent_response = await self._async_handle_local_intent(user_input)
+            self.pipeline_stats.record(STAGE_LOCAL_INTENTS, intent_response is not None, started)
+            if intent_response is not None:
+                speech = intent_response.speech.get("plain", {}).get("speech", "")
+                _LOGGER.debug("Handled by local intent for conversation %s: %s", conversation_id, speech)
+                chat_log.async_add_assistant_content_without_tools(
+                    AssistantContent(agent_id=self.entity_id, content=speech)
+                )
+                return conversation.ConversationResult(
+                    response=intent_response, conversation_id=conversation_id
+                )
+
+        # Simple device-state questions ("is the garage door open") are answered
+        # from live state without an LLM round trip; anything the index cannot
+        # resolve confidently goes to the LLM as usual.
+        if self.options.get(
+            CONF_ENABLE_LOCAL_ANSWERS, DEFAULT_ENABLE_LOCAL_ANSWERS
+        ) and user_input.language.startswith("en"):
+            started = self.pipeline_stats.start()
+            local_answer = self.local_answers.answer(
+                user_input.text, self.get_exposed_entities(), self._entity_state
+            )
+            self.pipeline_stats.record(STAGE_LOCAL_ANSWERS, local_answer is not None, started)
+            if local_answer is not None:
+                _LOGGER.debug("Answered locally for conversation %s: %s", conversation_id, local_answer)
+                chat_log.async_add_assistant_content_without_tools(
+                    AssistantContent(agent_id=self.entity_id, content=local_answer)
+                )
+                intent_response = intent.IntentResponse(language=user_input.language)
+                intent_response.async_set_speech(local_answer)
+                return conversation.ConversationResult(
+                    response=intent_response, conversation_id=conversation_id
+                )
+
         # Determine workspace and thread BEFORE building the system message so we
         # can skip the (expensive) template render when a thread is active —
         # thread endpoints manage context server-side and ignore the system prompt.
@@ -383,10 +541,53 @@ class AnythingLLMAgentEntity(
 
         messages.append(user_message)
 
+        streamed = False
+        cache_key = self._response_cache_key(messages, active_workspace, active_thread)
         try:
-            query_response = await self.query(
-                user_input, messages, active_workspace, active_thread, apply_tts_cleaning
-            )
+            query_response = None
+            if cache_key is not None:
+                started = self.pipeline_stats.start()
+                query_response = self._cached_query_response(cache_key, apply_tts_cleaning)
+                self.pipeline_stats.record(STAGE_RESPONSE_CACHE, query_response is not None, started)
+                if query_response is not None:
+                    # Serve the hit as-is; re-caching it would extend its TTL.
+                    cache_key = None
+            llm_started = self.pipeline_stats.start() if query_response is None else None
+            stream_route: dict = {}
+            if query_response is None and self._should_stream(user_content, chat_log):
+                query_response = await self._async_stream_query(
+                    chat_log,
+                    messages,
+                    active_workspace,
+                    active_thread,
+                    apply_tts_cleaning,
+                    route=stream_route,
+                )
+                streamed = query_response is not None
+            if query_response is None:
+                query_response = await self.query(
+                    user_input,
+                    messages,
+                    active_workspace,
+                    active_thread,
+                    apply_tts_cleaning,
+                    conversation_id=conversation_id,
+                    skip_endpoint=stream_route.get("endpoint"),
+                )
+            if llm_started is not None:
+                self.pipeline_stats.record(STAGE_LLM, True, llm_started)
+            # A failover workspace's answer must not be served as this one's.
+            if cache_key is not None and self.client.answered_from(
+                query_response.response, active_workspace
+            ):
+                self.client.response_cache.put(
+                    cache_key,
+                    query_response.response,
+                    float(self.options.get(CONF_RESPONSE_CACHE_TTL, DEFAULT_RESPONSE_CACHE_TTL)),
+                    persist=self.options.get(
+                        CONF_RESPONSE_CACHE_PERSIST, DEFAULT_RESPONSE_CACHE_PERSIST
+                    ),
+                )
         except Exception as err:
             _LOGGER.error(err)
             intent_response = intent.IntentResponse(language=user_input.language)
@@ -414,17 +615,15 @@ class AnythingLLMAgentEntity(
 
         # L5: if response contains a mode-switch question, store the suggested mode
         # so the next affirmative reply can trigger the switch without an extra API call.
-        if '?' in query_response.text:
-            text_lower = query_response.text.lower()
-            for _hint_name, _hint_key in _RESPONSE_MODE_HINTS.items():
-                if _hint_name in text_lower and _hint_key != current_mode:
-                    _capped_set(self._pending_mode_suggestions, conversation_id, _hint_key)
-                    _LOGGER.debug(
-                        "Pending mode suggestion stored: %s for conversation %s",
-                        _hint_key,
-                        conversation_id,
-                    )
-                    break
+        hint_key = response_mode_hint(query_response.text, current_workspace)
+        if hint_key is not None:
+            _capped_set(self._pending_mode_suggestions, conversation_id, hint_key)
+            self.client.prewarm_workspace(hint_key, conversation_id)
+            _LOGGER.debug(
+                "Pending mode suggestion stored: %s for conversation %s",
+                hint_key,
+                conversation_id,
+            )
 
         self.hass.bus.async_fire(
             EVENT_CONVERSATION_FINISHED,
@@ -441,9 +640,11 @@ class AnythingLLMAgentEntity(
         # Issue 6: Write assistant response to HA ChatLog so conversation
         # history appears in the HA UI. The user turn is already logged
         # automatically by async_get_chat_log when user_input is provided.
-        chat_log.async_add_assistant_content_without_tools(
-            AssistantContent(agent_id=self.entity_id, content=query_response.text)
-        )
+        # Streamed replies were already added to the ChatLog as delta content.
+        if not streamed:
+            chat_log.async_add_assistant_content_without_tools(
+                AssistantContent(agent_id=self.entity_id, content=query_response.text)
+            )
 
         # Detect if LLM is asking a follow-up question to enable continued conversation
         should_continue = should_continue_conversation(query_response.text)
@@ -455,9 +656,9 @@ class AnythingLLMAgentEntity(
         )
 
     def _check_workspace_switch(
-        self, user_text: str, conversation_id: str, language: str
+        self, decision: CommandDecision, conversation_id: str, language: str
     ) -> conversation.ConversationResult | None:
-        """Check if user is requesting a workspace switch.
+        """Handle a routed workspace query or switch command.
         
         Supports commands like:
         - !workspace finance            → Switch to finance workspace
@@ -468,33 +669,7 @@ class AnythingLLMAgentEntity(
         - !workspace                    → Show current workspace
         - what workspace                → Show current workspace
         """
-        text_lower = user_text.lower().strip()
-        
-        # Check for workspace query - support various natural language patterns
-        workspace_query_patterns = [
-            "!workspace",
-            "what workspace",
-            "current workspace", 
-            "which workspace",
-            "what workspace are you in",
-            "what workspace am i in",
-            "which workspace are you in",
-            "which workspace am i in",
-            "what workspace are you using",
-            "what workspace am i using",
-        ]
-        
-        # Also check if the text contains key phrases
-        is_workspace_query = (
-            text_lower in workspace_query_patterns or
-            text_lower.startswith("what workspace") or
-            text_lower.startswith("which workspace") or
-            (text_lower.startswith("current") and "workspace" in text_lower)
-        )
-        
-        if is_workspace_query and not any(
-            text_lower.startswith(p) for p in ["switch to", "use ", "change workspace to", "switch workspace to"]
-        ):
+        if decision.kind == COMMAND_WORKSPACE_QUERY:
             current_workspace = self.conversation_workspaces.get(conversation_id)
             if current_workspace:
                 response_text = f"Currently using workspace: {current_workspace}"
@@ -509,79 +684,10 @@ class AnythingLLMAgentEntity(
                 response=intent_response, conversation_id=conversation_id
             )
         
-        # Extract workspace name from various command patterns
-        new_workspace = None
-        
-        # Pattern 1: "!workspace <name>"
-        if text_lower.startswith("!workspace "):
-            new_workspace = user_text.split(" ", 1)[1].strip()
-        
-        # Pattern 2: "switch to <name> workspace"
-        elif text_lower.startswith("switch to ") and " workspace" in text_lower:
-            # Extract workspace name between "switch to" and "workspace"
-            parts = text_lower.replace("switch to ", "").replace(" workspace", "").strip()
-            new_workspace = parts
-        
-        # Pattern 3: "use <name> workspace"
-        elif text_lower.startswith("use ") and " workspace" in text_lower:
-            # Extract workspace name between "use" and "workspace"
-            parts = text_lower.replace("use ", "").replace(" workspace", "").strip()
-            new_workspace = parts
-        
-        # Pattern 4: "change workspace to <name>"
-        elif text_lower.startswith("change workspace to "):
-            new_workspace = text_lower.replace("change workspace to ", "").strip()
-        
-        # Pattern 5: "switch workspace to <name>"
-        elif text_lower.startswith("switch workspace to "):
-            new_workspace = text_lower.replace("switch workspace to ", "").strip()
-
-        # Pattern 6: "switch to <name> mode"
-        elif text_lower.startswith("switch to ") and " mode" in text_lower:
-            parts = text_lower.replace("switch to ", "").replace(" mode", "").strip()
-            new_workspace = parts
-
-        # Pattern 7: "use <name> mode"
-        elif text_lower.startswith("use ") and " mode" in text_lower:
-            parts = text_lower.replace("use ", "").replace(" mode", "").strip()
-            new_workspace = parts
-
-        # Pattern 8: "change mode to <name>"
-        elif text_lower.startswith("change mode to "):
-            new_workspace = text_lower.replace("change mode to ", "").strip()
-
-        # Pattern 9: "switch mode to <name>"
-        elif text_lower.startswith("switch mode to "):
-            new_workspace = text_lower.replace("switch mode to ", "").strip()
-
-        # Backwards-compatible mode detection ("analysis mode", "research mode", etc.)
-        elif text_lower.endswith("mode"):
-            inferred_workspace = detect_mode_switch(text_lower)
-            if inferred_workspace:
-                new_workspace = inferred_workspace
-        
-        # If we found a workspace switch request
-        if new_workspace:
-            # Sanitize workspace name: strip surrounding whitespace/punctuation,
-            # normalize spaces to hyphens, and lowercase. This prevents trailing
-            # punctuation from voice input (e.g. "finance.") from becoming part
-            # of the workspace slug used for API calls.
-            new_workspace = new_workspace.strip().lower()
-            # Replace ALL characters that are not letters, digits, underscore, or hyphen
-            # with hyphens. Prevents path traversal via slug interpolated into the URL.
-            new_workspace = re.sub(r'[^a-z0-9_-]', '-', new_workspace)
-            # Collapse repeated hyphens and strip leading/trailing hyphens
-            new_workspace = re.sub(r'-+', '-', new_workspace).strip('-')
-            # Normalize common spoken aliases to canonical workspace slugs.
-            # If exact match fails (e.g. "the-analysis" from "switch to the analysis workspace"),
-            # scan for any known alias as a substring, longest first to avoid partial matches.
-            if new_workspace in WORKSPACE_SLUG_ALIASES:
-                new_workspace = WORKSPACE_SLUG_ALIASES[new_workspace]
-            else:
-                for alias in sorted(WORKSPACE_SLUG_ALIASES, key=len, reverse=True):
-                    if alias in new_workspace:
-                        new_workspace = WORKSPACE_SLUG_ALIASES[alias]
-                        break
+        # The router has already sanitized the requested name and mapped spoken
+        # aliases to canonical slugs.
+        if decision.kind == COMMAND_WORKSPACE_SWITCH:
+            new_workspace = decision.workspace
             new_workspace_lower = new_workspace
             
             # Handle "default" keyword to return to primary workspace
@@ -602,6 +708,7 @@ class AnythingLLMAgentEntity(
 
                 # Get the actual default workspace name
                 default_workspace = self._default_workspace_slug()
+                self.client.prewarm_workspace(default_workspace, conversation_id)
 
                 _LOGGER.info(
                     "Workspace reset to default (%s) for conversation %s",
@@ -624,6 +731,31 @@ class AnythingLLMAgentEntity(
                 return conversation.ConversationResult(
                     response=intent_response, conversation_id=conversation_id
                 )
+
+            # Reject slugs AnythingLLM does not know now, instead of failing on
+            # the next chat request. A close match is offered as a suggestion
+            # that a plain "yes" confirms.
+            known, suggestion = self.client.workspace_catalog.validate(new_workspace)
+            if known is False:
+                _LOGGER.info(
+                    "Workspace %s not found for conversation %s (suggestion: %s)",
+                    new_workspace,
+                    conversation_id,
+                    suggestion or "None",
+                )
+                if suggestion:
+                    _capped_set(self._pending_mode_suggestions, conversation_id, suggestion)
+                    self.client.prewarm_workspace(suggestion, conversation_id)
+                    speech = f"I couldn't find a workspace named {new_workspace}. Did you mean {suggestion}?"
+                else:
+                    speech = f"I couldn't find a workspace named {new_workspace}."
+                intent_response = intent.IntentResponse(language=language)
+                intent_response.async_set_speech(speech)
+                return conversation.ConversationResult(
+                    response=intent_response,
+                    conversation_id=conversation_id,
+                    continue_conversation=bool(suggestion),
+                )
             
             # Store the new workspace for this conversation
             old_workspace = self.conversation_workspaces.get(conversation_id, "default")
@@ -638,6 +770,8 @@ class AnythingLLMAgentEntity(
                 del self.history[conversation_id]
 
             self._save_state()
+            # Warm the workspace while the confirmation is being spoken.
+            self.client.prewarm_workspace(new_workspace, conversation_id)
             _LOGGER.info(
                 "Workspace switched from %s to %s for conversation %s (stored in conversation_workspaces dict)",
                 old_workspace,
@@ -666,6 +800,47 @@ class AnythingLLMAgentEntity(
         """Get currently active workspace slug for this conversation."""
         return self.conversation_workspaces.get(conversation_id, self._get_default_workspace())
 
+    async def _async_handle_local_intent(
+        self, user_input: ConversationInput
+    ) -> intent.IntentResponse | None:
+        """Run Home Assistant's sentence triggers and intents; None if nothing matched."""
+        try:
+            trigger_response = await conversation.async_handle_sentence_triggers(
+                self.hass, user_input
+            )
+            if trigger_response is not None:
+                intent_response = intent.IntentResponse(language=user_input.language)
+                intent_response.async_set_speech(trigger_response)
+                return intent_response
+            return await conversation.async_handle_intents(self.hass, user_input)
+        except Exception as err:  # noqa: BLE001 - never block the LLM fallback
+            _LOGGER.warning("Local intent handling failed, using AnythingLLM: %s", err)
+            return None
+
+    def _entity_state(self, entity_id: str) -> tuple[str, dict] | None:
+        """Return the live (state, attributes) of an entity for local answers."""
+        state = self.hass.states.get(entity_id)
+        if state is None:
+            return None
+        return state.state, state.attributes
+
+    def _get_command_router(self) -> CommandRouter:
+        """Return the command router for the current workspace aliases."""
+        aliases_str = self.options.get(CONF_WORKSPACE_ALIASES, DEFAULT_WORKSPACE_ALIASES)
+        if aliases_str != self._workspace_aliases_str:
+            user_aliases = parse_workspace_aliases(aliases_str)
+            if user_aliases:
+                self._command_router = CommandRouter(
+                    {**WORKSPACE_SLUG_ALIASES, **user_aliases},
+                    MODE_KEYWORDS,
+                    MODE_TO_WORKSPACE,
+                    MODE_QUERY_KEYWORDS,
+                )
+            else:
+                self._command_router = _COMMAND_ROUTER
+            self._workspace_aliases_str = aliases_str
+        return self._command_router
+
     def _should_use_agent_prefix(self, user_text: str) -> bool:
         """Determine if @agent prefix should be added based on keywords."""
         if not self.options.get(CONF_ENABLE_AGENT_PREFIX, DEFAULT_ENABLE_AGENT_PREFIX):
@@ -773,70 +948,60 @@ class AnythingLLMAgentEntity(
         """Generate a prompt for the user."""
         # Prompt is rendered fresh every call — it embeds live entity states so
         # caching it would return stale device states to the LLM.
-        return template.Template(raw_prompt, self.hass).async_render(
-            {
-                "ha_name": self.hass.config.location_name,
-                "exposed_entities": exposed_entities,
-                "current_device_id": user_input.device_id,
-            },
+        # The entity CSV loop is rendered natively (byte-identical), leaving
+        # Jinja only the small remainder of the template.
+        if self.options is not self._prompt_cache_options:
+            self.prompt_cache.clear()
+            self._prompt_cache_options = self.options
+        compiled, needs_csv = self.prompt_cache.get(
+            (workspace_slug, mode_key, raw_prompt),
+            lambda: self._compile_prompt(raw_prompt),
+        )
+        variables = {
+            "ha_name": self.hass.config.location_name,
+            "exposed_entities": exposed_entities,
+            "current_device_id": user_input.device_id,
+        }
+        if needs_csv:
+            variables[ENTITIES_CSV_VARIABLE] = self._render_entities_csv(exposed_entities)
+        return compiled.async_render(
+            variables,
             parse_result=False,
         )
 
-    def get_exposed_entities(self) -> list[dict[str, any]]:
-        # Compute exposed states once — used for both cache invalidation and building
-        states = [
-            state
-            for state in self.hass.states.async_all()
-            if async_should_expose(self.hass, conversation.DOMAIN, state.entity_id)
-        ]
-
-        # Invalidate cache when any exposed entity's state VALUE changes (not just count).
-        # The old count-only check missed state changes (e.g. a light turning on/off)
-        # which caused the LLM to report stale device states.
-        current_hash = hash(tuple((s.entity_id, s.state) for s in states))
-        if current_hash != self._last_states_hash:
-            self._exposed_entities_cache = None
-            self._last_states_hash = current_hash
-            _LOGGER.debug("Entity cache invalidated due to state change")
-
-        # Return cached entities if available
-        if self._exposed_entities_cache is not None:
-            return self._exposed_entities_cache
-
-        # Build fresh entity list
-        # Issue 20: fetch the backing dict once and do O(1) dict lookups per entity
-        # instead of calling async_get() (a method with lookup overhead) N times.
-        reg_entries = er.async_get(self.hass).entities
-        exposed_entities = []
-        for state in states:
-            entity_id = state.entity_id
-            entity = reg_entries.get(entity_id)
-            # Issue 12: sanitize name/state/aliases before they're embedded in the
-            # system prompt CSV. A device named with newlines or backtick characters
-            # could escape the CSV context and inject prompt instructions.
-            raw_aliases = entity.aliases if entity and entity.aliases else []
-            exposed_entities.append(
-                {
-                    "entity_id": _sanitize_prompt_value(entity_id),
-                    "name": _sanitize_prompt_value(state.name),
-                    "state": _sanitize_prompt_value(state.state),
-                    "aliases": [_sanitize_prompt_value(a) for a in raw_aliases],
-                }
-            )
-
-        self._exposed_entities_cache = exposed_entities
-        _LOGGER.debug("Cached %d exposed entities", len(exposed_entities))
-        return exposed_entities
+    def _compile_prompt(self, raw_prompt: str) -> tuple[template.Template, bool]:
+        """Compile a prompt template; return it and whether it needs the entity CSV."""
+        prompt = rewrite_entity_block(raw_prompt)
+        compiled = template.Template(prompt, self.hass)
+        # Compile now so the cache stores parsed templates (raises TemplateError).
+        compiled.ensure_valid()
+        return compiled, uses_entities_csv(prompt)
+
+    def _render_entities_csv(self, exposed_entities) -> str:
+        """Return the entity CSV rows, re-rendered only when the snapshot changed."""
+        if exposed_entities is not self._entities_csv_source:
+            self._entities_csv = render_entities_csv(exposed_entities)
+            self._entities_csv_source = exposed_entities
+        return self._entities_csv
+
+    def get_exposed_entities(self) -> tuple[dict[str, any], ...]:
+        """Return the exposed-entity rows for the prompt.
+
+        The rows are shared with every agent and must not be mutated.
+        """
+        return self._entity_tracker.entities
 
-    async def query(
+    def _chat_request_params(
         self,
-        user_input: conversation.ConversationInput,
-        messages: list[dict],
         workspace_override: str | None = None,
         thread_override: str | None | bool = False,
-        apply_tts_cleaning: bool = True,
-    ) -> QueryResponse:
-        """Process a sentence."""
+        conversation_id: str | None = None,
+    ) -> dict:
+        """Resolve the per-agent keyword arguments for a client chat call.
+
+        conversation_id must be the chat log's, which is set from the first
+        turn on, so every turn of a conversation routes to the same endpoint.
+        """
         # Use workspace override if provided (from conversation-specific workspace)
         if workspace_override:
             workspace_slug = workspace_override
@@ -865,18 +1030,148 @@ class AnythingLLMAgentEntity(
         data_failover_workspace_slug = self.entry.data.get(CONF_FAILOVER_WORKSPACE_SLUG, DEFAULT_FAILOVER_WORKSPACE_SLUG)
         failover_workspace_slug = opt_failover_workspace_slug or data_failover_workspace_slug
 
-        _LOGGER.info("Sending request to AnythingLLM workspace '%s' with %d messages", workspace_slug, len(messages))
+        return {
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "workspace_slug": workspace_slug if workspace_slug else None,
+            "thread_slug": thread_slug if thread_slug else None,
+            "failover_thread_slug": failover_thread_slug if failover_thread_slug else None,
+            "failover_workspace_slug": failover_workspace_slug if failover_workspace_slug else None,
+            "conversation_id": conversation_id,
+        }
+
+    def _response_cache_key(
+        self, messages: list[dict], workspace_slug: str, thread_slug: str | None
+    ) -> str | None:
+        """Return the response cache key for this turn, or None if it is not cacheable.
+
+        Only non-thread turns in an opted-in workspace are cached: the request
+        is then fully determined by the workspace, the user message and the
+        rendered system prompt. @agent turns run tools and are never cached.
+        """
+        if thread_slug or workspace_slug.lower() not in self._response_cache_workspaces:
+            return None
+        user_content = messages[-1]["content"]
+        if user_content.startswith("@agent "):
+            return None
+        system_prompt = next(
+            (m["content"] for m in messages if m.get("role") == "system"), None
+        )
+        return make_cache_key(workspace_slug, user_content, system_prompt)
+
+    def _cached_query_response(
+        self, cache_key: str, apply_tts_cleaning: bool
+    ) -> QueryResponse | None:
+        """Return the cached answer for cache_key as a QueryResponse, if any."""
+        response = self.client.response_cache.get(cache_key)
+        if response is None:
+            return None
+        text_response = response.get("textResponse") or response.get("text", "")
+        if not text_response:
+            return None
+        _LOGGER.debug("Serving answer from response cache (key %s)", cache_key[:12])
+        if apply_tts_cleaning:
+            text_response = clean_response_for_tts(text_response)
+        return QueryResponse(response=response, text=text_response)
+
+    def _should_stream(self, user_content: str, chat_log: ChatLog) -> bool:
+        """Return True if this turn should use the stream-chat endpoint."""
+        if not self.options.get(CONF_ENABLE_STREAMING, DEFAULT_ENABLE_STREAMING):
+            return False
+        # @agent invocations run AnythingLLM's agent flow, which does not stream
+        # plain text chunks; keep those on the blocking endpoint.
+        if user_content.startswith("@agent "):
+            return False
+        return chat_log.delta_listener is not None
+
+    async def _async_stream_query(
+        self,
+        chat_log: ChatLog,
+        messages: list[dict],
+        workspace_override: str | None = None,
+        thread_override: str | None | bool = False,
+        apply_tts_cleaning: bool = True,
+        route: dict | None = None,
+    ) -> QueryResponse | None:
+        """Stream the reply into the ChatLog as delta content.
+
+        Returns None if the stream failed before any text was produced, so the
+        caller can retry on the blocking endpoint (which has retry/failover).
+        route, if given, receives the serving endpoint; after such a failure
+        it keeps it only if the endpoint itself failed, so the retry skips it.
+        """
+        params = self._chat_request_params(
+            workspace_override, thread_override, chat_log.conversation_id
+        )
+        raw_parts: list[str] = []
+        # Clean incrementally so TTS never speaks half-streamed markup.
+        cleaner = StreamingTTSCleaner() if apply_tts_cleaning else None
+        if route is None:
+            route = {}
+
+        async def _delta_stream():
+            yield {"role": "assistant"}
+            async for chunk in self.client.chat_completion_stream(
+                messages=messages, route=route, **params
+            ):
+                raw_parts.append(chunk)
+                if cleaner is not None:
+                    chunk = cleaner.feed(chunk)
+                if chunk:
+                    yield {"content": chunk}
+            if cleaner is not None and (remainder := cleaner.flush()):
+                yield {"content": remainder}
+
+        try:
+            async for _content in chat_log.async_add_delta_content_stream(
+                self.entity_id, _delta_stream()
+            ):
+                pass
+        except Exception as err:
+            if raw_parts:
+                raise
+            if not isinstance(err, EndpointUnavailableError):
+                # The endpoint answered; the blocking endpoint may still work there.
+                route.clear()
+            _LOGGER.warning(
+                "Streaming request failed before the first chunk, falling back to blocking chat: %s",
+                err,
+            )
+            return None
+
+        raw_text = "".join(raw_parts)
+        if not raw_text:
+            raise HomeAssistantError("Empty response from AnythingLLM")
+
+        text_response = cleaner.text if cleaner is not None else raw_text
+        return QueryResponse(
+            response={"type": "chat", "textResponse": raw_text, **route},
+            text=text_response,
+        )
+
+    async def query(
+        self,
+        user_input: conversation.ConversationInput,
+        messages: list[dict],
+        workspace_override: str | None = None,
+        thread_override: str | None | bool = False,
+        apply_tts_cleaning: bool = True,
+        conversation_id: str | None = None,
+        skip_endpoint: str | None = None,
+    ) -> QueryResponse:
+        """Process a sentence.
+
+        conversation_id is the chat log's; user_input's is None on the first turn.
+        skip_endpoint is an endpoint that already failed this turn.
+        """
+        params = self._chat_request_params(workspace_override, thread_override, conversation_id)
+
+        _LOGGER.info("Sending request to AnythingLLM workspace '%s' with %d messages", params["workspace_slug"], len(messages))
 
         # Call AnythingLLM API
         try:
             response = await self.client.chat_completion(
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                workspace_slug=workspace_slug if workspace_slug else None,
-                thread_slug=thread_slug if thread_slug else None,
-                failover_thread_slug=failover_thread_slug if failover_thread_slug else None,
-                failover_workspace_slug=failover_workspace_slug if failover_workspace_slug else None,
+                messages=messages, skip_endpoint=skip_endpoint, **params
             )
         except Exception as err:
             _LOGGER.error("Error from AnythingLLM: %s", err)
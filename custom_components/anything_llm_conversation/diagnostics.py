@@ -0,0 +1,39 @@
+"""Diagnostics support for AnythingLLM Conversation."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_API_KEY
+from homeassistant.core import HomeAssistant
+
+from . import AnythingLLMConfigEntry
+from .const import CONF_FAILOVER_API_KEY, DOMAIN
+from .helpers import persona_cache_stats
+
+TO_REDACT = {CONF_API_KEY, CONF_FAILOVER_API_KEY}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: AnythingLLMConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    subentries = {}
+    for subentry in entry.subentries.values():
+        subentries[subentry.subentry_id] = {
+            "title": subentry.title,
+            "subentry_type": subentry.subentry_type,
+            "options": async_redact_data(dict(subentry.data), TO_REDACT),
+        }
+        agent = hass.data.get(f"{DOMAIN}_entity_{subentry.subentry_id}")
+        if agent is not None:
+            subentries[subentry.subentry_id]["prompt_cache"] = agent.prompt_cache.stats
+            subentries[subentry.subentry_id]["local_answers"] = agent.local_answers.stats
+            subentries[subentry.subentry_id]["pipeline"] = agent.pipeline_stats.stats
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "subentries": subentries,
+        "client": entry.runtime_data.diagnostics(),
+        "persona_cache": persona_cache_stats(),
+    }
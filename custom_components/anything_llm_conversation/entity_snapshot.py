@@ -0,0 +1,92 @@
+"""Versioned snapshot of the exposed-entity rows embedded in system prompts."""
+
+import re
+
+# H2: also strip { and } to prevent Jinja2 expression injection from entity names
+# sourced from third-party integrations (Z-Wave, MQTT, cloud bridges).
+# Commas are stripped because entity data is embedded in CSV context blocks;
+# an unescaped comma in a device name would shift columns for the LLM.
+_RE_UNSAFE_PROMPT = re.compile(r'[\r\n\t`|{},]')
+
+
+def _sanitize_prompt_value(value: str) -> str:
+    """Strip control/structural characters from a value before prompt insertion."""
+    return _RE_UNSAFE_PROMPT.sub(' ', str(value)).strip()
+
+
+def build_entity_row(
+    entity_id: str, name: str, state: str, aliases: list[str] | set[str] | None
+) -> dict:
+    """Return the sanitized prompt row for one exposed entity.
+
+    Issue 12: name/state/aliases are sanitized before they're embedded in the
+    system prompt CSV. A device named with newlines or backtick characters
+    could escape the CSV context and inject prompt instructions.
+    """
+    return {
+        "entity_id": _sanitize_prompt_value(entity_id),
+        "name": _sanitize_prompt_value(name),
+        "state": _sanitize_prompt_value(state),
+        "aliases": [_sanitize_prompt_value(a) for a in aliases or ()],
+    }
+
+
+class EntitySnapshot:
+    """Exposed-entity rows keyed by entity_id, with a monotonic version.
+
+    Copy-on-write: rows are replaced, never mutated, and ``entities`` returns
+    an immutable tuple per version. A turn that read the snapshot keeps a
+    consistent view even while events produce newer versions, so one
+    snapshot can be shared by every agent. The version only moves when a
+    row's content actually changes.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty snapshot at version 0."""
+        self._rows: dict[str, dict] = {}
+        self.version = 0
+        self._view: tuple[dict, ...] = ()
+        self._view_version = 0
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self._rows)
+
+    def __contains__(self, entity_id: str) -> bool:
+        """Return True if entity_id has a row."""
+        return entity_id in self._rows
+
+    @property
+    def entities(self) -> tuple[dict, ...]:
+        """Return the rows for the current version; callers must not mutate them.
+
+        The tuple is built at most once per version, so repeated reads between
+        changes are O(1).
+        """
+        if self._view_version != self.version:
+            self._view = tuple(self._rows.values())
+            self._view_version = self.version
+        return self._view
+
+    def set_row(self, entity_id: str, row: dict) -> bool:
+        """Insert or replace the row for entity_id; return True if it changed."""
+        if self._rows.get(entity_id) == row:
+            return False
+        self._rows[entity_id] = row
+        self.version += 1
+        return True
+
+    def remove(self, entity_id: str) -> bool:
+        """Drop the row for entity_id; return True if there was one."""
+        if self._rows.pop(entity_id, None) is None:
+            return False
+        self.version += 1
+        return True
+
+    def replace_all(self, rows: dict[str, dict]) -> bool:
+        """Replace every row at once; return True if anything changed."""
+        if rows == self._rows and list(rows) == list(self._rows):
+            return False
+        self._rows = dict(rows)
+        self.version += 1
+        return True
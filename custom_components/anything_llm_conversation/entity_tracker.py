@@ -0,0 +1,178 @@
+"""Keep the exposed-entity snapshot current from Home Assistant events."""
+
+from __future__ import annotations
+
+import logging
+
+from homeassistant.components import conversation
+from homeassistant.components.homeassistant.exposed_entities import (
+    async_listen_entity_updates,
+    async_should_expose,
+)
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN
+from .entity_snapshot import EntitySnapshot, build_entity_row
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_ENTITY_TRACKER = f"{DOMAIN}_entity_tracker"
+
+
+@callback
+def async_get_entity_tracker(hass: HomeAssistant) -> ExposedEntityTracker:
+    """Return the tracker shared by every config entry and agent on this hass."""
+    tracker = hass.data.get(DATA_ENTITY_TRACKER)
+    if tracker is None:
+        tracker = hass.data[DATA_ENTITY_TRACKER] = ExposedEntityTracker(hass)
+    return tracker
+
+
+class ExposedEntityTracker:
+    """Maintain an EntitySnapshot of conversation-exposed entities.
+
+    One full scan happens on start (and when exposure settings change); after
+    that every state_changed or entity-registry event rebuilds only the row of
+    the entity it is about, so reading the snapshot on a turn costs nothing.
+
+    A single instance per hass is shared through async_get_entity_tracker.
+    Each config entry holds a reference via async_acquire/async_release; the
+    tracker listens to events only while at least one reference is held.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the tracker; call async_start to begin tracking."""
+        self.hass = hass
+        self.snapshot = EntitySnapshot()
+        # entity_id -> async_should_expose result, so state changes of
+        # unexposed entities are dropped without re-checking exposure.
+        self._exposed: dict[str, bool] = {}
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self._refs = 0
+
+    @property
+    def version(self) -> int:
+        """Return the snapshot version; it increases on every content change."""
+        return self.snapshot.version
+
+    @property
+    def entities(self) -> tuple[dict, ...]:
+        """Return the current exposed-entity rows (read-only)."""
+        if not self._unsubs:
+            # Not tracking events (yet): fall back to a fresh scan.
+            self._async_rebuild()
+        return self.snapshot.entities
+
+    @callback
+    def async_acquire(self) -> None:
+        """Take a reference, starting the tracker on the first one."""
+        self._refs += 1
+        if self._refs == 1:
+            self.async_start()
+
+    @callback
+    def async_release(self) -> None:
+        """Drop a reference, stopping the tracker when the last one goes."""
+        self._refs -= 1
+        if self._refs <= 0:
+            self._refs = 0
+            self.async_stop()
+            if self.hass.data.get(DATA_ENTITY_TRACKER) is self:
+                del self.hass.data[DATA_ENTITY_TRACKER]
+
+    @callback
+    def async_start(self) -> None:
+        """Build the snapshot and subscribe to the events that change it."""
+        if self._unsubs:
+            return
+        self._async_rebuild()
+        self._unsubs = [
+            self.hass.bus.async_listen(EVENT_STATE_CHANGED, self._async_on_state_changed),
+            self.hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_on_registry_updated
+            ),
+            async_listen_entity_updates(
+                self.hass, conversation.DOMAIN, self._async_on_exposure_updated
+            ),
+        ]
+
+    @callback
+    def async_stop(self) -> None:
+        """Unsubscribe from all events."""
+        while self._unsubs:
+            self._unsubs.pop()()
+
+    @callback
+    def _async_rebuild(self) -> None:
+        """Rescan every state; used on start and when exposure settings change."""
+        self._exposed.clear()
+        rows: dict[str, dict] = {}
+        # Issue 20: fetch the backing dict once and do O(1) dict lookups per entity
+        # instead of calling async_get() (a method with lookup overhead) N times.
+        reg_entries = er.async_get(self.hass).entities
+        for state in self.hass.states.async_all():
+            if self._is_exposed(state.entity_id):
+                rows[state.entity_id] = self._build_row(state, reg_entries)
+        if self.snapshot.replace_all(rows):
+            _LOGGER.debug(
+                "Exposed entity snapshot rebuilt: %d entities (version %d)",
+                len(rows),
+                self.snapshot.version,
+            )
+
+    @callback
+    def _async_refresh(self, entity_id: str, state: State | None) -> None:
+        """Rebuild the single row for entity_id from its current state."""
+        if state is None or not self._is_exposed(entity_id):
+            self.snapshot.remove(entity_id)
+            return
+        self.snapshot.set_row(
+            entity_id, self._build_row(state, er.async_get(self.hass).entities)
+        )
+
+    @callback
+    def _async_on_state_changed(self, event: Event[EventStateChangedData]) -> None:
+        entity_id = event.data["entity_id"]
+        new_state = event.data["new_state"]
+        if new_state is None:
+            self._exposed.pop(entity_id, None)
+        self._async_refresh(entity_id, new_state)
+
+    @callback
+    def _async_on_registry_updated(
+        self, event: Event[er.EventEntityRegistryUpdatedData]
+    ) -> None:
+        # Aliases and per-entity exposure live in the registry entry.
+        entity_id = event.data["entity_id"]
+        old_entity_id = event.data.get("old_entity_id")
+        if old_entity_id:
+            self._exposed.pop(old_entity_id, None)
+            self.snapshot.remove(old_entity_id)
+        self._exposed.pop(entity_id, None)
+        self._async_refresh(entity_id, self.hass.states.get(entity_id))
+
+    @callback
+    def _async_on_exposure_updated(self) -> None:
+        self._async_rebuild()
+
+    def _is_exposed(self, entity_id: str) -> bool:
+        exposed = self._exposed.get(entity_id)
+        if exposed is None:
+            exposed = async_should_expose(self.hass, conversation.DOMAIN, entity_id)
+            self._exposed[entity_id] = exposed
+        return exposed
+
+    @staticmethod
+    def _build_row(state: State, reg_entries) -> dict:
+        entity = reg_entries.get(state.entity_id)
+        aliases = entity.aliases if entity and entity.aliases else []
+        return build_entity_row(state.entity_id, state.name, state.state, aliases)
@@ -1,24 +1,53 @@
 """Helper functions for AnythingLLM Conversation component."""
 
 import asyncio
+import functools
+import hashlib
 import logging
-from typing import Callable
+import time
+from collections.abc import AsyncIterator
+from typing import Any, Callable
 
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.httpx_client import get_async_client
+from homeassistant.util import dt as dt_util
 
 from .const import (
     CONF_HEALTH_CHECK_TIMEOUT,
     CONF_CHAT_TIMEOUT,
     DEFAULT_HEALTH_CHECK_TIMEOUT,
     DEFAULT_CHAT_TIMEOUT,
+    DEFAULT_FAILOVER_WORKSPACE_SLUG,
+    DEFAULT_BREAKER_FAILURE_THRESHOLD,
+    DEFAULT_BREAKER_RECOVERY_TIMEOUT,
+    DEFAULT_HEDGE_DELAY,
+    DEFAULT_MAX_HEDGED_REQUESTS,
+    DEEP_PROBE_DEGRADED_AFTER,
+    DEEP_PROBE_INTERVAL,
+    DEEP_PROBE_TIMEOUT,
+    HEDGE_MAX_DELAY,
+    HEDGE_MIN_DELAY,
+    HEDGE_MIN_SAMPLES,
+    HEALTH_IDLE_SUSPEND,
+    HEALTH_PROBE_BACKOFF_BASE,
+    HEALTH_PROBE_BACKOFF_MAX,
+    HEALTH_PROBE_INTERVAL,
+    HEALTH_SAVE_DELAY,
+    HEALTH_STATE_MAX_AGE,
+    ROUTING_AFFINITY_CONVERSATION,
+    ROUTING_AFFINITY_OFF,
 )
+from .brownout import BrownoutDetector, LatencySLOs
+from .consistent_hash import AffinityRouter, routing_key
+from .keep_warm import KeepWarmScheduler
+from .load_balancer import LoadBalancer
 from .mode_patterns import (
     MODE_KEYWORDS,
     MODE_QUERY_KEYWORDS,
-    _MODE_PATTERN_REGEXES,
+    MODE_SUGGESTION_PATTERNS,
     MODE_SUGGESTION_THRESHOLD,
+    MODE_TO_WORKSPACE,
 )
 from .modes import (
     PROMPT_MODES,
@@ -27,20 +56,37 @@ from .modes import (
     get_workspace_prompt_config,
     get_workspace_display_name,
 )
+from .pattern_automaton import PatternAutomaton
+from .resilience import (
+    BREAKER_CLOSED,
+    CircuitBreaker,
+    HealthProbeScheduler,
+    LatencyTracker,
+    SingleFlight,
+)
+from .response_cache import ResponseCache
+from .response_processor import parse_stream_event
+from .workspace_catalog import WorkspaceCatalog
+from .workspace_warmer import WARMUP_STARTED, WorkspaceWarmer
 
 _LOGGER = logging.getLogger(__name__)
 
+# Longest the keep-warm loop sleeps, so window changes are noticed in time.
+_KEEP_WARM_POLL = 60.0
+# Warm-up and keep-warm chats are partitioned into their own API sessions,
+# away from the workspace's regular chat history; AnythingLLM still logs
+# them, so these IDs make them easy to filter out.
+_KEEP_WARM_SESSION = "home-assistant-keep-warm"
+_WARMUP_SESSION = "home-assistant-warm-up"
+_DEEP_PROBE_SESSION = "home-assistant-deep-probe"
+
+
+class EndpointUnavailableError(HomeAssistantError):
+    """An AnythingLLM endpoint failed in a way that counts against its breaker."""
+
 
-# Legacy mode keys now map to workspace slugs.
-MODE_TO_WORKSPACE = {
-    "analysis": "analysis",
-    "research": "research",
-    "security": "security",
-    "code_review": "investigation",
-    "troubleshooting": "investigation",
-    "guest": "default",
-    "default": "default",
-}
+class WorkspaceNotFoundError(HomeAssistantError):
+    """The requested AnythingLLM workspace does not exist (HTTP 404)."""
 
 
 def detect_mode_switch(user_input: str) -> str | None:
@@ -65,6 +111,17 @@ def is_mode_query(user_input: str) -> bool:
     return any(keyword in input_lower for keyword in MODE_QUERY_KEYWORDS)
 
 
+# All suggestion patterns in one Aho-Corasick automaton: one linear, word-boundary
+# aware pass yields the hit count of every mode.
+_MODE_PATTERN_AUTOMATON = PatternAutomaton(MODE_SUGGESTION_PATTERNS)
+
+
+@functools.lru_cache(maxsize=64)
+def _mode_pattern_counts(input_lower: str) -> tuple[tuple[str, int], ...]:
+    """Return (mode, hits) pairs for a normalized input; memoized for repeats."""
+    return tuple(_MODE_PATTERN_AUTOMATON.count(input_lower).items())
+
+
 def detect_suggested_modes(user_input: str, current_mode: str) -> list[str]:
     """Detect which modes might be relevant based on query patterns.
     
@@ -80,16 +137,13 @@ def detect_suggested_modes(user_input: str, current_mode: str) -> list[str]:
     """
     input_lower = user_input.lower().strip()
     mode_scores = {}
-    # Issue 18: use pre-compiled regex per mode — single scan instead of N `in` checks.
-    for mode_key, pattern_re in _MODE_PATTERN_REGEXES.items():
+    for mode_key, match_count in _mode_pattern_counts(input_lower):
         suggested_workspace = MODE_TO_WORKSPACE.get(mode_key, mode_key)
 
         # Skip current workspace - don't suggest switching to same target
         if suggested_workspace == current_mode:
             continue
 
-        match_count = len(pattern_re.findall(input_lower))
-
         if match_count >= MODE_SUGGESTION_THRESHOLD:
             mode_scores[suggested_workspace] = mode_scores.get(suggested_workspace, 0) + match_count
     
@@ -120,6 +174,33 @@ def should_apply_tts_cleaning_for_workspace(workspace_slug: str | None) -> bool:
     return workspace_config.get("apply_tts_cleaning", True)
 
 
+@functools.lru_cache(maxsize=32)
+def _expand_custom_persona(mode_key: str, custom_base_persona: str) -> str:
+    """Fill the mode placeholders of a custom base persona (memoized by mode and text)."""
+    mode_data = MODE_BEHAVIORS.get(mode_key)
+    if not mode_data:
+        return custom_base_persona
+
+    # Build mode names for switching instructions
+    other_modes = [f'"{m["name"].lower()}"' for k, m in MODE_BEHAVIORS.items() if k != mode_key]
+    if len(other_modes) > 1:
+        mode_names_text = ", ".join(other_modes[:-1]) + f", or {other_modes[-1]}"
+    else:
+        mode_names_text = other_modes[0] if other_modes else ""
+
+    # Use simple string replacement instead of .format() to avoid conflicts with Jinja2 syntax
+    result = custom_base_persona.replace("{mode_specific_behavior}", mode_data["behavior"])
+    result = result.replace("{mode_names}", mode_names_text)
+    result = result.replace("{mode_display_name}", mode_data["name"])
+    return result
+
+
+def persona_cache_stats() -> dict[str, int]:
+    """Return hit/miss counts of the custom persona expansion cache."""
+    info = _expand_custom_persona.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "entries": info.currsize}
+
+
 def get_mode_prompt(mode_key: str, custom_base_persona: str | None = None) -> str:
     """Get the system prompt for a mode key.
     
@@ -132,27 +213,30 @@ def get_mode_prompt(mode_key: str, custom_base_persona: str | None = None) -> st
     """
     # If custom base provided, rebuild the prompt with it
     if custom_base_persona:
-        mode_data = MODE_BEHAVIORS.get(mode_key)
-        if not mode_data:
-            return custom_base_persona
-        
-        # Build mode names for switching instructions
-        other_modes = [f'"{m["name"].lower()}"' for k, m in MODE_BEHAVIORS.items() if k != mode_key]
-        if len(other_modes) > 1:
-            mode_names_text = ", ".join(other_modes[:-1]) + f", or {other_modes[-1]}"
-        else:
-            mode_names_text = other_modes[0] if other_modes else ""
-        
-        # Use simple string replacement instead of .format() to avoid conflicts with Jinja2 syntax
-        result = custom_base_persona.replace("{mode_specific_behavior}", mode_data["behavior"])
-        result = result.replace("{mode_names}", mode_names_text)
-        result = result.replace("{mode_display_name}", mode_data["name"])
-        return result
-    
+        return _expand_custom_persona(mode_key, custom_base_persona)
+
     # Use pre-built prompt from PROMPT_MODES
     return PROMPT_MODES.get(mode_key, PROMPT_MODES["default"]).get("system_prompt", "")
 
 
+def _system_prompt(messages: list[dict]) -> str | None:
+    """Return the content of the first system message, if any."""
+    for msg in messages:
+        if msg.get("role") == "system":
+            return msg.get("content")
+    return None
+
+
+def _url_workspace(base_url: str, chat_url: str) -> str:
+    """Return the workspace slug of a chat URL built by _prepare_chat_request."""
+    return chat_url.removeprefix(f"{base_url}/v1/workspace/").split("/", 1)[0]
+
+
+def _url_is_thread(base_url: str, chat_url: str) -> bool:
+    """Return True if a chat URL built by _prepare_chat_request targets a thread."""
+    return "/thread/" in chat_url.removeprefix(f"{base_url}/v1/workspace/")
+
+
 class AnythingLLMClient:
     """AnythingLLM API client."""
 
@@ -169,8 +253,17 @@ class AnythingLLMClient:
         enable_health_check: bool = True,
         health_check_timeout: float = DEFAULT_HEALTH_CHECK_TIMEOUT,
         chat_timeout: float = DEFAULT_CHAT_TIMEOUT,
+        deep_probe_workspace: str | None = None,
+        endpoints: list[tuple[str, str, str, str, dict[str, str]]] | None = None,
+        load_balancing: bool = False,
+        routing_affinity: str = ROUTING_AFFINITY_OFF,
     ):
-        """Initialize AnythingLLM client."""
+        """Initialize AnythingLLM client.
+
+        endpoints lists the pool endpoints after primary and failover as
+        (name, title, base_url, api_key, workspace_map) tuples, where
+        workspace_map maps primary workspace slugs to the endpoint's own.
+        """
         self.hass = hass
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
@@ -182,20 +275,196 @@ class AnythingLLMClient:
         self.enable_health_check = enable_health_check
         self.health_check_timeout = health_check_timeout
         self.chat_timeout = chat_timeout
+        # Canary workspace for deep probes that go through the LLM; None
+        # limits probes to the API server.
+        self.deep_probe_workspace = deep_probe_workspace or None
+        # Further endpoints that mirror the primary's workspaces; tried after
+        # primary and failover, or balanced with them when load_balancing.
+        self._pool: dict[str, tuple[str, str, str, dict[str, str]]] = {
+            name: (title, pool_url.rstrip("/"), pool_key, dict(workspace_map))
+            for name, title, pool_url, pool_key, workspace_map in endpoints or ()
+        }
+        self.load_balancing = load_balancing
+        # Keep a conversation (or workspace) on the endpoint whose caches are
+        # already warm for it; see _endpoint_order.
+        self.routing_affinity = routing_affinity
+        self._affinity = AffinityRouter()
         self.http_client = get_async_client(hass)
         self.using_failover = False
 
-        # Cached health state — updated by background task, never blocks a request.
-        # None means "not yet checked"; True/False = last known result.
-        self._primary_healthy: bool | None = None
-        self._health_check_interval: float = 30.0  # seconds between background checks
         self._health_task: asyncio.Task | None = None
         self._health_stop: asyncio.Event = asyncio.Event()
-        # Callbacks notified whenever _primary_healthy changes (e.g. binary sensor).
+        # Set to re-evaluate the probe schedule early (activity, passive failure).
+        self._health_wakeup: asyncio.Event = asyncio.Event()
+        # Callbacks notified whenever an endpoint's health or a breaker state
+        # changes (e.g. binary sensors).
         self._health_listeners: list[Callable[[bool | None], None]] = []
+        self._last_breaker_states: dict[str, str] = {}
+        self._last_health: dict[str, bool | None] = {}
+        self._last_degraded: dict[str, bool] = {}
+        self._last_brownout: dict[str, bool] = {}
+        # Last known health, breakers and latency survive restarts here;
+        # attached in async_setup_entry.
+        self._health_store: Any = None
+
+        # One circuit breaker per endpoint, driven by real chat outcomes.
+        self._breakers: dict[str, CircuitBreaker] = {
+            "primary": CircuitBreaker(
+                DEFAULT_BREAKER_FAILURE_THRESHOLD,
+                DEFAULT_BREAKER_RECOVERY_TIMEOUT,
+                on_change=self._on_breaker_change,
+            ),
+        }
+        if self.failover_base_url and self.failover_api_key:
+            self._breakers["failover"] = CircuitBreaker(
+                DEFAULT_BREAKER_FAILURE_THRESHOLD,
+                DEFAULT_BREAKER_RECOVERY_TIMEOUT,
+                on_change=self._on_breaker_change,
+            )
+        for name in self._pool:
+            self._breakers[name] = CircuitBreaker(
+                DEFAULT_BREAKER_FAILURE_THRESHOLD,
+                DEFAULT_BREAKER_RECOVERY_TIMEOUT,
+                on_change=self._on_breaker_change,
+            )
+
+        # Cached health per endpoint — updated from real chat outcomes and by
+        # the background probe, never blocks a request. Each endpoint's
+        # HealthProbeScheduler holds its state: None means "not yet checked",
+        # True/False the last known result. Probes only fill the gaps real
+        # traffic leaves; with a canary workspace some of them are deep.
+        self._health: dict[str, HealthProbeScheduler] = {
+            name: HealthProbeScheduler(
+                HEALTH_PROBE_INTERVAL,
+                HEALTH_PROBE_BACKOFF_BASE,
+                HEALTH_PROBE_BACKOFF_MAX,
+                HEALTH_IDLE_SUSPEND,
+                deep_interval=DEEP_PROBE_INTERVAL if self.deep_probe_workspace else None,
+                degraded_after=DEEP_PROBE_DEGRADED_AFTER,
+            )
+            for name in self._breakers
+        }
+
+        # Per-endpoint latency of successful chats; drives the hedge delay.
+        self._latency: dict[str, LatencyTracker] = {
+            name: LatencyTracker() for name in self._breakers
+        }
+        self._hedges_in_flight = 0
+        self._hedges_sent = 0
+        self._hedges_won = 0
+        # Latency against each workspace's SLO, registered by the agents; an
+        # endpoint in sustained brownout loses its traffic to a failover that
+        # keeps up.
+        self.latency_slos = LatencySLOs()
+        self._brownout: dict[str, BrownoutDetector] = {
+            name: BrownoutDetector() for name in self._breakers
+        }
+        # Outstanding requests and EWMA latency per endpoint, for balancing.
+        self._load = LoadBalancer()
+
+        # Identical concurrent workspace chats share one in-flight request.
+        self._singleflight = SingleFlight()
+        # Opt-in per workspace; consulted by the conversation agent before
+        # chat_completion. The disk tier is attached in async_setup_entry.
+        self.response_cache = ResponseCache()
+        # Workspace slugs on the primary endpoint, for validating switches, plus
+        # a negative cache of slugs that returned 404.
+        self.workspace_catalog = WorkspaceCatalog()
+        # Per endpoint, since a pool endpoint or the failover may still have a
+        # workspace the primary lost; only the primary's list is ever loaded.
+        self._catalogs: dict[str, WorkspaceCatalog] = {
+            name: self.workspace_catalog if name == "primary" else WorkspaceCatalog()
+            for name in self._breakers
+        }
+        # Background warm-ups of workspaces the next question is likely to use.
+        self.workspace_warmer = WorkspaceWarmer()
+        self._warmup_tasks: set[asyncio.Task] = set()
+        # Periodic minimal chats that keep the models of selected workspaces
+        # loaded; real traffic to a workspace postpones its next one.
+        self.keep_warm = KeepWarmScheduler()
+        self._keep_warm_task: asyncio.Task | None = None
+        self._keep_warm_wakeup: asyncio.Event = asyncio.Event()
+
+    @property
+    def endpoint_titles(self) -> dict[str, str]:
+        """Return a display name per endpoint ("primary", "failover" or the pool title)."""
+        return {
+            name: self._pool[name][0] if name in self._pool else name
+            for name in self._breakers
+        }
+
+    @property
+    def breaker_states(self) -> dict[str, str]:
+        """Return the circuit breaker state per endpoint, in pool order."""
+        return {name: breaker.state for name, breaker in self._breakers.items()}
+
+    @property
+    def _primary_healthy(self) -> bool | None:
+        """Return the cached primary health (None until first checked)."""
+        return self._health["primary"].healthy
+
+    @property
+    def endpoint_health(self) -> dict[str, bool | None]:
+        """Return the cached health per endpoint (None until first checked)."""
+        return {name: health.healthy for name, health in self._health.items()}
+
+    @property
+    def endpoint_degraded(self) -> dict[str, bool]:
+        """Return whether each endpoint's LLM answered its last deep probe slowly."""
+        return {name: health.degraded for name, health in self._health.items()}
+
+    @property
+    def endpoint_brownout(self) -> dict[str, bool]:
+        """Return whether each endpoint is in a latency brownout."""
+        return {name: detector.active for name, detector in self._brownout.items()}
+
+    @property
+    def probe_latency(self) -> dict[str, float | None]:
+        """Return the latest health probe latency in seconds per endpoint."""
+        return {name: health.probe_latency for name, health in self._health.items()}
+
+    @property
+    def latency_p95(self) -> dict[str, float | None]:
+        """Return the p95 chat latency in seconds per endpoint (None without samples)."""
+        return {name: tracker.percentile(95) for name, tracker in self._latency.items()}
+
+    def diagnostics(self) -> dict:
+        """Return runtime counters for the diagnostics download."""
+        return {
+            "endpoint_health": self.endpoint_health,
+            "health_probes": {name: health.stats for name, health in self._health.items()},
+            "using_failover": self.using_failover,
+            "breaker_states": self.breaker_states,
+            "latency_p95": self.latency_p95,
+            "latency_slos": self.latency_slos.stats,
+            "load_balancing": self.load_balancing,
+            "endpoint_load": self._load.stats(list(self._breakers)),
+            "routing_affinity": {"mode": self.routing_affinity, **self._affinity.stats},
+            "brownout": {name: detector.stats for name, detector in self._brownout.items()},
+            "hedges": {
+                "sent": self._hedges_sent,
+                "won": self._hedges_won,
+                "in_flight": self._hedges_in_flight,
+            },
+            "coalesced_requests": self._singleflight.coalesced,
+            "response_cache": self.response_cache.stats,
+            "workspace_catalog": self.workspace_catalog.stats,
+            "workspace_warmups": self.workspace_warmer.stats,
+            "keep_warm": self.keep_warm.stats,
+        }
+
+    def _on_breaker_change(self) -> None:
+        """Notify listeners and persist health after a breaker state change."""
+        self._notify_health_listeners()
+        self._schedule_health_save()
+
+    def _notify_health_listeners(self) -> None:
+        """Invoke every registered health listener with the current primary state."""
+        for cb in list(self._health_listeners):
+            cb(self._primary_healthy)
 
     def add_health_listener(self, callback: Callable[[bool | None], None]) -> None:
-        """Register a callback invoked whenever _primary_healthy changes."""
+        """Register a callback invoked whenever endpoint health or a breaker state changes."""
         self._health_listeners.append(callback)
 
     def remove_health_listener(self, callback: Callable[[bool | None], None]) -> None:
@@ -216,51 +485,225 @@ class AnythingLLMClient:
         _LOGGER.debug("Health monitor started for %s", self.base_url)
 
     def stop_health_monitor(self) -> None:
-        """Stop the background health-check loop."""
+        """Stop the background health-check loop and pending warm-ups."""
         self._health_stop.set()
         if self._health_task and not self._health_task.done():
             self._health_task.cancel()
+        for task in list(self._warmup_tasks):
+            task.cancel()
         _LOGGER.debug("Health monitor stopped for %s", self.base_url)
 
     async def _health_monitor_loop(self) -> None:
-        """Periodically check endpoint health and cache the result."""
+        """Probe endpoint health whenever an endpoint's schedule says so."""
         while not self._health_stop.is_set():
-            await self._refresh_health()
+            delays = {name: health.next_probe_in() for name, health in self._health.items()}
+            due = [name for name, delay in delays.items() if delay == 0]
+            if due:
+                await self._refresh_health(due)
+                if self._primary_healthy:
+                    await self.async_refresh_workspaces()
+                continue
+            # None: every endpoint is suspended until activity wakes the loop.
+            pending = [delay for delay in delays.values() if delay is not None]
+            delay = min(pending) if pending else None
+            self._health_wakeup.clear()
             try:
-                await asyncio.wait_for(
-                    asyncio.shield(asyncio.ensure_future(self._health_stop.wait())),
-                    timeout=self._health_check_interval,
-                )
+                await asyncio.wait_for(self._health_wakeup.wait(), timeout=delay)
             except asyncio.TimeoutError:
-                pass  # Normal — interval elapsed, run next check
+                pass  # Normal — the next probe is due
             except asyncio.CancelledError:
                 break
 
-    async def _refresh_health(self) -> None:
-        """Run a single health check and update cached state."""
-        primary_healthy = await self._check_endpoint_health(self.base_url, self.api_key)
-        previous = self._primary_healthy
-        if primary_healthy:
-            if self.using_failover:
+    def note_activity(self) -> None:
+        """Record conversation activity; resumes probing after an idle period."""
+        suspended = any(health.suspended for health in self._health.values())
+        for health in self._health.values():
+            health.note_activity()
+        if suspended:
+            self._health_wakeup.set()
+
+    def _record_passive_health(self, endpoint: str, healthy: bool) -> None:
+        """Feed the outcome of a real chat request into the endpoint's health.
+
+        Success marks the endpoint healthy at once. Failures only mark it
+        unhealthy once its circuit breaker has opened, so a single timeout
+        does not move traffic to the other endpoint.
+        """
+        if not healthy and self._breakers[endpoint].state == BREAKER_CLOSED:
+            self.note_activity()
+            return
+        self._health[endpoint].record_passive(healthy)
+        self._update_health()
+        # A down endpoint is probed on the backoff schedule from now on.
+        self._health_wakeup.set()
+
+    @property
+    def _endpoints(self) -> dict[str, tuple[str, str]]:
+        """Return (base_url, api_key) per configured endpoint."""
+        endpoints = {"primary": (self.base_url, self.api_key)}
+        if "failover" in self._breakers:
+            endpoints["failover"] = (self.failover_base_url, self.failover_api_key)
+        for name, (_title, pool_url, pool_key, _workspace_map) in self._pool.items():
+            endpoints[name] = (pool_url, pool_key)
+        return endpoints
+
+    async def _refresh_health(self, endpoints: list[str]) -> None:
+        """Probe the given endpoints concurrently and update cached state."""
+        await asyncio.gather(*(self._probe_endpoint(name) for name in endpoints))
+        self._update_health()
+
+    async def _probe_endpoint(self, name: str) -> None:
+        """Probe one endpoint's API and, when due, its LLM through the canary."""
+        health = self._health[name]
+        base_url, api_key = self._endpoints[name]
+        healthy, seconds = await self._check_endpoint_health(base_url, api_key)
+        health.record_probe(healthy, seconds)
+        if healthy and health.deep_probe_due():
+            # Pool endpoints may name the canary differently, as they do any
+            # workspace; the failover is expected to have the canary itself.
+            canary = self.deep_probe_workspace
+            if name in self._pool:
+                canary = self._endpoint_workspace(name, canary)
+            answered, seconds = await self._deep_probe(base_url, api_key, canary)
+            health.record_deep_probe(answered, seconds)
+            if answered:
+                self._record_slo_latency(name, self.deep_probe_workspace, seconds)
+
+    def _record_slo_latency(self, endpoint: str, workspace_slug: str | None, seconds: float) -> None:
+        """Feed a latency into the endpoint's brownout window if the workspace has an SLO."""
+        slo = self.latency_slos.get(workspace_slug)
+        if slo is not None:
+            self._brownout[endpoint].record(seconds, slo)
+
+    def _degradation(self, endpoint: str) -> str | None:
+        """Return why an endpoint that answers is too slow to prefer, if it is."""
+        health = self._health[endpoint]
+        if health.degraded:
+            return f"deep probe took {health.deep_latency or 0.0:.1f} s"
+        detector = self._brownout[endpoint]
+        if detector.active:
+            return f"latency brownout at {detector.score or 0.0:.1f}x its SLO"
+        return None
+
+    def _prefer_failover(self) -> bool:
+        """Return True if the failover should be tried first.
+
+        That is while the primary is known to be down and the failover is
+        not also known to be down, or while the primary is degraded or in
+        brownout and the failover is known to be healthy and neither.
+        """
+        if "failover" not in self._health:
+            return False
+        primary = self._health["primary"]
+        failover = self._health["failover"]
+        if primary.healthy is False:
+            return failover.healthy is not False
+        return (
+            self._degradation("primary") is not None
+            and failover.healthy is True
+            and self._degradation("failover") is None
+        )
+
+    def _update_health(self) -> None:
+        """Re-evaluate failover from cached endpoint health and notify listeners."""
+        primary = self._health["primary"].healthy
+        for detector in self._brownout.values():
+            detector.update()
+        use_failover = self._prefer_failover()
+        if use_failover != self.using_failover:
+            if use_failover and primary is False:
+                _LOGGER.warning("Primary endpoint unavailable, switching to failover")
+            elif use_failover:
+                _LOGGER.warning(
+                    "Primary endpoint degraded (%s), switching to failover",
+                    self._degradation("primary"),
+                )
+            elif primary and self._degradation("primary") is None:
                 _LOGGER.info("Primary endpoint is back online, switching from failover")
-                self.using_failover = False
-            self._primary_healthy = True
-        else:
-            self._primary_healthy = False
-            if self.failover_base_url and self.failover_api_key:
-                if not self.using_failover:
-                    _LOGGER.warning("Primary endpoint unavailable, switching to failover")
-                    self.using_failover = True
+            elif primary:
+                _LOGGER.warning("Failover endpoint no longer healthy, switching back to degraded primary")
             else:
-                _LOGGER.warning("Primary endpoint unavailable and no failover configured")
+                _LOGGER.warning("Failover endpoint unavailable too, switching back to primary")
+            self.using_failover = use_failover
+        if primary is False and len(self._health) == 1:
+            _LOGGER.warning("Primary endpoint unavailable and no failover configured")
+
+        # Notify listeners when health or breaker state changes so UI updates
+        # immediately (open → half_open is time-based and only seen on read).
+        health = self.endpoint_health
+        degraded = self.endpoint_degraded
+        brownout = self.endpoint_brownout
+        breaker_states = self.breaker_states
+        if (
+            health != self._last_health
+            or degraded != self._last_degraded
+            or brownout != self._last_brownout
+            or breaker_states != self._last_breaker_states
+        ):
+            self._last_health = health
+            self._last_degraded = degraded
+            self._last_brownout = brownout
+            self._last_breaker_states = breaker_states
+            self._notify_health_listeners()
+        self._schedule_health_save()
+
+    async def async_attach_health_store(self, store: Any) -> None:
+        """Persist endpoint health to store and restore the last known state.
+
+        Call before start_health_monitor. Saved state is ignored when it is
+        older than HEALTH_STATE_MAX_AGE or was saved for a different URL.
+        Restored endpoints are still probed as soon as the monitor starts.
+        """
+        self._health_store = store
+        data = await store.async_load() or {}
+        elapsed = time.time() - data.get("saved_at", 0.0)
+        if not 0 <= elapsed <= HEALTH_STATE_MAX_AGE:
+            return
+        urls = self._endpoints
+        for name, saved in data.get("endpoints", {}).items():
+            if name not in urls or saved.get("base_url") != urls[name][0]:
+                continue
+            self._health[name].restore(
+                saved.get("healthy"), saved.get("probe_latency"), saved.get("degraded", False)
+            )
+            self._breakers[name].restore(saved.get("breaker", {}), elapsed)
+            for seconds in saved.get("latency", []):
+                self._latency[name].record(seconds)
+        self._last_health = self.endpoint_health
+        self._last_degraded = self.endpoint_degraded
+        self._last_breaker_states = self.breaker_states
+        self.using_failover = self._prefer_failover()
+        _LOGGER.debug(
+            "Restored endpoint health for %s from %.0f s ago: %s",
+            self.base_url,
+            elapsed,
+            self._last_health,
+        )
 
-        # Notify listeners when health status changes so UI updates immediately.
-        if self._primary_healthy != previous:
-            for cb in list(self._health_listeners):
-                cb(self._primary_healthy)
+    def _schedule_health_save(self) -> None:
+        if self._health_store is not None:
+            self._health_store.async_delay_save(self._health_data_to_save, HEALTH_SAVE_DELAY)
 
-    async def _check_endpoint_health(self, base_url: str, api_key: str) -> bool:
-        """Probe an AnythingLLM endpoint. Returns True if reachable."""
+    def _health_data_to_save(self) -> dict:
+        urls = self._endpoints
+        return {
+            "saved_at": time.time(),
+            "endpoints": {
+                name: {
+                    "base_url": urls[name][0],
+                    "healthy": health.healthy,
+                    "probe_latency": health.probe_latency,
+                    "degraded": health.degraded,
+                    "breaker": self._breakers[name].snapshot(),
+                    "latency": self._latency[name].samples,
+                }
+                for name, health in self._health.items()
+            },
+        }
+
+    async def _check_endpoint_health(self, base_url: str, api_key: str) -> tuple[bool, float]:
+        """Probe an AnythingLLM endpoint. Returns (reachable, seconds taken)."""
+        started = time.monotonic()
         try:
             health_url = f"{base_url}/v1/system"
             response = await self.http_client.get(
@@ -268,43 +711,341 @@ class AnythingLLMClient:
                 headers={"Authorization": f"Bearer {api_key}"},
                 timeout=self.health_check_timeout,
             )
-            return response.status_code in (200, 401, 403)
+            healthy = response.status_code in (200, 401, 403)
         except Exception as err:
             _LOGGER.debug("Health check failed for %s: %s", base_url, err)
-            return False
+            healthy = False
+        return healthy, time.monotonic() - started
+
+    async def _deep_probe(
+        self, base_url: str, api_key: str, canary: str
+    ) -> tuple[bool | None, float]:
+        """Send a tiny chat to the canary workspace. Returns (answered, seconds taken).
+
+        answered is None if the server rejected the request itself (e.g. the
+        canary workspace does not exist), which says nothing about the LLM.
+        """
+        started = time.monotonic()
+        try:
+            response = await self.http_client.post(
+                f"{base_url}/v1/workspace/{canary}/chat",
+                json={"message": "ping", "mode": "chat", "sessionId": _DEEP_PROBE_SESSION},
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=min(self.chat_timeout, DEEP_PROBE_TIMEOUT),
+            )
+            if response.is_success:
+                body = response.json()
+                answered = bool(body.get("textResponse")) and not body.get("error")
+            elif response.status_code < 500 and response.status_code != 429:
+                _LOGGER.warning(
+                    "Deep probe of canary workspace %s on %s rejected: HTTP %s",
+                    canary,
+                    base_url,
+                    response.status_code,
+                )
+                answered = None
+            else:
+                answered = False
+        except Exception as err:
+            _LOGGER.debug("Deep probe failed for %s: %s", base_url, err)
+            answered = False
+        seconds = time.monotonic() - started
+        _LOGGER.debug("Deep probe of %s: answered=%s in %.2f s", base_url, answered, seconds)
+        return answered, seconds
+
+    @property
+    def workspaces_refreshable(self) -> bool:
+        """Return True if the workspace list is stale and the primary may answer a refresh."""
+        return (
+            self.workspace_catalog.stale
+            and self._breakers["primary"].state == BREAKER_CLOSED
+            and self._primary_healthy is not False
+        )
+
+    async def async_refresh_workspaces(self) -> None:
+        """Refresh the primary endpoint's workspace catalog if it is stale.
+
+        Concurrent callers share one request; failures keep the previous list.
+        """
+        if not self.workspace_catalog.stale:
+            return
+        await self._singleflight.run(("workspaces",), self._fetch_workspaces)
+
+    async def _fetch_workspaces(self) -> None:
+        """Conditionally GET /v1/workspaces and update the catalog."""
+        catalog = self.workspace_catalog
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        if catalog.etag:
+            headers["If-None-Match"] = catalog.etag
+        try:
+            response = await self.http_client.get(
+                f"{self.base_url}/v1/workspaces",
+                headers=headers,
+                timeout=self.health_check_timeout,
+            )
+        except Exception as err:
+            _LOGGER.debug("Workspace list refresh failed for %s: %s", self.base_url, err)
+            catalog.refresh_failed()
+            return
+
+        if response.status_code == 304:
+            catalog.touch()
+            return
+        if not response.is_success:
+            _LOGGER.debug(
+                "Workspace list refresh for %s returned HTTP %s", self.base_url, response.status_code
+            )
+            catalog.refresh_failed()
+            return
+        try:
+            workspaces = response.json().get("workspaces") or []
+            slugs = [ws["slug"] for ws in workspaces if ws.get("slug")]
+        except Exception as err:
+            _LOGGER.debug("Unexpected workspace list from %s: %s", self.base_url, err)
+            catalog.refresh_failed()
+            return
+        catalog.update(slugs, response.headers.get("etag"))
+        _LOGGER.debug("Workspace catalog refreshed for %s: %d workspaces", self.base_url, len(slugs))
+
+    def _workspace_missing(self, endpoint: str, request: tuple[str, str, dict, dict]) -> bool:
+        """Return True if a request's workspace recently returned 404 on endpoint."""
+        base_url, chat_url, _payload, _headers = request
+        return self._catalogs[endpoint].is_missing(_url_workspace(base_url, chat_url))
+
+    def _note_not_found(self, endpoint: str, base_url: str, chat_url: str) -> None:
+        """Remember a 404'd workspace on endpoint, unless only a thread may be gone.
+
+        A 404 on a thread URL does not tell a missing thread from a missing
+        workspace; it only counts once the workspace list lacks the slug.
+        """
+        slug = _url_workspace(base_url, chat_url)
+        catalog = self._catalogs[endpoint]
+        if not _url_is_thread(base_url, chat_url) or (
+            catalog.slugs is not None and slug not in catalog.slugs
+        ):
+            catalog.mark_missing(slug)
+
+    def prewarm_workspace(self, workspace_slug: str, conversation_id: str | None = None) -> None:
+        """Warm a workspace in the background before it is queried.
+
+        The warm-up goes to the endpoint the next turn of the conversation
+        would be sent to first, with the workspace mapped for that endpoint.
+        Skipped for workspaces known not to exist on that endpoint, while that
+        endpoint's breaker is not closed or it is known to be down, and when
+        the warmer deduplicates or rate-limits the request.
+        """
+        try:
+            endpoint = self._endpoint_order(
+                affinity_key=self._affinity_key(conversation_id, workspace_slug, None)
+            )[0]
+        except HomeAssistantError:
+            return
+        if not self._catalogs[endpoint].may_exist(self._endpoint_workspace(endpoint, workspace_slug)):
+            return
+        if self._breakers[endpoint].state != BREAKER_CLOSED or self._health[endpoint].healthy is False:
+            return
+        if self.workspace_warmer.begin(workspace_slug) != WARMUP_STARTED:
+            return
+        task = asyncio.ensure_future(self._warm_workspace(endpoint, workspace_slug))
+        self._warmup_tasks.add(task)
+
+        def _done(task: asyncio.Task) -> None:
+            self._warmup_tasks.discard(task)
+            # No-op unless the task was cancelled before it started.
+            self.workspace_warmer.finish(workspace_slug, "cancelled")
+
+        task.add_done_callback(_done)
+
+    async def _warm_workspace(self, endpoint: str, workspace_slug: str) -> None:
+        """Send one warm-up request and record its outcome."""
+        error = "cancelled"
+        try:
+            error = await self._warm_chat(endpoint, workspace_slug, _WARMUP_SESSION)
+        finally:
+            self.workspace_warmer.finish(workspace_slug, error)
+            _LOGGER.debug(
+                "Warm-up of workspace %s on %s endpoint finished: %s",
+                workspace_slug,
+                endpoint,
+                error or "ok",
+            )
+
+    async def _warm_chat(self, endpoint: str, workspace_slug: str, session_id: str) -> str | None:
+        """Send a minimal chat that loads a workspace's model; return the error, if any.
+
+        The chat embeds its message and searches the vector store as well, so
+        one request warms the whole pipeline. AnythingLLM stores it in the
+        workspace's chat log under session_id, apart from the regular
+        history; a one-word message keeps the generated reply short.
+        """
+        base_url, api_key = self._endpoints[endpoint]
+        slug = self._endpoint_workspace(endpoint, workspace_slug)
+        try:
+            response = await self.http_client.post(
+                f"{base_url}/v1/workspace/{slug}/chat",
+                json={"message": "ping", "mode": "chat", "sessionId": session_id},
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=self.chat_timeout,
+            )
+        except Exception as err:
+            return type(err).__name__
+        return None if response.is_success else f"HTTP {response.status_code}"
+
+    def set_keep_warm(self, owner: str, workspaces, window: tuple[int, int]) -> None:
+        """Register the workspaces one agent keeps warm and start the scheduler."""
+        self.keep_warm.set_targets(owner, workspaces, window)
+        if not self.keep_warm.active:
+            return
+        if self._keep_warm_task is None or self._keep_warm_task.done():
+            self._keep_warm_task = asyncio.ensure_future(self._keep_warm_loop())
+            _LOGGER.debug("Keep-warm scheduler started for %s", self.base_url)
+        else:
+            self._keep_warm_wakeup.set()
+
+    def stop_keep_warm(self) -> None:
+        """Stop the keep-warm scheduler."""
+        if self._keep_warm_task and not self._keep_warm_task.done():
+            self._keep_warm_task.cancel()
+
+    async def _keep_warm_loop(self) -> None:
+        """Send keep-warm chats whenever a registered workspace is due."""
+        while self.keep_warm.active:
+            now = dt_util.now()
+            due = self.keep_warm.due(now.hour * 60 + now.minute)
+            if due and self._breakers["primary"].state == BREAKER_CLOSED and self._primary_healthy is not False:
+                await asyncio.gather(*(self._keep_warm_workspace(slug) for slug in due))
+            # 0 means a workspace is overdue outside its hours window.
+            delay = min(self.keep_warm.seconds_until_due() or _KEEP_WARM_POLL, _KEEP_WARM_POLL)
+            self._keep_warm_wakeup.clear()
+            try:
+                await asyncio.wait_for(self._keep_warm_wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _keep_warm_workspace(self, workspace_slug: str) -> None:
+        """Send one warm-up chat to a primary workspace so its model stays loaded."""
+        started = time.monotonic()
+        error = await self._warm_chat("primary", workspace_slug, _KEEP_WARM_SESSION)
+        self.keep_warm.record(workspace_slug, time.monotonic() - started, error)
+        _LOGGER.debug("Keep-warm of workspace %s finished: %s", workspace_slug, error or "ok")
 
     def get_active_endpoint(self) -> tuple[str, str, str]:
         """Return the active endpoint from cached health state (non-blocking)."""
+        name = self._endpoint_order(balance=False)[0]
+        base_url, api_key = self._endpoints[name]
+        if name == "failover":
+            return base_url, api_key, self.failover_workspace_slug or self.workspace_slug
+        return base_url, api_key, self._endpoint_workspace(name, self.workspace_slug)
+
+    def answered_from(self, response: dict, workspace_slug: str) -> bool:
+        """Return True if a chat response came from workspace_slug itself.
+
+        Responses carry the endpoint and workspace that served them. A pool
+        endpoint's mapped copy of the workspace counts; the failover's own
+        workspace only counts when it has the same slug.
+        """
+        endpoint = response.get("endpoint")
+        if endpoint not in self._endpoints:
+            return False
+        if endpoint == "failover":
+            return response.get("workspace_slug") == workspace_slug
+        return response.get("workspace_slug") == self._endpoint_workspace(endpoint, workspace_slug)
+
+    def _endpoint_workspace(self, endpoint: str, workspace_slug: str | None) -> str:
+        """Return the slug a primary workspace has on endpoint.
+
+        Pool endpoints map it through their workspace map. The failover
+        always serves its own workspace, as chat requests without a per-agent
+        override do.
+        """
+        requested = workspace_slug or self.workspace_slug
+        if endpoint == "failover":
+            return self.failover_workspace_slug or DEFAULT_FAILOVER_WORKSPACE_SLUG or "default-workspace"
+        if endpoint in self._pool:
+            workspace_map = self._pool[endpoint][3]
+            return workspace_map.get(requested, requested)
+        return requested
+
+    def _preferred_pair(self) -> list[str]:
+        """Return "primary" and "failover" (if configured) in health order."""
+        if "failover" not in self._breakers:
+            if self.enable_health_check and self._primary_healthy is False and not self._pool:
+                _LOGGER.error("Primary endpoint unavailable and no failover configured")
+                raise HomeAssistantError("AnythingLLM endpoint is unavailable")
+            return ["primary"]
         if not self.enable_health_check:
-            return self.base_url, self.api_key, self.workspace_slug
+            return ["primary", "failover"]
 
         # If we haven't completed the first check yet, optimistically use primary.
         if self._primary_healthy is None:
             _LOGGER.debug("Health not yet checked, optimistically using primary endpoint")
-            return self.base_url, self.api_key, self.workspace_slug
+            return ["primary", "failover"]
 
-        if self._primary_healthy or not (self.failover_base_url and self.failover_api_key):
-            if not self._primary_healthy:
-                _LOGGER.error("Primary endpoint unavailable and no failover configured")
-                raise HomeAssistantError("AnythingLLM endpoint is unavailable")
-            return self.base_url, self.api_key, self.workspace_slug
+        if self._prefer_failover():
+            if self._primary_healthy:
+                _LOGGER.debug("Primary endpoint degraded, using failover endpoint")
+            return ["failover", "primary"]
 
-        # Primary unhealthy and failover is configured
-        return self.failover_base_url, self.failover_api_key, self.failover_workspace_slug or self.workspace_slug
+        if not self._primary_healthy:
+            # Both are known to be down: stay on the primary, which its
+            # breaker and the probes will bring back first.
+            _LOGGER.debug("Failover endpoint is also unavailable, staying on primary")
+        return ["primary", "failover"]
 
-    async def chat_completion(
+    def _health_tier(self, endpoint: str) -> int:
+        """Return 0 for a usable endpoint, 1 for a degraded and 2 for a down one."""
+        if self._health[endpoint].healthy is False:
+            return 2
+        return 1 if self._degradation(endpoint) is not None else 0
+
+    def _endpoint_order(
+        self, balance: bool = True, affinity_key: str | None = None
+    ) -> list[str]:
+        """Return endpoint names in the order to try them.
+
+        Health state picks which of primary and failover goes first, and pool
+        endpoints follow in their configured order. With an affinity key, the
+        primary and pool endpoints are instead taken in consistent-hash order
+        for that key, starting at the first usable one that is not overloaded.
+        Otherwise, with load balancing (and balance), they are ranked by
+        outstanding requests and EWMA latency. Either way the failover follows
+        them: it always answers from its own workspace and thread, so it is a
+        fallback rather than a peer. Endpoints known to be degraded or down
+        move behind the others. Circuit breakers decide at send time whether
+        an endpoint is actually tried.
+        """
+        order = self._preferred_pair() + list(self._pool)
+        members = [name for name in order if name != "failover"]
+        fallback = [name for name in order if name == "failover"]
+        if affinity_key is not None and len(members) > 1:
+            health_check = self.enable_health_check
+            usable = [name for name in members if self._health_tier(name) == 0] if health_check else None
+            order = self._affinity.route(affinity_key, members, self._load.outstanding, usable) + fallback
+            if health_check:
+                order.sort(key=self._health_tier)
+            return order
+        balanced = balance and self.load_balancing and len(members) > 1
+        if balanced:
+            order = self._load.rank(members) + fallback
+        if (balanced or self._pool) and self.enable_health_check:
+            order.sort(key=self._health_tier)
+        return order
+
+    def _prepare_chat_request(
         self,
         messages: list[dict],
-        temperature: float = 0.5,
-        max_tokens: int = 150,
+        endpoint: str = "primary",
         workspace_slug: str | None = None,
         thread_slug: str | None = None,
         failover_thread_slug: str | None = None,
         failover_workspace_slug: str | None = None,
-    ) -> dict:
-        """Send chat completion request to AnythingLLM."""
-        base_url, api_key, active_workspace_slug = self.get_active_endpoint()
-        
+        stream: bool = False,
+    ) -> tuple[str, str, dict, dict]:
+        """Resolve URL, payload and headers for a chat request to one endpoint.
+
+        Returns (base_url, chat_url, payload, headers). With stream=True the
+        URL targets AnythingLLM's SSE ``stream-chat`` endpoint instead.
+        """
         # Update failover_thread_slug if provided (allows dynamic updates without client reload)
         if failover_thread_slug is not None:
             self.failover_thread_slug = failover_thread_slug
@@ -315,8 +1056,9 @@ class AnythingLLMClient:
         else:
             active_failover_workspace = self.failover_workspace_slug
         
-        # Determine which workspace and thread slug to use based on active endpoint
-        if self.using_failover:
+        # Determine which workspace and thread slug to use based on the target endpoint
+        if endpoint == "failover":
+            base_url, api_key = self.failover_base_url, self.failover_api_key
             # If failover_workspace_slug is not set, use a generic default and do not set a thread
             if not active_failover_workspace:
                 final_workspace_slug = DEFAULT_FAILOVER_WORKSPACE_SLUG or "default-workspace"
@@ -326,37 +1068,35 @@ class AnythingLLMClient:
                 final_workspace_slug = active_failover_workspace
                 active_thread_slug = self.failover_thread_slug
                 _LOGGER.info("Using failover endpoint - workspace: %s, thread: %s", final_workspace_slug, active_thread_slug or "None")
+        elif endpoint in self._pool:
+            _title, base_url, api_key, _workspace_map = self._pool[endpoint]
+            final_workspace_slug = self._endpoint_workspace(endpoint, workspace_slug)
+            # Threads live on the server that created them.
+            active_thread_slug = None
+            _LOGGER.info("Using %s endpoint - workspace: %s, no thread", endpoint, final_workspace_slug)
         else:
-            # Use the provided workspace override if set, otherwise default to active workspace
-            final_workspace_slug = workspace_slug or active_workspace_slug or self.workspace_slug
+            base_url, api_key = self.base_url, self.api_key
+            # Use the provided workspace override if set, otherwise default to configured workspace
+            final_workspace_slug = workspace_slug or self.workspace_slug
             active_thread_slug = thread_slug
             _LOGGER.info(
-                "Using primary endpoint - workspace: %s (override: %s, active: %s, default: %s), thread: %s",
+                "Using primary endpoint - workspace: %s (override: %s, default: %s), thread: %s",
                 final_workspace_slug,
                 workspace_slug or "None",
-                active_workspace_slug or "None",
                 self.workspace_slug,
                 active_thread_slug or "None"
             )
         
         # Construct AnythingLLM API endpoint - use thread slug in URL if provided
+        endpoint_name = "stream-chat" if stream else "chat"
         if active_thread_slug:
-            chat_url = f"{base_url}/v1/workspace/{final_workspace_slug}/thread/{active_thread_slug}/chat"
+            chat_url = f"{base_url}/v1/workspace/{final_workspace_slug}/thread/{active_thread_slug}/{endpoint_name}"
         else:
-            chat_url = f"{base_url}/v1/workspace/{final_workspace_slug}/chat"
+            chat_url = f"{base_url}/v1/workspace/{final_workspace_slug}/{endpoint_name}"
         
         _LOGGER.info("API URL: %s", chat_url)
         
-        # Extract the system prompt (first message with role 'system')
-        system_prompt = None
-        for msg in messages:
-            if msg.get("role") == "system":
-                system_prompt = msg.get("content")
-                break
-
-        # Guard: never send an empty or system-only message to the API.
-        if not messages or messages[-1].get("role") != "user":
-            raise HomeAssistantError("No valid user message to send to AnythingLLM")
+        system_prompt = _system_prompt(messages)
 
         payload = {
             "message": messages[-1]["content"],
@@ -375,75 +1115,437 @@ class AnythingLLMClient:
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         }
+        return base_url, chat_url, payload, headers
+
+    async def _send_chat(self, chat_url: str, payload: dict, headers: dict) -> dict:
+        """POST one chat request and return the decoded JSON body.
+
+        Raises EndpointUnavailableError for failures that say something about
+        the endpoint (transport errors, timeouts, 5xx, 429) and plain
+        HomeAssistantError for requests the server rejected.
+        """
+        try:
+            response = await self.http_client.post(
+                chat_url,
+                json=payload,
+                headers=headers,
+                timeout=self.chat_timeout,
+            )
+        except Exception as err:
+            raise EndpointUnavailableError(f"AnythingLLM API error: {err}") from err
+
+        _LOGGER.debug("AnythingLLM response status: %s, body: %s", response.status_code, response.text[:500])
+        if not response.is_success:
+            _LOGGER.error(
+                "AnythingLLM HTTP %s for %s — response body: %s",
+                response.status_code,
+                chat_url,
+                response.text[:1000],
+            )
+            # Try to surface AnythingLLM's own error message instead of
+            # a generic HTTP status error (e.g. "Ollama unreachable")
+            message = f"AnythingLLM API error: HTTP {response.status_code}"
+            try:
+                server_error = response.json().get("error")
+                if server_error:
+                    message = f"AnythingLLM error: {server_error}"
+            except Exception:
+                pass
+            if response.status_code >= 500 or response.status_code == 429:
+                raise EndpointUnavailableError(message)
+            if response.status_code == 404:
+                raise WorkspaceNotFoundError(message)
+            raise HomeAssistantError(message)
+
+        try:
+            return response.json()
+        except Exception as err:
+            raise HomeAssistantError(f"AnythingLLM API error: {err}") from err
+
+    async def chat_completion(
+        self,
+        messages: list[dict],
+        temperature: float = 0.5,
+        max_tokens: int = 150,
+        workspace_slug: str | None = None,
+        thread_slug: str | None = None,
+        failover_thread_slug: str | None = None,
+        failover_workspace_slug: str | None = None,
+        conversation_id: str | None = None,
+        skip_endpoint: str | None = None,
+    ) -> dict:
+        """Send chat completion request to AnythingLLM.
+
+        Each endpoint gets at most one attempt per turn, in health order, and
+        only if its circuit breaker admits the request. An endpoint whose
+        breaker is open, or whose workspace recently returned 404, is skipped
+        outright instead of burning chat_timeout. Identical concurrent
+        requests outside thread mode are coalesced into a single HTTP call.
+        conversation_id is only used for routing. skip_endpoint is an
+        endpoint that already failed this turn (a stream that failed before
+        its first chunk) and is not tried again.
+        """
+        # Guard: never send an empty or system-only message to the API.
+        if not messages or messages[-1].get("role") != "user":
+            raise HomeAssistantError("No valid user message to send to AnythingLLM")
+
+        request_kwargs = {
+            "workspace_slug": workspace_slug,
+            "thread_slug": thread_slug,
+            "failover_thread_slug": failover_thread_slug,
+            "failover_workspace_slug": failover_workspace_slug,
+        }
+        affinity_key = self._affinity_key(conversation_id, workspace_slug, thread_slug)
+        # A retry that skips an endpoint must not join a flight that uses it.
+        key = None if skip_endpoint else self._coalesce_key(messages, request_kwargs)
+        if key is None:
+            return await self._chat_completion(
+                messages, request_kwargs, affinity_key, skip_endpoint
+            )
+        result = await self._singleflight.run(
+            key, lambda: self._chat_completion(messages, request_kwargs, affinity_key)
+        )
+        # Coalesced callers each get their own dict to mutate.
+        return dict(result)
 
-        # Try up to 2 times on the selected endpoint
-        max_retries = 2
-        for attempt in range(max_retries):
+    def _affinity_key(
+        self, conversation_id: str | None, workspace_slug: str | None, thread_slug: str | None
+    ) -> str | None:
+        """Return the consistent-hash routing key for a chat, or None to route without one.
+
+        Thread chats are not routed by key: the thread lives on one server.
+        Conversation affinity falls back to the workspace without an ID.
+        """
+        if thread_slug or self.routing_affinity == ROUTING_AFFINITY_OFF:
+            return None
+        return routing_key(
+            conversation_id,
+            workspace_slug or self.workspace_slug,
+            self.routing_affinity == ROUTING_AFFINITY_CONVERSATION,
+        )
+
+    def _coalesce_key(self, messages: list[dict], request_kwargs: dict) -> tuple | None:
+        """Return the singleflight key for a chat, or None if it must not be shared.
+
+        Requests that may hit a thread are never coalesced: each thread chat
+        appends to server-side history, so two turns must stay two requests.
+        """
+        failover_workspace = (
+            request_kwargs["failover_workspace_slug"] or self.failover_workspace_slug
+        )
+        failover_thread = request_kwargs["failover_thread_slug"] or self.failover_thread_slug
+        if request_kwargs["thread_slug"] or (
+            "failover" in self._breakers and failover_workspace and failover_thread
+        ):
+            return None
+        system_prompt = _system_prompt(messages) or ""
+        return (
+            tuple(self._endpoint_order(balance=False)),
+            request_kwargs["workspace_slug"] or self.workspace_slug,
+            failover_workspace,
+            messages[-1]["content"],
+            hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+        )
+
+    async def _chat_completion(
+        self,
+        messages: list[dict],
+        request_kwargs: dict,
+        affinity_key: str | None = None,
+        skip_endpoint: str | None = None,
+    ) -> dict:
+        """Try each endpoint in order; see chat_completion."""
+        last_err: Exception | None = None
+        # A thread's history lives on one server, so thread chats are not balanced.
+        pending = self._endpoint_order(
+            balance=not request_kwargs["thread_slug"], affinity_key=affinity_key
+        )
+        if skip_endpoint in pending:
+            pending.remove(skip_endpoint)
+            last_err = EndpointUnavailableError(
+                f"AnythingLLM {skip_endpoint} endpoint already failed this turn"
+            )
+        while pending:
+            endpoint = pending.pop(0)
+            request = self._prepare_chat_request(messages, endpoint, **request_kwargs)
+            if self._workspace_missing(endpoint, request):
+                _LOGGER.debug("Skipping %s endpoint: workspace recently returned 404", endpoint)
+                last_err = WorkspaceNotFoundError(
+                    f"AnythingLLM workspace '{_url_workspace(request[0], request[1])}' does not exist"
+                )
+                continue
+            breaker = self._breakers[endpoint]
+            if not breaker.allow_request():
+                _LOGGER.debug("Skipping %s endpoint: circuit breaker is %s", endpoint, breaker.state)
+                continue
+            # Counted before the first await, so turns starting at the same
+            # moment already see this one when ranking endpoints.
+            self._load.begin(endpoint)
             try:
-                response = await self.http_client.post(
-                    chat_url,
-                    json=payload,
-                    headers=headers,
-                    timeout=self.chat_timeout,
+                if pending:
+                    return await self._send_with_hedge(
+                        endpoint, request, pending, messages, request_kwargs
+                    )
+                return await self._attempt(endpoint, request)
+            except (EndpointUnavailableError, WorkspaceNotFoundError) as err:
+                _LOGGER.error("Error calling AnythingLLM %s endpoint: %s", endpoint, err)
+                last_err = err
+            finally:
+                self._load.end(endpoint)
+
+        if isinstance(last_err, WorkspaceNotFoundError):
+            raise last_err
+        if last_err is not None:
+            raise HomeAssistantError(str(last_err)) from last_err
+        raise HomeAssistantError(
+            "AnythingLLM endpoint is unavailable (circuit breaker open)"
+        )
+
+    async def _attempt(
+        self, endpoint: str, request: tuple[str, str, dict, dict]
+    ) -> dict:
+        """Send a breaker-admitted request and report its outcome to the breaker.
+
+        Successful latencies feed the endpoint's LatencyTracker, which drives
+        the hedge delay, its brownout window and its load-balancing EWMA.
+        """
+        breaker = self._breakers[endpoint]
+        base_url, chat_url, payload, headers = request
+        started = time.monotonic()
+        try:
+            result = await self._send_chat(chat_url, payload, headers)
+        except EndpointUnavailableError:
+            breaker.record_failure()
+            self._record_passive_health(endpoint, False)
+            raise
+        except WorkspaceNotFoundError:
+            breaker.record_success()
+            self._record_passive_health(endpoint, True)
+            self._note_not_found(endpoint, base_url, chat_url)
+            raise
+        except HomeAssistantError:
+            # The server answered, so the endpoint itself is working.
+            breaker.record_success()
+            self._record_passive_health(endpoint, True)
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        seconds = time.monotonic() - started
+        self._load.record(endpoint, seconds)
+        self._latency[endpoint].record(seconds)
+        self._record_slo_latency(endpoint, _url_workspace(base_url, chat_url), seconds)
+        breaker.record_success()
+        self._record_passive_health(endpoint, True)
+        if endpoint == "primary":
+            self.keep_warm.note_traffic(_url_workspace(base_url, chat_url))
+        # Tells callers which workspace answered; see answered_from.
+        result["endpoint"] = endpoint
+        result["workspace_slug"] = _url_workspace(base_url, chat_url)
+        return result
+
+    def _hedge_delay(self, endpoint: str) -> float:
+        """Return how long to wait on an endpoint before hedging (its p95 latency)."""
+        tracker = self._latency[endpoint]
+        if len(tracker) < HEDGE_MIN_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        return min(max(tracker.percentile(95), HEDGE_MIN_DELAY), HEDGE_MAX_DELAY)
+
+    async def _send_with_hedge(
+        self,
+        endpoint: str,
+        request: tuple[str, str, dict, dict],
+        pending: list[str],
+        messages: list[dict],
+        request_kwargs: dict,
+    ) -> dict:
+        """Send to endpoint; if it is slow, race the same payload on pending[0].
+
+        The first successful response wins and the other request is cancelled;
+        a request that fails just loses the race. Only when both fail is an
+        error raised, the one from endpoint rather than the hedge. A hedge is only sent when neither request uses a thread (threads mutate
+        server-side history) and fewer than DEFAULT_MAX_HEDGED_REQUESTS hedges
+        are already in flight. If the hedge is launched, its endpoint is removed
+        from pending so the caller does not try it a second time.
+        """
+        first = asyncio.ensure_future(self._attempt(endpoint, request))
+        tasks = {first: endpoint}
+        hedged = False
+        try:
+            done, _ = await asyncio.wait({first}, timeout=self._hedge_delay(endpoint))
+            if done:
+                return first.result()
+
+            hedge_endpoint = pending[0]
+            hedge_request = self._prepare_chat_request(messages, hedge_endpoint, **request_kwargs)
+            if (
+                self._hedges_in_flight < DEFAULT_MAX_HEDGED_REQUESTS
+                and "/thread/" not in request[1]
+                and "/thread/" not in hedge_request[1]
+                and not self._workspace_missing(hedge_endpoint, hedge_request)
+                and self._breakers[hedge_endpoint].allow_request()
+            ):
+                pending.pop(0)
+                hedged = True
+                self._hedges_in_flight += 1
+                self._hedges_sent += 1
+                self._load.begin(hedge_endpoint)
+                _LOGGER.info(
+                    "%s endpoint slower than %.1fs, hedging request to %s endpoint",
+                    endpoint,
+                    self._hedge_delay(endpoint),
+                    hedge_endpoint,
                 )
-                _LOGGER.debug("AnythingLLM response status: %s, body: %s", response.status_code, response.text[:500])
+                tasks[asyncio.ensure_future(self._attempt(hedge_endpoint, hedge_request))] = hedge_endpoint
+
+            errors: dict[str, HomeAssistantError] = {}
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    winner = tasks.pop(task)
+                    try:
+                        result = task.result()
+                    except HomeAssistantError as err:
+                        if hedged:
+                            _LOGGER.error("Error calling AnythingLLM %s endpoint: %s", winner, err)
+                        errors[winner] = err
+                        continue
+                    if hedged and winner != endpoint:
+                        self._hedges_won += 1
+                    return result
+            raise errors.get(endpoint) or next(iter(errors.values()))
+        finally:
+            for task in tasks:
+                task.cancel()
+            if hedged:
+                self._hedges_in_flight -= 1
+                self._load.end(hedge_endpoint)
+
+    async def chat_completion_stream(
+        self,
+        messages: list[dict],
+        temperature: float = 0.5,
+        max_tokens: int = 150,
+        workspace_slug: str | None = None,
+        thread_slug: str | None = None,
+        failover_thread_slug: str | None = None,
+        failover_workspace_slug: str | None = None,
+        conversation_id: str | None = None,
+        route: dict | None = None,
+    ) -> AsyncIterator[str]:
+        """Stream a chat completion from AnythingLLM's ``stream-chat`` endpoint.
+
+        Yields text chunks as the server emits them. Only the first endpoint
+        admitted by its circuit breaker is used: once text has been handed to
+        TTS it cannot be taken back, so callers fall back to chat_completion()
+        if the stream fails before the first chunk, passing the endpoint as
+        skip_endpoint when it failed with EndpointUnavailableError. route, if
+        given, receives the endpoint and workspace_slug serving the stream, as
+        the results of chat_completion() carry them.
+        """
+        if not messages or messages[-1].get("role") != "user":
+            raise HomeAssistantError("No valid user message to send to AnythingLLM")
+
+        affinity_key = self._affinity_key(conversation_id, workspace_slug, thread_slug)
+        missing = None
+        for endpoint in self._endpoint_order(balance=not thread_slug, affinity_key=affinity_key):
+            request = self._prepare_chat_request(
+                messages,
+                endpoint,
+                workspace_slug=workspace_slug,
+                thread_slug=thread_slug,
+                failover_thread_slug=failover_thread_slug,
+                failover_workspace_slug=failover_workspace_slug,
+                stream=True,
+            )
+            if self._workspace_missing(endpoint, request):
+                missing = _url_workspace(request[0], request[1])
+                continue
+            breaker = self._breakers[endpoint]
+            if breaker.allow_request():
+                break
+        else:
+            if missing is not None:
+                raise WorkspaceNotFoundError(f"AnythingLLM workspace '{missing}' does not exist")
+            raise HomeAssistantError(
+                "AnythingLLM endpoint is unavailable (circuit breaker open)"
+            )
+
+        base_url, chat_url, payload, headers = request
+        headers["Accept"] = "text/event-stream"
+        if route is not None:
+            route.update(endpoint=endpoint, workspace_slug=_url_workspace(base_url, chat_url))
+        started = time.monotonic()
+        first_chunk = True
+        self._load.begin(endpoint)
+
+        try:
+            async with self.http_client.stream(
+                "POST",
+                chat_url,
+                json=payload,
+                headers=headers,
+                timeout=self.chat_timeout,
+            ) as response:
                 if not response.is_success:
+                    body = (await response.aread()).decode(errors="replace")
                     _LOGGER.error(
                         "AnythingLLM HTTP %s for %s — response body: %s",
                         response.status_code,
                         chat_url,
-                        response.text[:1000],
+                        body[:1000],
                     )
-                    # Try to surface AnythingLLM's own error message instead of
-                    # a generic HTTP status error (e.g. "Ollama unreachable")
-                    try:
-                        body = response.json()
-                        server_error = body.get("error")
-                        if server_error:
-                            raise HomeAssistantError(f"AnythingLLM error: {server_error}")
-                    except HomeAssistantError:
-                        raise
-                    except Exception:
-                        pass
-                response.raise_for_status()
-                return response.json()
-            except Exception as err:
-                _LOGGER.error("Error calling AnythingLLM API at %s (attempt %d/%d): %s", base_url, attempt + 1, max_retries, err)
-                
-                # If this was the last retry, try switching endpoints
-                if attempt == max_retries - 1:
-                    # If we were using failover and it failed, try primary one more time
-                    if self.using_failover and self.failover_base_url:
-                        _LOGGER.warning("Failover endpoint failed after retries, trying primary endpoint")
-                        try:
-                            # Construct primary URL with thread slug if provided
-                            if thread_slug:
-                                primary_url = f"{self.base_url}/v1/workspace/{self.workspace_slug}/thread/{thread_slug}/chat"
-                            else:
-                                primary_url = f"{self.base_url}/v1/workspace/{self.workspace_slug}/chat"
-                            primary_headers = {
-                                "Authorization": f"Bearer {self.api_key}",
-                                "Content-Type": "application/json",
-                            }
-                            response = await self.http_client.post(
-                                primary_url,
-                                json=payload,
-                                headers=primary_headers,
-                                timeout=DEFAULT_CHAT_TIMEOUT,
-                            )
-                            _LOGGER.debug("Primary retry response status: %s, body: %s", response.status_code, response.text[:500])
-                            response.raise_for_status()
-                            _LOGGER.info("Primary endpoint succeeded, switching back")
-                            self.using_failover = False
-                            return response.json()
-                        except Exception as primary_err:
-                            _LOGGER.error("Primary endpoint also failed: %s", primary_err)
-                    
-                    raise HomeAssistantError(f"AnythingLLM API error: {err}") from err
-                
-                # Wait a bit before retrying (exponential backoff)
-                await asyncio.sleep(0.5 * (attempt + 1))
+                    message = f"AnythingLLM API error: HTTP {response.status_code}"
+                    if response.status_code >= 500 or response.status_code == 429:
+                        raise EndpointUnavailableError(message)
+                    if response.status_code == 404:
+                        self._note_not_found(endpoint, base_url, chat_url)
+                        raise WorkspaceNotFoundError(message)
+                    raise HomeAssistantError(message)
 
+                async for line in response.aiter_lines():
+                    event = parse_stream_event(line)
+                    if event is None:
+                        continue
+                    if event.get("error") or event.get("type") == "abort":
+                        raise HomeAssistantError(
+                            f"AnythingLLM error: {event.get('error') or 'stream aborted'}"
+                        )
+                    chunk = event.get("textResponse")
+                    if chunk:
+                        if first_chunk:
+                            # A streamed answer is judged by its first text.
+                            first_chunk = False
+                            self._record_slo_latency(
+                                endpoint, _url_workspace(base_url, chat_url), time.monotonic() - started
+                            )
+                        yield chunk
+                    if event.get("close"):
+                        break
+            seconds = time.monotonic() - started
+        except HomeAssistantError as err:
+            if isinstance(err, EndpointUnavailableError):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            self._record_passive_health(endpoint, not isinstance(err, EndpointUnavailableError))
+            raise
+        except (GeneratorExit, asyncio.CancelledError):
+            breaker.release()
+            raise
+        except Exception as err:
+            breaker.record_failure()
+            self._record_passive_health(endpoint, False)
+            raise EndpointUnavailableError(f"AnythingLLM API error: {err}") from err
+        finally:
+            self._load.end(endpoint)
+        # Recorded like _attempt, so balancing and hedging see streamed turns.
+        self._load.record(endpoint, seconds)
+        self._latency[endpoint].record(seconds)
+        breaker.record_success()
+        self._record_passive_health(endpoint, True)
+        if endpoint == "primary":
+            self.keep_warm.note_traffic(workspace_slug or self.workspace_slug)
 
 
 async def get_anythingllm_client(
@@ -458,6 +1560,10 @@ async def get_anythingllm_client(
     enable_health_check: bool = True,
     health_check_timeout: float = DEFAULT_HEALTH_CHECK_TIMEOUT,
     chat_timeout: float = DEFAULT_CHAT_TIMEOUT,
+    deep_probe_workspace: str | None = None,
+    endpoints: list[tuple[str, str, str, str, dict[str, str]]] | None = None,
+    load_balancing: bool = False,
+    routing_affinity: str = ROUTING_AFFINITY_OFF,
 ) -> AnythingLLMClient:
     """Create and validate AnythingLLM client."""
     client = AnythingLLMClient(
@@ -472,6 +1578,10 @@ async def get_anythingllm_client(
         enable_health_check,
         health_check_timeout=health_check_timeout,
         chat_timeout=chat_timeout,
+        deep_probe_workspace=deep_probe_workspace,
+        endpoints=endpoints,
+        load_balancing=load_balancing,
+        routing_affinity=routing_affinity,
     )
     
     # Skip health check during setup - it will be done at conversation time
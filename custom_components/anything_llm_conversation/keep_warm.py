@@ -0,0 +1,159 @@
+"""Schedule keep-warm requests that keep workspace models loaded."""
+
+import math
+import random
+import re
+import time
+from typing import Callable
+
+# Ollama unloads an idle model after 5 minutes by default; warm well before.
+KEEP_WARM_INTERVAL = 240.0
+# Each interval is shortened by up to this fraction so that several agents
+# or Home Assistant instances do not hit the server in lockstep.
+KEEP_WARM_JITTER = 0.2
+MINUTES_PER_DAY = 24 * 60
+
+_RE_HOURS = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*$")
+
+
+def parse_hours(text: str) -> tuple[int, int] | None:
+    """Parse "HH:MM-HH:MM" into (start, end) minutes since midnight.
+
+    An empty string means the whole day. A window may wrap past midnight
+    ("22:00-02:00"). Returns None for a malformed window.
+    """
+    if not text.strip():
+        return (0, MINUTES_PER_DAY)
+    match = _RE_HOURS.match(text)
+    if match is None:
+        return None
+    start_h, start_m, end_h, end_m = (int(part) for part in match.groups())
+    if start_h > 24 or end_h > 24 or start_m > 59 or end_m > 59:
+        return None
+    start = min(start_h * 60 + start_m, MINUTES_PER_DAY)
+    end = min(end_h * 60 + end_m, MINUTES_PER_DAY)
+    return start, end
+
+
+def in_window(window: tuple[int, int], minute: int) -> bool:
+    """Return True if minute of the day falls inside window (end exclusive)."""
+    start, end = window
+    if start == end or (start, end) == (0, MINUTES_PER_DAY):
+        return True
+    if start < end:
+        return start <= minute < end
+    return minute >= start or minute < end
+
+
+class KeepWarmScheduler:
+    """Decide which workspaces need a keep-warm request and when.
+
+    Every agent registers the workspaces it wants kept warm with its own
+    hours window. A workspace is due once its interval has elapsed since the
+    last request that reached its model, real or synthetic, and the current
+    minute is inside a window of any agent that registered it. Real traffic
+    therefore pushes the next keep-warm request back.
+    """
+
+    def __init__(
+        self,
+        interval: float = KEEP_WARM_INTERVAL,
+        jitter: float = KEEP_WARM_JITTER,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        """Initialize with no targets."""
+        self.interval = interval
+        self.jitter = jitter
+        self._clock = clock
+        self._rng = rng
+        self._targets: dict[str, tuple[frozenset[str], tuple[int, int]]] = {}
+        self._next_at: dict[str, float] = {}
+        self._last: dict[str, dict] = {}
+        self.sent = 0
+        self.failed = 0
+        self.deferred_by_traffic = 0
+
+    @property
+    def active(self) -> bool:
+        """Return True if any workspace should be kept warm."""
+        return bool(self._targets)
+
+    @property
+    def workspaces(self) -> frozenset[str]:
+        """Return every workspace registered by any agent."""
+        return frozenset().union(*(slugs for slugs, _window in self._targets.values()))
+
+    def set_targets(self, owner: str, workspaces, window: tuple[int, int]) -> None:
+        """Register (or replace) the workspaces one agent keeps warm."""
+        slugs = frozenset(slug for slug in workspaces if slug)
+        if slugs:
+            self._targets[owner] = (slugs, window)
+        else:
+            self._targets.pop(owner, None)
+        for slug in list(self._next_at):
+            if slug not in self.workspaces:
+                del self._next_at[slug]
+
+    def remove(self, owner: str) -> None:
+        """Forget the workspaces of one agent."""
+        self.set_targets(owner, (), (0, MINUTES_PER_DAY))
+
+    def _reschedule(self, slug: str) -> None:
+        """Schedule the next keep-warm request for slug, with jitter."""
+        spread = self.interval * self.jitter * self._rng()
+        self._next_at[slug] = self._clock() + self.interval - spread
+
+    def note_traffic(self, slug: str) -> None:
+        """Record a real request that reached slug's model."""
+        if slug not in self._next_at and slug not in self.workspaces:
+            return
+        self.deferred_by_traffic += 1
+        self._reschedule(slug)
+
+    def due(self, minute: int) -> list[str]:
+        """Return the workspaces to warm now and schedule their next request."""
+        now = self._clock()
+        slugs = set()
+        for workspaces, window in self._targets.values():
+            if in_window(window, minute):
+                slugs |= workspaces
+        due = sorted(slug for slug in slugs if now >= self._next_at.get(slug, 0.0))
+        for slug in due:
+            self._reschedule(slug)
+        return due
+
+    def record(self, slug: str, seconds: float, error: str | None = None) -> None:
+        """Record the outcome of a keep-warm request."""
+        self.sent += 1
+        if error:
+            self.failed += 1
+        self._last[slug] = {
+            "at": self._clock(),
+            "ms": round(seconds * 1000, 1),
+            "error": error,
+        }
+
+    def seconds_until_due(self) -> float:
+        """Return how long until the earliest registered workspace is due."""
+        slugs = self.workspaces
+        if not slugs:
+            return math.inf
+        now = self._clock()
+        return max(0.0, min(self._next_at.get(slug, now) for slug in slugs) - now)
+
+    @property
+    def stats(self) -> dict:
+        """Return keep-warm counters and the last request per workspace."""
+        now = self._clock()
+        return {
+            "workspaces": sorted(self.workspaces),
+            "sent": self.sent,
+            "failed": self.failed,
+            "deferred_by_traffic": self.deferred_by_traffic,
+            "last": {
+                slug: {"age_s": round(now - last["at"]), "ms": last["ms"], "error": last["error"]}
+                for slug, last in self._last.items()
+                if slug in self.workspaces
+            },
+        }
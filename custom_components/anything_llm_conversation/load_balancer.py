@@ -0,0 +1,76 @@
+"""Rank endpoints by outstanding requests and EWMA latency."""
+
+import time
+from typing import Callable
+
+EWMA_ALPHA = 0.3  # weight of the newest latency sample
+EWMA_HALF_LIFE = 30.0  # seconds for an idle endpoint's EWMA to relax halfway
+DEFAULT_COST = 1.0  # seconds assumed while no endpoint has latency samples
+
+
+class LoadBalancer:
+    """Rank endpoints by expected wait: (outstanding + 1) × EWMA latency.
+
+    The EWMA is updated from each successful request. While an endpoint
+    gets no samples its EWMA relaxes towards the average of the others
+    (half-life EWMA_HALF_LIFE), so one slow answer does not starve it; an
+    endpoint without samples is assumed to be average. Ties go to the
+    endpoint listed first.
+    """
+
+    def __init__(
+        self,
+        alpha: float = EWMA_ALPHA,
+        half_life: float = EWMA_HALF_LIFE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize with no requests and no samples."""
+        self.alpha = alpha
+        self.half_life = half_life
+        self._clock = clock
+        self.outstanding: dict[str, int] = {}
+        self._ewma: dict[str, tuple[float, float]] = {}
+
+    def begin(self, name: str) -> None:
+        """Count a request sent to name."""
+        self.outstanding[name] = self.outstanding.get(name, 0) + 1
+
+    def end(self, name: str) -> None:
+        """Count a finished request."""
+        self.outstanding[name] = max(0, self.outstanding.get(name, 0) - 1)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Feed the latency of a successful request into name's EWMA."""
+        previous = self.ewma(name) if name in self._ewma else seconds
+        self._ewma[name] = (previous + self.alpha * (seconds - previous), self._clock())
+
+    def _average(self, exclude: str | None = None) -> float:
+        values = [value for name, (value, _at) in self._ewma.items() if name != exclude]
+        return sum(values) / len(values) if values else DEFAULT_COST
+
+    def ewma(self, name: str) -> float:
+        """Return name's EWMA latency in seconds, relaxed for time without samples."""
+        if name not in self._ewma:
+            return self._average()
+        value, at = self._ewma[name]
+        average = self._average(exclude=name)
+        decay = 0.5 ** ((self._clock() - at) / self.half_life)
+        return average + (value - average) * decay
+
+    def cost(self, name: str) -> float:
+        """Return the expected wait of one more request to name."""
+        return (self.outstanding.get(name, 0) + 1) * self.ewma(name)
+
+    def rank(self, names: list[str]) -> list[str]:
+        """Return names ordered from cheapest to most expensive."""
+        return sorted(names, key=self.cost)
+
+    def stats(self, names: list[str]) -> dict:
+        """Return outstanding requests and EWMA latency per endpoint."""
+        return {
+            name: {
+                "outstanding": self.outstanding.get(name, 0),
+                "ewma_ms": round(self.ewma(name) * 1000, 1) if name in self._ewma else None,
+            }
+            for name in names
+        }
@@ -0,0 +1,339 @@
+"""Local answers to simple device-state questions from the exposed-entity snapshot."""
+
+import difflib
+import re
+import time
+from typing import Any, Callable
+
+# Below this the question goes to the LLM instead.
+LOCAL_ANSWER_MIN_CONFIDENCE = 0.85
+# A fuzzy match must beat the best other entity by this much.
+_FUZZY_MARGIN = 0.1
+
+# Spoken words for binary_sensor on/off, by device class.
+_BINARY_SENSOR_WORDS: dict[str | None, tuple[str, str]] = {
+    "door": ("open", "closed"),
+    "garage_door": ("open", "closed"),
+    "window": ("open", "closed"),
+    "opening": ("open", "closed"),
+    "lock": ("unlocked", "locked"),
+    "motion": ("detecting motion", "clear"),
+    "occupancy": ("occupied", "clear"),
+    "presence": ("home", "away"),
+    "moisture": ("wet", "dry"),
+    "smoke": ("detecting smoke", "clear"),
+    "gas": ("detecting gas", "clear"),
+    "carbon_monoxide": ("detecting carbon monoxide", "clear"),
+    "battery": ("low", "normal"),
+    "connectivity": ("connected", "disconnected"),
+    "plug": ("plugged in", "unplugged"),
+    "running": ("running", "not running"),
+}
+
+# States a yes/no question can be checked against, by domain.
+_DOMAIN_STATES: dict[str, frozenset[str]] = {
+    "light": frozenset({"on", "off"}),
+    "switch": frozenset({"on", "off"}),
+    "fan": frozenset({"on", "off"}),
+    "input_boolean": frozenset({"on", "off"}),
+    "automation": frozenset({"on", "off"}),
+    "siren": frozenset({"on", "off"}),
+    "cover": frozenset({"open", "closed", "opening", "closing"}),
+    "lock": frozenset({"locked", "unlocked", "locking", "unlocking", "jammed", "open"}),
+    "person": frozenset({"home", "away"}),
+    "device_tracker": frozenset({"home", "away"}),
+    "media_player": frozenset({"on", "off", "playing", "paused", "idle"}),
+}
+
+# Spoken variants of the states above.
+_EXPECTED_SYNONYMS = {
+    "opened": "open",
+    "close": "closed",
+    "shut": "closed",
+    "lock": "locked",
+    "unlock": "unlocked",
+    "running": "on",
+    "at home": "home",
+    "not home": "away",
+    "playing music": "playing",
+}
+
+_EXPECTED_WORDS = sorted(
+    {word for words in _DOMAIN_STATES.values() for word in words}
+    | {word for pair in _BINARY_SENSOR_WORDS.values() for word in pair}
+    | set(_EXPECTED_SYNONYMS),
+    key=len,
+    reverse=True,
+)
+_ATTRIBUTES = ("temperature", "humidity", "battery level", "battery", "state", "status", "level")
+_ATTRIBUTE_ALT = "|".join(re.escape(a) for a in _ATTRIBUTES)
+_DETERMINER = r"(?:the |my |our )?"
+
+_RE_YES_NO = re.compile(
+    r"^(?P<verb>is|are) " + _DETERMINER + r"(?P<subject>.+?) "
+    r"(?P<expected>" + "|".join(re.escape(w) for w in _EXPECTED_WORDS) + r")"
+    r"(?: right now| now)?$"
+)
+_RE_ATTRIBUTE_OF = re.compile(
+    r"^what(?:'s| is) (?:the )?(?P<attribute>" + _ATTRIBUTE_ALT + r") "
+    r"(?:of|in|on|for) " + _DETERMINER + r"(?P<subject>.+)$"
+)
+_RE_WHAT_IS = re.compile(
+    r"^what(?:'s| is) " + _DETERMINER + r"(?P<subject>.+?)(?: (?P<attribute>" + _ATTRIBUTE_ALT + r"))?$"
+)
+_RE_NON_WORD = re.compile(r"[^\w' ]+")
+_RE_SPACES = re.compile(r"\s+")
+
+
+def normalize_phrase(text: str) -> str:
+    """Lowercase, turn punctuation and underscores into spaces and collapse them."""
+    text = _RE_NON_WORD.sub(" ", text.lower().replace("’", "'").replace("_", " "))
+    return _RE_SPACES.sub(" ", text).strip()
+
+
+class StateQuestion:
+    """A parsed device-state question."""
+
+    __slots__ = ("subjects", "expected", "verb", "attribute")
+
+    def __init__(
+        self,
+        subjects: tuple[str, ...],
+        expected: str | None = None,
+        verb: str = "is",
+        attribute: str | None = None,
+    ) -> None:
+        """Initialize the question.
+
+        Args:
+            subjects: Entity phrases to try, most specific first
+            expected: State asked about in a yes/no question
+            verb: "is" or "are", echoed in the answer
+            attribute: Attribute asked about ("temperature", "state", ...)
+        """
+        self.subjects = subjects
+        self.expected = expected
+        self.verb = verb
+        self.attribute = attribute
+
+
+def parse_state_question(text: str) -> StateQuestion | None:
+    """Return the question if text is a simple state question, else None.
+
+    Supported shapes:
+    - "is the garage door open", "are the kitchen lights on"
+    - "what's the temperature in the living room"
+    - "what's the living room temperature", "what is the front door lock"
+    """
+    phrase = normalize_phrase(text)
+    if match := _RE_YES_NO.match(phrase):
+        expected = match["expected"]
+        return StateQuestion(
+            (match["subject"],),
+            expected=_EXPECTED_SYNONYMS.get(expected, expected),
+            verb=match["verb"],
+        )
+    if match := _RE_ATTRIBUTE_OF.match(phrase):
+        attribute, subject = match["attribute"], match["subject"]
+        subjects = [f"{subject} {attribute}", f"{attribute} {subject}"]
+        if attribute in ("state", "status"):
+            subjects.append(subject)
+        return StateQuestion(tuple(subjects), attribute=attribute)
+    if match := _RE_WHAT_IS.match(phrase):
+        subject, attribute = match["subject"], match["attribute"]
+        if attribute is None:
+            return StateQuestion((subject,))
+        subjects = [f"{subject} {attribute}"]
+        if attribute in ("state", "status"):
+            subjects.append(subject)
+        return StateQuestion(tuple(subjects), attribute=attribute)
+    return None
+
+
+class EntityNameIndex:
+    """Lookup of exposed entities by spoken name, alias or object id.
+
+    Exact phrases resolve with confidence 1.0, the same words in another order
+    with 0.9, and anything else by fuzzy similarity among names sharing at
+    least one word with the phrase. A phrase naming several entities is
+    ambiguous and does not resolve.
+    """
+
+    def __init__(self, entities) -> None:
+        """Index the snapshot rows (entity_id, name, aliases)."""
+        self._exact: dict[str, set[str]] = {}
+        self._by_words: dict[frozenset[str], set[str]] = {}
+        self._by_word: dict[str, set[str]] = {}
+        self.names: dict[str, str] = {}
+        for entity in entities:
+            entity_id = entity["entity_id"]
+            self.names[entity_id] = entity["name"]
+            object_id = entity_id.partition(".")[2]
+            for name in (entity["name"], object_id, *entity["aliases"]):
+                key = normalize_phrase(name)
+                if not key:
+                    continue
+                self._exact.setdefault(key, set()).add(entity_id)
+                words = key.split()
+                self._by_words.setdefault(frozenset(words), set()).add(entity_id)
+                for word in words:
+                    self._by_word.setdefault(word, set()).add(key)
+
+    def __len__(self) -> int:
+        """Return the number of indexed entities."""
+        return len(self.names)
+
+    def resolve(self, phrase: str) -> tuple[str, float] | None:
+        """Return (entity_id, confidence) for the entity phrase names, or None."""
+        key = normalize_phrase(phrase)
+        if not key:
+            return None
+        if (entity_ids := self._exact.get(key)) is not None:
+            return (next(iter(entity_ids)), 1.0) if len(entity_ids) == 1 else None
+        words = key.split()
+        if (entity_ids := self._by_words.get(frozenset(words))) is not None:
+            return (next(iter(entity_ids)), 0.9) if len(entity_ids) == 1 else None
+
+        candidates = set()
+        for word in words:
+            candidates |= self._by_word.get(word, set())
+        scores: dict[str, float] = {}
+        matcher = difflib.SequenceMatcher(b=key, autojunk=False)
+        for candidate in candidates:
+            matcher.set_seq1(candidate)
+            # Cheap upper bounds first; only plausible candidates get a full ratio().
+            cutoff = LOCAL_ANSWER_MIN_CONFIDENCE - _FUZZY_MARGIN
+            if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+                continue
+            ratio = matcher.ratio()
+            for entity_id in self._exact[candidate]:
+                if ratio > scores.get(entity_id, 0.0):
+                    scores[entity_id] = ratio
+        if not scores:
+            return None
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        best_id, best = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if best - runner_up < _FUZZY_MARGIN:
+            return None
+        return best_id, best
+
+
+def spoken_state(domain: str, device_class: str | None, state: str, unit: str | None = None) -> str:
+    """Return the state as it should be spoken ("open", "away", "21.5 °C")."""
+    if state in ("unavailable", "unknown"):
+        return state
+    if domain == "binary_sensor" and state in ("on", "off"):
+        on_word, off_word = _BINARY_SENSOR_WORDS.get(device_class, ("on", "off"))
+        return on_word if state == "on" else off_word
+    if domain in ("person", "device_tracker") and state == "not_home":
+        return "away"
+    spoken = state.replace("_", " ")
+    return f"{spoken} {unit}" if unit else spoken
+
+
+def _state_vocabulary(domain: str, device_class: str | None) -> frozenset[str]:
+    """Return the spoken states a yes/no question can be checked against."""
+    if domain == "binary_sensor":
+        return frozenset(_BINARY_SENSOR_WORDS.get(device_class, ("on", "off")))
+    return _DOMAIN_STATES.get(domain, frozenset())
+
+
+def format_state_answer(
+    question: StateQuestion,
+    name: str,
+    domain: str,
+    device_class: str | None,
+    state: str,
+    unit: str | None = None,
+) -> str | None:
+    """Return the spoken answer, or None if the question cannot be answered locally."""
+    spoken = spoken_state(domain, device_class, state, unit)
+    if question.expected is None:
+        return f"{name} {question.verb} {spoken}."
+    if spoken in ("unavailable", "unknown"):
+        return f"{name} {question.verb} {spoken}."
+    if question.expected not in _state_vocabulary(domain, device_class):
+        return None
+    if spoken == question.expected:
+        return f"Yes, {name} {question.verb} {spoken}."
+    return f"No, {name} {question.verb} {spoken}."
+
+
+class LocalStateAnswerer:
+    """Answer simple state questions without a round trip to the LLM.
+
+    The name index is rebuilt only when the snapshot tuple changes; states are
+    read live through get_state(entity_id) -> (state, attributes) | None, so
+    answers are never staler than Home Assistant itself.
+    """
+
+    def __init__(
+        self,
+        min_confidence: float = LOCAL_ANSWER_MIN_CONFIDENCE,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        """Initialize with an empty index."""
+        self.min_confidence = min_confidence
+        self._clock = clock
+        self._index = EntityNameIndex(())
+        self._source: tuple | None = None
+        self.answered = 0
+        self.low_confidence = 0
+        self.answer_seconds = 0.0
+
+    @property
+    def stats(self) -> dict[str, int | float]:
+        """Return answer counts and mean local answer time."""
+        return {
+            "answered": self.answered,
+            "low_confidence": self.low_confidence,
+            "indexed_entities": len(self._index),
+            "mean_answer_ms": round(self.answer_seconds / self.answered * 1000, 3)
+            if self.answered
+            else 0.0,
+        }
+
+    def answer(
+        self,
+        text: str,
+        entities: tuple,
+        get_state: Callable[[str], tuple[str, dict[str, Any]] | None],
+    ) -> str | None:
+        """Return a spoken answer, or None to hand the question to the LLM."""
+        question = parse_state_question(text)
+        if question is None:
+            return None
+        started = self._clock()
+        if entities is not self._source:
+            self._index = EntityNameIndex(entities)
+            self._source = entities
+
+        entity_id = None
+        for subject in question.subjects:
+            resolved = self._index.resolve(subject)
+            if resolved is not None and resolved[1] >= self.min_confidence:
+                entity_id = resolved[0]
+                break
+        if entity_id is None:
+            self.low_confidence += 1
+            return None
+        current = get_state(entity_id)
+        if current is None:
+            self.low_confidence += 1
+            return None
+        state, attributes = current
+        response = format_state_answer(
+            question,
+            self._index.names[entity_id],
+            entity_id.partition(".")[0],
+            attributes.get("device_class"),
+            state,
+            attributes.get("unit_of_measurement"),
+        )
+        if response is None:
+            self.low_confidence += 1
+            return None
+        self.answered += 1
+        self.answer_seconds += self._clock() - started
+        return response
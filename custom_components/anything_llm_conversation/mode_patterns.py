@@ -1,7 +1,5 @@
 """Pattern matching data for mode suggestions and detection."""
 
-import re
-
 # Mode detection keywords - explicit mode switching commands
 MODE_KEYWORDS = {
     "adventure": ["adventure mode", "author mode", "story mode", "creative mode"],
@@ -16,6 +14,46 @@ MODE_KEYWORDS = {
     "default": ["default mode", "normal mode", "standard mode"]
 }
 
+# Legacy mode keys now map to workspace slugs.
+MODE_TO_WORKSPACE = {
+    "analysis": "analysis",
+    "research": "research",
+    "security": "security",
+    "code_review": "investigation",
+    "troubleshooting": "investigation",
+    "guest": "default",
+    "default": "default",
+}
+
+# L5: maps the lowercase display-name fragment to its mode key, used to detect
+# when the LLM's response is asking the user to confirm a mode switch.
+RESPONSE_MODE_HINTS = {
+    "analysis mode": "analysis",
+    "research mode": "research",
+    "code review mode": "code_review",
+    "troubleshooting mode": "troubleshooting",
+    "guest mode": "guest",
+    "security mode": "security",
+    "default mode": "default",
+}
+
+
+def response_mode_hint(text: str, current_workspace: str | None) -> str | None:
+    """Return the workspace slug a reply asks the user to switch to, if any.
+
+    Only questions count, and never the workspace the conversation is
+    already in. Legacy mode keys are mapped through MODE_TO_WORKSPACE.
+    """
+    if "?" not in text:
+        return None
+    text_lower = text.lower()
+    for hint_name, hint_key in RESPONSE_MODE_HINTS.items():
+        workspace = MODE_TO_WORKSPACE.get(hint_key, hint_key)
+        if hint_name in text_lower and workspace != current_workspace:
+            return workspace
+    return None
+
+
 # Mode query keywords
 MODE_QUERY_KEYWORDS = ["what mode", "which mode", "current mode", "what workspace", "which workspace", "current workspace"]
 
@@ -134,14 +172,3 @@ MODE_SUGGESTION_PATTERNS = {
 # Minimum confidence threshold for mode suggestions
 # How many pattern matches needed before suggesting a mode
 MODE_SUGGESTION_THRESHOLD = 2  # Require at least 2 pattern matches to reduce false positives
-
-# Issue 18: compile each mode's pattern list into a single regex so detect_suggested_modes
-# scans the input text once per mode instead of doing N individual substring checks.
-# Patterns sorted longest-first so multi-word phrases take priority in alternation.
-_MODE_PATTERN_REGEXES: dict[str, re.Pattern] = {
-    mode_key: re.compile(
-        r"(?:" + "|".join(re.escape(p) for p in sorted(patterns, key=len, reverse=True)) + r")",
-        re.IGNORECASE,
-    )
-    for mode_key, patterns in MODE_SUGGESTION_PATTERNS.items()
-}
@@ -0,0 +1,122 @@
+"""Aho-Corasick multi-pattern matcher with word-boundary awareness."""
+
+from collections import deque
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class PatternAutomaton:
+    """Match many labelled phrases against a text in a single linear pass.
+
+    Patterns are matched as whole words: a match must start and end at a word
+    boundary, so "vs" does not match inside "tvs". Each label's hits are then
+    counted leftmost-longest without overlap (the same rule a longest-first
+    regex alternation applies), so "compared to last" counts once, not as
+    both itself and "compared to". A phrase listed under several labels counts
+    for each of them.
+
+    Input is expected to be lowercase already; patterns are lowercased.
+    """
+
+    def __init__(self, patterns_by_label: dict[str, list[str]]) -> None:
+        """Build the automaton from {label: [phrase, ...]}."""
+        self._patterns: list[str] = []
+        self._labels: list[tuple[str, ...]] = []
+        index: dict[str, int] = {}
+        for label, patterns in patterns_by_label.items():
+            for pattern in patterns:
+                pattern = pattern.lower()
+                if not pattern:
+                    continue
+                if pattern not in index:
+                    index[pattern] = len(self._patterns)
+                    self._patterns.append(pattern)
+                    self._labels.append(())
+                pid = index[pattern]
+                if label not in self._labels[pid]:
+                    self._labels[pid] += (label,)
+        self.labels: tuple[str, ...] = tuple(patterns_by_label)
+
+        # Trie: per-state transitions, failure link and patterns ending here
+        # (including those inherited through failure links).
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[int, ...]] = [()]
+        for pid, pattern in enumerate(self._patterns):
+            state = 0
+            for char in pattern:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] += (pid,)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        """Return the number of distinct patterns."""
+        return len(self._patterns)
+
+    def find(self, text: str) -> list[tuple[int, int, str]]:
+        """Return every whole-word match as (start, end, pattern), overlaps included."""
+        return [(start, end, self._patterns[pid]) for start, end, pid in self._scan(text)]
+
+    def count(self, text: str) -> dict[str, int]:
+        """Return {label: hits} for labels with at least one hit, in label order."""
+        by_label: dict[str, list[tuple[int, int]]] = {}
+        for start, end, pid in self._scan(text):
+            for label in self._labels[pid]:
+                by_label.setdefault(label, []).append((start, end))
+
+        counts = {}
+        for label in self.labels:
+            spans = by_label.get(label)
+            if not spans:
+                continue
+            # Leftmost-longest, non-overlapping.
+            spans.sort(key=lambda span: (span[0], -span[1]))
+            hits = 0
+            last_end = 0
+            for start, end in spans:
+                if start >= last_end:
+                    hits += 1
+                    last_end = end
+            counts[label] = hits
+        return counts
+
+    def _scan(self, text: str) -> list[tuple[int, int, int]]:
+        """Return (start, end, pattern id) for every whole-word match."""
+        matches = []
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self._patterns
+        state = 0
+        length = len(text)
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not out[state]:
+                continue
+            end = i + 1
+            if end < length and _is_word_char(text[end]):
+                continue
+            for pid in out[state]:
+                start = end - len(patterns[pid])
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                matches.append((start, end, pid))
+        return matches
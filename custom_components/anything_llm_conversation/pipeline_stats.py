@@ -0,0 +1,60 @@
+"""Per-stage hit rate and timing for the local-first conversation pipeline."""
+
+import time
+from typing import Callable
+
+# Stages in the order a turn passes through them.
+STAGE_COMMANDS = "commands"
+STAGE_LOCAL_INTENTS = "local_intents"
+STAGE_LOCAL_ANSWERS = "local_answers"
+STAGE_RESPONSE_CACHE = "response_cache"
+STAGE_LLM = "llm"
+
+
+class PipelineStats:
+    """Count how often each stage handled a turn and how long it took.
+
+    A stage that ran but passed the turn on is an attempt without a hit.
+    ``llm_avoided_rate`` is the share of turns that never reached the LLM.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        """Initialize empty counters."""
+        self._clock = clock
+        self.turns = 0
+        self._stages: dict[str, list] = {}
+
+    def begin_turn(self) -> float:
+        """Count a new turn and return its start time."""
+        self.turns += 1
+        return self._clock()
+
+    def start(self) -> float:
+        """Return the start time for a stage."""
+        return self._clock()
+
+    def record(self, stage: str, hit: bool, started: float) -> None:
+        """Record one run of stage that began at started."""
+        counters = self._stages.setdefault(stage, [0, 0, 0.0])
+        counters[0] += 1
+        counters[1] += int(hit)
+        counters[2] += self._clock() - started
+
+    @property
+    def stats(self) -> dict:
+        """Return per-stage attempts, hits, hit rate and mean time."""
+        stages = {
+            stage: {
+                "attempts": attempts,
+                "hits": hits,
+                "hit_rate": round(hits / attempts, 3),
+                "mean_ms": round(seconds / attempts * 1000, 3),
+            }
+            for stage, (attempts, hits, seconds) in self._stages.items()
+        }
+        llm_turns = self._stages.get(STAGE_LLM, (0,))[0]
+        return {
+            "turns": self.turns,
+            "llm_avoided_rate": round(1 - llm_turns / self.turns, 3) if self.turns else 0.0,
+            "stages": stages,
+        }
@@ -0,0 +1,104 @@
+"""Fast system prompt rendering: native entity CSV block and compiled template cache."""
+
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Callable
+
+# Built-in template variable holding the rendered CSV rows. Prompts may use it
+# directly instead of the for-loop below.
+ENTITIES_CSV_VARIABLE = "exposed_entities_csv"
+
+# The canonical entity loop shipped in DEFAULT_PROMPT, the workspace prompts and
+# the mode personas:
+#
+#   {% for entity in exposed_entities -%}
+#   {{ entity.entity_id }},{{ entity.name }},{{ entity.state }},{{entity.aliases | join('/')}}
+#   {% endfor -%}
+#
+# The trailing "-%}" of the for tag strips the newline before the row, and the
+# one on endfor strips all whitespace after the loop, so the pattern consumes
+# that whitespace too. Any other spelling is left to Jinja.
+_RE_ENTITY_BLOCK = re.compile(
+    r"\{%\s*for\s+entity\s+in\s+exposed_entities\s*-%\}\s*"
+    r"\{\{\s*entity\.entity_id\s*\}\},"
+    r"\{\{\s*entity\.name\s*\}\},"
+    r"\{\{\s*entity\.state\s*\}\},"
+    r"\{\{\s*entity\.aliases\s*\|\s*join\(\s*'/'\s*\)\s*\}\}\n"
+    r"\{%\s*endfor\s*-%\}\s*"
+)
+_ENTITIES_CSV_EXPRESSION = "{{ " + ENTITIES_CSV_VARIABLE + " }}"
+
+
+def rewrite_entity_block(raw_prompt: str) -> str:
+    """Replace the canonical entity loop with the native CSV variable."""
+    return _RE_ENTITY_BLOCK.sub(_ENTITIES_CSV_EXPRESSION, raw_prompt)
+
+
+def uses_entities_csv(prompt: str) -> bool:
+    """Return True if the prompt references the native CSV variable."""
+    return ENTITIES_CSV_VARIABLE in prompt
+
+
+def render_entities_csv(entities) -> str:
+    """Render entity rows exactly as the canonical Jinja loop would."""
+    return "".join(
+        f"{entity['entity_id']},{entity['name']},{entity['state']},{'/'.join(entity['aliases'])}\n"
+        for entity in entities
+    )
+
+
+class CompiledPromptCache:
+    """Bounded LRU of compiled prompt templates with compile-time accounting.
+
+    Keys identify the prompt source (e.g. workspace, mode and prompt text);
+    values are whatever compile_fn() returns. Every miss is timed, so the stats
+    can estimate how much compile time the hits saved.
+    """
+
+    def __init__(
+        self, max_entries: int = 16, clock: Callable[[], float] = time.perf_counter
+    ) -> None:
+        """Initialize an empty cache."""
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.compile_seconds = 0.0
+
+    def __len__(self) -> int:
+        """Return the number of cached templates."""
+        return len(self._entries)
+
+    @property
+    def stats(self) -> dict[str, int | float]:
+        """Return hit/miss counts and compile time spent and saved."""
+        mean_compile = self.compile_seconds / self.misses if self.misses else 0.0
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "compile_seconds": round(self.compile_seconds, 6),
+            "saved_seconds": round(self.hits * mean_compile, 6),
+        }
+
+    def get(self, key: Hashable, compile_fn: Callable[[], Any]) -> Any:
+        """Return the compiled template for key, compiling it on a miss."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        started = self._clock()
+        compiled = compile_fn()
+        self.compile_seconds += self._clock() - started
+        self.misses += 1
+        self._entries[key] = compiled
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return compiled
+
+    def clear(self) -> None:
+        """Drop every cached template (e.g. after an options change)."""
+        self._entries.clear()
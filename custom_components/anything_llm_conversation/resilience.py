@@ -0,0 +1,338 @@
+"""Resilience primitives for talking to AnythingLLM endpoints."""
+
+import asyncio
+import math
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Hashable
+from typing import Any, Callable
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Per-endpoint circuit breaker driven by real request outcomes.
+
+    closed    → requests flow; consecutive failures are counted.
+    open      → requests are rejected until recovery_timeout has elapsed.
+    half_open → exactly one trial request is let through; its outcome either
+                closes the breaker or re-opens it for another timeout.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 2,
+        recovery_timeout: float = 30.0,
+        on_change: Callable[[], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize a closed breaker."""
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._on_change = on_change
+        self._clock = clock
+        self._state = BREAKER_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Return the current state, moving open → half_open once the timeout elapses."""
+        if (
+            self._state == BREAKER_OPEN
+            and self._clock() - self._opened_at >= self.recovery_timeout
+        ):
+            self._state = BREAKER_HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    @property
+    def failures(self) -> int:
+        """Return the number of consecutive failures recorded."""
+        return self._failures
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now.
+
+        In half_open state only the first caller gets True; it must report the
+        outcome via record_success/record_failure (or release if it never sent).
+        """
+        state = self.state
+        if state == BREAKER_CLOSED:
+            return True
+        if state == BREAKER_OPEN or self._trial_in_flight:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        """Record a request that reached a working endpoint."""
+        self._failures = 0
+        self._trial_in_flight = False
+        self._set_state(BREAKER_CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a failed request (transport error, timeout or server error)."""
+        self._failures += 1
+        self._trial_in_flight = False
+        if self.state == BREAKER_HALF_OPEN or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+            self._set_state(BREAKER_OPEN)
+
+    def release(self) -> None:
+        """Give back a half-open trial slot that was granted but never used."""
+        self._trial_in_flight = False
+
+    def snapshot(self) -> dict:
+        """Return the breaker state in a form that can be persisted."""
+        state = self.state
+        return {
+            "state": state,
+            "failures": self._failures,
+            "open_for": None if state == BREAKER_CLOSED else self._clock() - self._opened_at,
+        }
+
+    def restore(self, snapshot: dict, elapsed: float = 0.0) -> None:
+        """Restore a snapshot taken elapsed seconds ago, without notifying.
+
+        An open breaker keeps counting down its recovery timeout from when it
+        opened; a half-open one is due for a trial request right away.
+        """
+        self._failures = int(snapshot.get("failures", 0))
+        self._trial_in_flight = False
+        if snapshot.get("state") not in (BREAKER_OPEN, BREAKER_HALF_OPEN):
+            self._state = BREAKER_CLOSED
+            return
+        open_for = float(snapshot.get("open_for") or 0.0) + elapsed
+        if snapshot["state"] == BREAKER_HALF_OPEN:
+            open_for = max(open_for, self.recovery_timeout)
+        self._state = BREAKER_OPEN
+        self._opened_at = self._clock() - open_for
+
+    def _set_state(self, state: str) -> None:
+        if state == self._state:
+            return
+        self._state = state
+        if self._on_change is not None:
+            self._on_change()
+
+
+class LatencyTracker:
+    """Rolling window of successful request latencies for one endpoint."""
+
+    def __init__(self, window: int = 50) -> None:
+        """Initialize an empty window holding the last `window` samples."""
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        """Return the number of samples in the window."""
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Add a latency sample in seconds."""
+        self._samples.append(seconds)
+
+    @property
+    def samples(self) -> list[float]:
+        """Return the samples in the window, oldest first."""
+        return list(self._samples)
+
+    def percentile(self, pct: float) -> float | None:
+        """Return the pct-th percentile (nearest rank), or None without samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+        return ordered[rank]
+
+
+class HealthProbeScheduler:
+    """Decide when an endpoint needs an active health probe.
+
+    Real chat outcomes are the main health signal and count as checks, so a
+    busy endpoint is never probed. A healthy endpoint is probed once
+    interval has passed without any check. A down endpoint is probed with
+    exponential backoff (backoff_base doubling up to backoff_max, each delay
+    randomly shortened by up to half). Once nothing has used the endpoint
+    for idle_suspend, probing stops until the next activity.
+
+    With deep_interval set, a probe may also send a tiny chat through the
+    LLM at most once per deep_interval. An endpoint whose API answers but
+    whose chat fails is down until a deep probe or a real chat succeeds, and
+    one that answers slower than degraded_after is degraded.
+    """
+
+    def __init__(
+        self,
+        interval: float = 30.0,
+        backoff_base: float = 5.0,
+        backoff_max: float = 300.0,
+        idle_suspend: float = 3 * 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random,
+        deep_interval: float | None = None,
+        degraded_after: float = 10.0,
+    ) -> None:
+        """Initialize with an unchecked endpoint and activity starting now."""
+        self.interval = interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.idle_suspend = idle_suspend
+        self.deep_interval = deep_interval
+        self.degraded_after = degraded_after
+        self._clock = clock
+        self._rng = rng
+        self.healthy: bool | None = None
+        self._last_check = 0.0
+        self._last_activity = clock()
+        self._down_checks = 0
+        self._backoff = 0.0
+        self.probes = 0
+        self.passive_checks = 0
+        self.probe_latency: float | None = None
+        self.degraded = False
+        self.deep_probes = 0
+        self.deep_latency: float | None = None
+        self._last_deep = float("-inf")
+        self._deep_failed = False
+
+    @property
+    def suspended(self) -> bool:
+        """Return True if the endpoint has been idle for idle_suspend."""
+        return self._clock() - self._last_activity >= self.idle_suspend
+
+    def note_activity(self) -> None:
+        """Record that someone is using the endpoint (resumes probing)."""
+        self._last_activity = self._clock()
+
+    def _record(self, healthy: bool) -> None:
+        self._last_check = self._clock()
+        self.healthy = healthy
+        if healthy:
+            self._down_checks = 0
+            self._backoff = 0.0
+            return
+        self._down_checks += 1
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (self._down_checks - 1))
+        self._backoff = delay * (1 - 0.5 * self._rng())
+
+    def record_probe(self, healthy: bool, seconds: float | None = None) -> None:
+        """Record the result of an active probe and, if it answered, its latency."""
+        self.probes += 1
+        if healthy and seconds is not None:
+            self.probe_latency = seconds
+        # The API answering says nothing about an LLM that failed a deep probe.
+        self._record(healthy and not self._deep_failed)
+
+    def deep_probe_due(self) -> bool:
+        """Return True if the next probe should also send a chat through the LLM.
+
+        Deep probes run at most once per deep_interval; after a failed one,
+        every probe is deep until the LLM answers again.
+        """
+        if self.deep_interval is None:
+            return False
+        return self._deep_failed or self._clock() - self._last_deep >= self.deep_interval
+
+    def record_deep_probe(self, answered: bool | None, seconds: float) -> None:
+        """Record a deep probe: whether the LLM answered and how long it took.
+
+        answered is None when the probe could not tell (e.g. the canary
+        workspace does not exist); that only counts against the rate limit.
+        """
+        self.deep_probes += 1
+        self._last_deep = self._clock()
+        if answered is None:
+            return
+        self._deep_failed = not answered
+        self.degraded = answered and seconds >= self.degraded_after
+        if answered:
+            self.deep_latency = seconds
+        self._record(answered)
+
+    def restore(
+        self, healthy: bool | None, probe_latency: float | None = None, degraded: bool = False
+    ) -> None:
+        """Restore the last known health; the next probe is due immediately."""
+        self.healthy = healthy
+        self.probe_latency = probe_latency
+        self.degraded = degraded
+        self._last_check = float("-inf")
+
+    def record_passive(self, healthy: bool) -> None:
+        """Record what a real request revealed about the endpoint."""
+        self.passive_checks += 1
+        self.note_activity()
+        if healthy:
+            self._deep_failed = False
+        self._record(healthy)
+
+    def next_probe_in(self) -> float | None:
+        """Return seconds until the next probe, or None while suspended."""
+        if self.suspended:
+            return None
+        if self.healthy is None:
+            return 0.0
+        delay = self.interval if self.healthy else self._backoff
+        return max(0.0, self._last_check + delay - self._clock())
+
+    @property
+    def stats(self) -> dict:
+        """Return probe counters and the current schedule."""
+        next_probe = self.next_probe_in()
+        return {
+            "healthy": self.healthy,
+            "probes": self.probes,
+            "passive_checks": self.passive_checks,
+            "probe_latency_ms": None if self.probe_latency is None else round(self.probe_latency * 1000, 1),
+            "degraded": self.degraded,
+            "deep_probes": self.deep_probes,
+            "deep_latency_ms": None if self.deep_latency is None else round(self.deep_latency * 1000, 1),
+            "suspended": next_probe is None,
+            "next_probe_s": None if next_probe is None else round(next_probe, 1),
+            "idle_s": round(self._clock() - self._last_activity),
+        }
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one shared in-flight call.
+
+    The first caller for a key starts the call; callers arriving with the same
+    key while it is still running await the same result (or exception). The
+    key is forgotten as soon as the call finishes, so nothing is cached.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no calls in flight."""
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        """Return the number of distinct calls in flight."""
+        return len(self._inflight)
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Await call() for key, sharing it with concurrent callers of the same key.
+
+        A cancelled caller only stops waiting; the shared call keeps running
+        for the others.
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(call())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every waiter was cancelled.
+        if not future.cancelled():
+            future.exception()
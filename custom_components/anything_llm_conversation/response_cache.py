@@ -0,0 +1,130 @@
+"""Two-tier response cache for stateless workspace queries."""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+# Memory tier holds the hottest answers; the disk tier is larger because it is
+# only read on a memory miss and written with a debounce.
+DEFAULT_MEMORY_ENTRIES = 128
+DEFAULT_DISK_ENTRIES = 1024
+DISK_SAVE_DELAY = 30  # seconds
+
+
+def make_cache_key(workspace_slug: str, message: str, system_prompt: str | None) -> str:
+    """Return the cache key for a non-thread chat request.
+
+    Only the last user message and the system prompt are sent for workspace
+    chats, so together with the workspace they fully determine the request.
+    """
+    digest = hashlib.sha256()
+    for part in (workspace_slug, message, system_prompt or ""):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """Bounded LRU of chat responses with per-entry TTL and an optional disk tier.
+
+    Entries are stored as [expires_at, response] using wall-clock time so that
+    persisted entries keep their expiry across restarts. The disk tier is any
+    object with HA Store's async_load/async_delay_save interface.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MEMORY_ENTRIES,
+        max_disk_entries: int = DEFAULT_DISK_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize an empty, memory-only cache."""
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._clock = clock
+        self._memory: OrderedDict[str, list] = OrderedDict()
+        self._disk: OrderedDict[str, list] = OrderedDict()
+        self._store: Any = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters and current tier sizes."""
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self._disk),
+        }
+
+    async def async_attach_store(self, store: Any) -> None:
+        """Enable the disk tier and load its unexpired entries."""
+        self._store = store
+        data = await store.async_load() or {}
+        now = self._clock()
+        for key, entry in data.get("entries", {}).items():
+            if entry[0] > now:
+                self._disk[key] = entry
+        while len(self._disk) > self.max_disk_entries:
+            self._disk.popitem(last=False)
+
+    def get(self, key: str) -> dict | None:
+        """Return a copy of the cached response for key, or None on a miss."""
+        now = self._clock()
+        entry = self._memory.get(key)
+        if entry is not None and entry[0] <= now:
+            del self._memory[key]
+            entry = None
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+        entry = self._disk.get(key)
+        if entry is not None and entry[0] > now:
+            self._disk.move_to_end(key)
+            self._remember(key, entry)
+            self.hits += 1
+            self.disk_hits += 1
+            return dict(entry[1])
+        if entry is not None:
+            del self._disk[key]
+            self._schedule_save()
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, response: dict, ttl: float, persist: bool = False) -> None:
+        """Cache response for ttl seconds; persist=True also writes it to disk."""
+        entry = [self._clock() + ttl, dict(response)]
+        self._remember(key, entry)
+        if persist and self._store is not None:
+            self._disk[key] = entry
+            self._disk.move_to_end(key)
+            while len(self._disk) > self.max_disk_entries:
+                self._disk.popitem(last=False)
+            self._schedule_save()
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        self._memory.clear()
+        if self._disk:
+            self._disk.clear()
+            self._schedule_save()
+
+    def _remember(self, key: str, entry: list) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _schedule_save(self) -> None:
+        if self._store is not None:
+            self._store.async_delay_save(self._data_to_save, DISK_SAVE_DELAY)
+
+    def _data_to_save(self) -> dict:
+        return {"entries": dict(self._disk)}
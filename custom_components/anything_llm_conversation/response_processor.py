@@ -1,6 +1,7 @@
 """Response processing utilities for cleaning and formatting LLM responses."""
 
 import html
+import json
 import re
 
 # Compiled regex patterns for text cleaning (performance optimization)
@@ -11,6 +12,10 @@ _RE_BR_TAGS = re.compile(r'<br\s*/?>', flags=re.IGNORECASE)
 _RE_HTML_TAGS = re.compile(r'<[^>]+>')
 _RE_CELSIUS = re.compile(r'(\d+)C\b')
 _RE_FAHRENHEIT = re.compile(r'(\d+)F\b')
+# Streaming cleaner: an opening <think> tag, and a markdown link that has
+# started but not yet closed at the end of the buffered text.
+_RE_THINK_OPEN = re.compile(r'<think>', flags=re.IGNORECASE)
+_RE_OPEN_LINK = re.compile(r'\[[^\]]*(?:\](?:\([^\)]*)?)?\Z')
 
 # Follow-up detection phrases
 FOLLOW_UP_PHRASES = frozenset([
@@ -45,7 +50,11 @@ def clean_response_for_tts(text: str) -> str:
     """
     # Decode HTML entities FIRST so that tag-based patterns below match both
     # literal tags and HTML-encoded variants (e.g. &lt;think&gt; → <think>).
-    text = html.unescape(text)
+    return _clean_decoded_text(html.unescape(text))
+
+
+def _strip_markup(text: str) -> str:
+    """Remove <br>, <think> blocks, HTML tags and asterisks from decoded text."""
     text = _RE_BR_TAGS.sub(' ', text)   # Convert <br> to space before tag stripping
 
     # Option 1: Remove <think> tags and their content
@@ -59,7 +68,12 @@ def clean_response_for_tts(text: str) -> str:
     text = _RE_HTML_TAGS.sub('', text)
     
     # Option 3: Remove asterisks (markdown bold/italic)
-    text = text.replace('*', '')
+    return text.replace('*', '')
+
+
+def _clean_decoded_text(text: str) -> str:
+    """Apply the TTS cleanup steps that follow HTML entity decoding."""
+    text = _strip_markup(text)
     
     # Option 4: Remove other common markdown formatting
     # Uncomment the ones you want to remove:
@@ -86,6 +100,12 @@ def clean_response_for_tts(text: str) -> str:
     # OR convert emojis to text descriptions:
     # text = emoji.demojize(text, delimiters=(" ", " "))  # 😀 becomes "grinning face"
     
+    text = _spell_symbols(text)
+    return _strip_edges(text)
+
+
+def _spell_symbols(text: str) -> str:
+    """Spell out symbols in whitespace-normalized text."""
     # Option 7: Special character cleanup
     # Uncomment to clean up characters that don't work well with TTS:
     text = text.replace('°', ' degrees ')  # Temperature symbols
@@ -94,8 +114,11 @@ def clean_response_for_tts(text: str) -> str:
     text = text.replace('€', ' euros ')
     text = text.replace('£', ' pounds ')
     text = _RE_CELSIUS.sub(r'\1 degrees Celsius', text)  # 25C -> 25 degrees Celsius
-    text = _RE_FAHRENHEIT.sub(r'\1 degrees Fahrenheit', text)  # 77F -> 77 degrees Fahrenheit
-    
+    return _RE_FAHRENHEIT.sub(r'\1 degrees Fahrenheit', text)  # 77F -> 77 degrees Fahrenheit
+
+
+def _strip_edges(text: str) -> str:
+    """Strip surrounding whitespace and stray leading punctuation."""
     # Clean up stray leading punctuation that may remain after tag removal
     text = text.strip()
     text = text.lstrip('.,;:!?-')  # Remove leading punctuation
@@ -108,6 +131,179 @@ def clean_response_for_tts(text: str) -> str:
     return text.strip()
 
 
+class StreamingTTSCleaner:
+    """Incremental counterpart of clean_response_for_tts for streamed text.
+
+    Feed chunks as they arrive; each call returns the speakable text that is
+    safe to emit so far. Text is held back while a <think> block, HTML tag,
+    markdown link or HTML entity may still be open, and is only released at
+    whitespace boundaries. Concatenating every feed() result plus flush()
+    yields exactly clean_response_for_tts() of the full input.
+
+    Only the unreleased suffix is buffered and cleaned: once no markup is
+    open at a whitespace boundary, nothing later can change how the text
+    before it cleans, so each feed costs time in the size of the chunk (and
+    of any markup still open), not of everything streamed so far.
+    """
+
+    # Safe-prefix candidates tried per feed before waiting for more text.
+    _MAX_CUT_ATTEMPTS = 8
+    # Open markup only closes with one of these characters, so a held-back
+    # suffix is not rescanned until a chunk brings one.
+    _CLOSERS = frozenset('>])')
+
+    def __init__(self) -> None:
+        """Initialize an empty cleaner."""
+        # Entity-decoded text after the last released cut; html.unescape is
+        # applied only to whitespace-terminated input because an entity
+        # reference can never span whitespace.
+        self._pending = ""
+        # Raw text after the last whitespace (may hold a partial entity).
+        self._tail = ""
+        # True while _pending has open markup and no closer has arrived since.
+        self._blocked = False
+        # Whether the normalized text so far ends in a space, so a run of
+        # whitespace split over two releases still collapses to one space.
+        self._space_before = False
+        # Cleaned text not spoken yet: trailing whitespace, or everything
+        # while only leading punctuation and whitespace have been seen.
+        self._held = ""
+        self._started = False
+        self._emitted: list[str] = []
+
+    @property
+    def text(self) -> str:
+        """Return all cleaned text emitted so far."""
+        return "".join(self._emitted)
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk of raw text and return newly speakable text (may be empty)."""
+        split = len(chunk)
+        while split and not chunk[split - 1].isspace():
+            split -= 1
+        if not split:
+            self._tail += chunk
+            return ""
+        decoded = html.unescape(self._tail + chunk[:split])
+        self._tail = chunk[split:]
+        self._pending += decoded
+        if self._blocked and self._CLOSERS.isdisjoint(decoded):
+            return ""
+        cut = self._safe_cut()
+        self._blocked = cut is None
+        if cut is None:
+            return ""
+        piece = self._pending[:cut]
+        self._pending = self._pending[cut:]
+        return self._emit(self._clean_piece(piece))
+
+    def flush(self) -> str:
+        """Finish the stream and return any remaining cleaned text."""
+        piece = self._pending + html.unescape(self._tail)
+        self._pending = self._tail = ""
+        delta = self._emit(self._clean_piece(piece))
+        # Trailing whitespace is stripped from the final text.
+        self._held = ""
+        return delta
+
+    def _safe_cut(self) -> int | None:
+        """Return the largest whitespace offset in _pending that is safe to release up to."""
+        text = self._pending
+        bound = len(text)
+        lt = text.rfind('<')
+        if lt > text.rfind('>'):
+            bound = lt
+        lowered = text.lower()
+        think_open = lowered.rfind('<think>')
+        if think_open > lowered.rfind('</think>'):
+            bound = min(bound, think_open)
+        open_link = _RE_OPEN_LINK.search(text)
+        if open_link:
+            bound = min(bound, open_link.start())
+
+        cut = bound
+        for _attempt in range(self._MAX_CUT_ATTEMPTS):
+            while cut > 0 and not text[cut - 1].isspace():
+                cut -= 1
+            if not cut:
+                return None
+            if _is_safe_prefix(text[:cut]):
+                return cut
+            cut -= 1
+        return None
+
+    def _clean_piece(self, piece: str) -> str:
+        """Clean a released piece of decoded text, minus the edge stripping."""
+        text = _RE_MARKDOWN_LINKS.sub(r'\1', _strip_markup(piece))
+        text = _RE_WHITESPACE.sub(' ', text)
+        if self._space_before and text.startswith(' '):
+            text = text[1:]
+        if text:
+            self._space_before = text.endswith(' ')
+        return _spell_symbols(text)
+
+    def _emit(self, cleaned: str) -> str:
+        """Return the speakable part of cleaned, holding back what may still be stripped."""
+        text = self._held + cleaned
+        if not self._started:
+            # Same leading cleanup as _strip_edges; it is final once any
+            # other character follows.
+            text = text.lstrip().lstrip('.,;:!?-')
+            if text.startswith('.'):
+                text = text[1:]
+            text = text.lstrip()
+            if not text:
+                self._held += cleaned
+                return ""
+            self._started = True
+        delta = text.rstrip()
+        self._held = text[len(delta):]
+        if delta:
+            self._emitted.append(delta)
+        return delta
+
+
+def _is_safe_prefix(text: str) -> bool:
+    """Return True if no later text can change how this decoded prefix cleans.
+
+    Mirrors the order of _strip_markup: an unclosed <think> block, a dangling
+    '<' after think removal, or an unterminated markdown link after tag
+    removal could all be completed by text that has not arrived yet.
+    """
+    text = _RE_BR_TAGS.sub(' ', text)
+    last_think = 0
+    for match in _RE_THINK_TAGS.finditer(text):
+        last_think = match.end()
+    if _RE_THINK_OPEN.search(text, last_think):
+        return False
+    text = _RE_THINK_TAGS.sub('', text)
+    if text.rfind('<') > text.rfind('>'):
+        return False
+    text = _RE_HTML_TAGS.sub('', text).replace('*', '')
+    return _RE_OPEN_LINK.search(text) is None
+
+
+def parse_stream_event(line: str) -> dict | None:
+    """Parse one server-sent-events line from AnythingLLM's stream-chat endpoint.
+    
+    Args:
+        line: A single line of the SSE response body
+        
+    Returns:
+        The decoded event payload, or None for blank, comment or malformed lines
+    """
+    if not line.startswith("data:"):
+        return None
+    data = line[5:].strip()
+    if not data:
+        return None
+    try:
+        event = json.loads(data)
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) else None
+
+
 def should_continue_conversation(response_text: str) -> bool:
     """Detect if LLM response indicates a follow-up question.
     
@@ -0,0 +1,121 @@
+"""Cached catalog of AnythingLLM workspace slugs with a negative cache."""
+
+import difflib
+import time
+from typing import Callable
+
+CATALOG_TTL = 300.0  # seconds before the slug list is refreshed
+CATALOG_RETRY = 60.0  # seconds to wait after a failed refresh
+MISSING_TTL = 600.0  # seconds a 404'd slug is remembered as missing
+SUGGESTION_CUTOFF = 0.6
+
+
+class WorkspaceCatalog:
+    """Known workspace slugs of one endpoint, refreshed from /v1/workspaces.
+
+    ``slugs`` is None until the first successful refresh; validation then
+    cannot say anything and lets every slug through. Refreshes are
+    conditional: the ETag of the last list is sent back and a 304 just
+    extends its lifetime. Slugs that returned 404 are remembered as missing
+    for MISSING_TTL, or until a refreshed list contains them again.
+    """
+
+    def __init__(
+        self,
+        ttl: float = CATALOG_TTL,
+        retry: float = CATALOG_RETRY,
+        missing_ttl: float = MISSING_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize an empty catalog."""
+        self.ttl = ttl
+        self.retry = retry
+        self.missing_ttl = missing_ttl
+        self._clock = clock
+        self.slugs: frozenset[str] | None = None
+        self.etag: str | None = None
+        self._refresh_at = 0.0
+        self._missing: dict[str, float] = {}
+        self.refreshes = 0
+        self.not_modified = 0
+        self.refresh_failures = 0
+        self.rejected = 0
+
+    @property
+    def stale(self) -> bool:
+        """Return True if the list should be refreshed now."""
+        return self._clock() >= self._refresh_at
+
+    @property
+    def stats(self) -> dict:
+        """Return refresh counters and cache sizes."""
+        return {
+            "workspaces": None if self.slugs is None else len(self.slugs),
+            "refreshes": self.refreshes,
+            "not_modified": self.not_modified,
+            "refresh_failures": self.refresh_failures,
+            "rejected_switches": self.rejected,
+            "missing": sorted(self._missing),
+        }
+
+    def update(self, slugs, etag: str | None = None) -> None:
+        """Replace the list after a successful refresh."""
+        self.slugs = frozenset(slugs)
+        self.etag = etag
+        self._refresh_at = self._clock() + self.ttl
+        self.refreshes += 1
+        for slug in self.slugs & self._missing.keys():
+            del self._missing[slug]
+
+    def touch(self) -> None:
+        """Keep the current list after a 304 Not Modified."""
+        self._refresh_at = self._clock() + self.ttl
+        self.not_modified += 1
+
+    def refresh_failed(self) -> None:
+        """Keep the current list and retry after CATALOG_RETRY."""
+        self._refresh_at = self._clock() + self.retry
+        self.refresh_failures += 1
+
+    def mark_missing(self, slug: str) -> None:
+        """Remember that slug returned 404."""
+        self._missing[slug] = self._clock() + self.missing_ttl
+        if self.slugs is not None and slug in self.slugs:
+            self.slugs = self.slugs - {slug}
+
+    def is_missing(self, slug: str) -> bool:
+        """Return True if slug recently returned 404."""
+        expires_at = self._missing.get(slug)
+        if expires_at is None:
+            return False
+        if self._clock() >= expires_at:
+            del self._missing[slug]
+            return False
+        return True
+
+    def may_exist(self, slug: str) -> bool:
+        """Return False only if slug is known not to exist."""
+        if self.is_missing(slug):
+            return False
+        return self.slugs is None or slug in self.slugs
+
+    def validate(self, slug: str) -> tuple[bool | None, str | None]:
+        """Return (known, suggestion) for a requested slug.
+
+        known is True for a listed slug, False for a missing or unlisted one
+        (with the closest listed slug as suggestion, if any) and None when the
+        list has never been loaded.
+        """
+        if self.is_missing(slug):
+            known = False
+        elif self.slugs is None:
+            return None, None
+        elif slug in self.slugs:
+            return True, None
+        else:
+            known = False
+        self.rejected += 1
+        matches = difflib.get_close_matches(
+            slug, sorted(self.slugs or ()), n=1, cutoff=SUGGESTION_CUTOFF
+        )
+        return known, matches[0] if matches else None
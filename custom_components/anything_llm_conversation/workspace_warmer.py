@@ -0,0 +1,89 @@
+"""Per-workspace bookkeeping for background warm-up requests."""
+
+import time
+from typing import Callable
+
+WARMUP_INTERVAL = 300.0  # seconds before the same workspace is warmed again
+_MAX_TRACKED_WORKSPACES = 50
+
+WARMUP_STARTED = "started"
+WARMUP_IN_FLIGHT = "in_flight"
+WARMUP_RATE_LIMITED = "rate_limited"
+
+
+class WorkspaceWarmer:
+    """Decide when a workspace may be warmed and record how it went.
+
+    A warm-up is skipped while another one for the same workspace is in
+    flight, and for WARMUP_INTERVAL after the last one started, whatever its
+    outcome. Only the most recent workspaces are remembered.
+    """
+
+    def __init__(
+        self,
+        interval: float = WARMUP_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize with no warm-ups."""
+        self.interval = interval
+        self._clock = clock
+        self._in_flight: dict[str, float] = {}
+        self._last: dict[str, dict] = {}
+        self._counts = {
+            "started": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "deduplicated": 0,
+            "rate_limited": 0,
+        }
+        self._total_seconds = 0.0
+
+    def begin(self, slug: str) -> str:
+        """Claim a warm-up for slug; return WARMUP_STARTED or why it was skipped."""
+        if slug in self._in_flight:
+            self._counts["deduplicated"] += 1
+            return WARMUP_IN_FLIGHT
+        now = self._clock()
+        last = self._last.get(slug)
+        if last is not None and now - last["started_at"] < self.interval:
+            self._counts["rate_limited"] += 1
+            return WARMUP_RATE_LIMITED
+        self._in_flight[slug] = now
+        self._counts["started"] += 1
+        return WARMUP_STARTED
+
+    def finish(self, slug: str, outcome: str | None = None) -> None:
+        """Record the end of a warm-up; outcome is None on success, else the error."""
+        started_at = self._in_flight.pop(slug, None)
+        if started_at is None:
+            return
+        seconds = self._clock() - started_at
+        self._total_seconds += seconds
+        self._counts["failed" if outcome else "succeeded"] += 1
+        self._last.pop(slug, None)
+        self._last[slug] = {
+            "started_at": started_at,
+            "ms": round(seconds * 1000, 1),
+            "error": outcome,
+        }
+        if len(self._last) > _MAX_TRACKED_WORKSPACES:
+            del self._last[next(iter(self._last))]
+
+    @property
+    def stats(self) -> dict:
+        """Return warm-up counters, mean duration and the last outcome per workspace."""
+        finished = self._counts["succeeded"] + self._counts["failed"]
+        now = self._clock()
+        return {
+            **self._counts,
+            "in_flight": sorted(self._in_flight),
+            "mean_ms": round(self._total_seconds / finished * 1000, 1) if finished else None,
+            "workspaces": {
+                slug: {
+                    "ms": last["ms"],
+                    "error": last["error"],
+                    "age_s": round(now - last["started_at"]),
+                }
+                for slug, last in self._last.items()
+            },
+        }
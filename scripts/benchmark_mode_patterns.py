@@ -0,0 +1,82 @@
+"""Benchmark mode-suggestion pattern matching: per-mode regexes vs. one automaton.
+
+Run from the repository root:
+
+    python scripts/benchmark_mode_patterns.py
+"""
+
+import re
+import sys
+import timeit
+from functools import lru_cache
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "custom_components" / "anything_llm_conversation"))
+
+from mode_patterns import MODE_SUGGESTION_PATTERNS  # noqa: E402
+from pattern_automaton import PatternAutomaton  # noqa: E402
+
+QUERIES = [
+    "turn on the kitchen lights",
+    "why is my energy bill so high this month compared to last month",
+    "should i get zigbee or z-wave, which protocol is better for battery sensors",
+    "my bedroom motion sensor is offline again and keeps disconnecting",
+    "review my automation and tell me if this yaml looks good",
+    "how often does the garage door open per day and what is the average duration",
+    "what's the temperature in the living room",
+    "is the house locked and is the security camera recording",
+]
+
+# The previous implementation: one longest-first alternation per mode, scanned
+# once per mode with findall (substring matches, no word boundaries).
+_MODE_PATTERN_REGEXES = {
+    mode_key: re.compile(
+        r"(?:" + "|".join(re.escape(p) for p in sorted(patterns, key=len, reverse=True)) + r")",
+        re.IGNORECASE,
+    )
+    for mode_key, patterns in MODE_SUGGESTION_PATTERNS.items()
+}
+_AUTOMATON = PatternAutomaton(MODE_SUGGESTION_PATTERNS)
+
+
+def regex_counts(text: str) -> dict[str, int]:
+    """Count hits per mode with the per-mode regexes."""
+    counts = {}
+    for mode_key, pattern_re in _MODE_PATTERN_REGEXES.items():
+        hits = len(pattern_re.findall(text))
+        if hits:
+            counts[mode_key] = hits
+    return counts
+
+
+@lru_cache(maxsize=64)
+def cached_automaton_counts(text: str) -> tuple[tuple[str, int], ...]:
+    """Count hits per mode with the automaton behind the LRU used at runtime."""
+    return tuple(_AUTOMATON.count(text).items())
+
+
+def main() -> None:
+    """Time each strategy over the sample queries and print per-query cost."""
+    queries = [q.lower() for q in QUERIES]
+    long_text = " ".join(queries * 25)
+    number = 2000
+
+    print(f"{len(_AUTOMATON)} patterns, {len(MODE_SUGGESTION_PATTERNS)} modes")
+    for label, func in (
+        ("per-mode regex", regex_counts),
+        ("automaton", _AUTOMATON.count),
+        ("automaton + LRU", cached_automaton_counts),
+    ):
+        short = timeit.timeit(lambda: [func(q) for q in queries], number=number)
+        per_query_us = short / (number * len(queries)) * 1e6
+        long = timeit.timeit(lambda: func(long_text), number=number // 20)
+        per_long_ms = long / (number // 20) * 1e3
+        print(f"{label:>16}: {per_query_us:8.2f} us/query  {per_long_ms:8.3f} ms/{len(long_text)}-char text")
+
+    print("\nPer-query hit counts (regex -> automaton):")
+    for query in queries:
+        print(f"  {query[:60]!r}: {regex_counts(query)} -> {_AUTOMATON.count(query)}")
+
+
+if __name__ == "__main__":
+    main()
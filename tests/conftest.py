@@ -2,6 +2,8 @@
 from types import ModuleType
 import sys
 
+import pytest
+
 
 def _make_module(name: str) -> ModuleType:
     mod = ModuleType(name)
@@ -169,3 +171,21 @@ def _mock_check_workspace_switch(self, user_text: str, conversation_id: str, lan
 
 
 MagicMock._check_workspace_switch = _mock_check_workspace_switch
+
+
+class FakeClock:
+    """Manually advanced monotonic clock; with step set, each reading advances it."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.step = 0.0
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Return a fresh FakeClock for the clock= argument of the code under test."""
+    return FakeClock()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Tests for latency SLOs and brownout detection."""
+
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from brownout import BrownoutDetector, LatencySLOs, parse_latency_slos
+
+
+def make_detector(clock):
+    return BrownoutDetector(
+        window=300, min_samples=3, enter_ratio=1.0, exit_ratio=0.8, hold=60, clock=clock
+    )
+
+
+class TestLatencySLOs:
+    """Test parsing and merging of per-workspace SLOs."""
+
+    @staticmethod
+    def test_parse():
+        """Pairs are parsed; malformed and non-positive entries are skipped."""
+        assert parse_latency_slos(" Default-Workspace = 5, *=15, bad, x=abc, y=0, =3") == {
+            "default-workspace": 5.0,
+            "*": 15.0,
+        }
+        assert parse_latency_slos("") == {}
+
+    @staticmethod
+    def test_wildcard_and_strictest_wins():
+        """A workspace's own SLO beats the wildcard; the strictest agent wins."""
+        slos = LatencySLOs()
+        assert not slos.active
+        slos.set("a", {"coding": 20.0, "*": 10.0})
+        slos.set("b", {"coding": 12.0})
+        assert slos.get("coding") == 12.0
+        assert slos.get("other") == 10.0
+        slos.remove("b")
+        assert slos.get("coding") == 20.0
+        slos.remove("a")
+        assert slos.get("coding") is None
+        assert not slos.active
+
+
+class TestBrownoutDetector:
+    """Test brownout entry and exit with hysteresis."""
+
+    @staticmethod
+    def test_needs_enough_samples(clock):
+        """A few slow answers are not a brownout."""
+        detector = make_detector(clock)
+        for _ in range(2):
+            detector.record(20.0, 10.0)
+            clock.now += 60
+        assert detector.score is None
+        assert not detector.active
+
+    @staticmethod
+    def test_sustained_slowness_enters_after_hold(clock):
+        """The median must stay above the SLO for the hold time."""
+        detector = make_detector(clock)
+        for _ in range(3):
+            detector.record(15.0, 10.0)
+        assert not detector.active
+        clock.now += 59
+        assert not detector.update()
+        clock.now += 1
+        assert detector.update()
+        assert detector.brownouts == 1
+
+    @staticmethod
+    def test_blip_resets_hold(clock):
+        """Dropping back under the SLO before the hold restarts the countdown."""
+        detector = make_detector(clock)
+        for _ in range(3):
+            detector.record(15.0, 10.0)
+        clock.now += 30
+        for _ in range(4):
+            detector.record(5.0, 10.0)
+        clock.now += 40
+        for _ in range(8):
+            detector.record(15.0, 10.0)
+        assert not detector.active
+
+    @staticmethod
+    def test_hysteresis_band(clock):
+        """Recovery needs the median below exit_ratio, not just below the SLO."""
+        detector = make_detector(clock)
+        for _ in range(3):
+            detector.record(15.0, 10.0)
+        clock.now += 60
+        assert detector.update()
+        clock.now += 1
+        for _ in range(5):
+            detector.record(9.0, 10.0)
+        clock.now += 120
+        assert detector.update()
+        for _ in range(10):
+            detector.record(5.0, 10.0)
+        clock.now += 60
+        assert not detector.update()
+
+    @staticmethod
+    def test_recovers_without_samples(clock):
+        """Once old samples age out the endpoint gets another chance."""
+        detector = make_detector(clock)
+        for _ in range(3):
+            detector.record(15.0, 10.0)
+        clock.now += 60
+        assert detector.update()
+        clock.now += 301
+        assert detector.update()
+        clock.now += 60
+        assert not detector.update()
+        assert detector.stats == {"brownout": False, "score": None, "samples": 0, "brownouts": 1}
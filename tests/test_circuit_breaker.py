@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Tests for the per-endpoint circuit breaker."""
+
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from resilience import (
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    BREAKER_OPEN,
+    CircuitBreaker,
+)
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions."""
+
+    @staticmethod
+    def test_opens_after_threshold(clock):
+        """Consecutive failures trip the breaker; a success resets the count."""
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30, clock=clock)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == BREAKER_CLOSED
+        breaker.record_failure()
+        assert breaker.state == BREAKER_OPEN
+        assert not breaker.allow_request()
+
+    @staticmethod
+    def test_half_open_allows_single_trial(clock):
+        """After the timeout exactly one caller gets the trial request."""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now += 29
+        assert not breaker.allow_request()
+        clock.now += 1
+        assert breaker.state == BREAKER_HALF_OPEN
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+    @staticmethod
+    def test_trial_outcome(clock):
+        """A failed trial re-opens; a successful trial closes."""
+        breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10, clock=clock)
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now += 10
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == BREAKER_OPEN
+        clock.now += 10
+        assert breaker.allow_request()
+        breaker.record_success()
+        assert breaker.state == BREAKER_CLOSED
+        assert breaker.failures == 0
+
+    @staticmethod
+    def test_release_returns_trial_slot(clock):
+        """An unused trial slot can be handed to the next caller."""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=5, clock=clock)
+        breaker.record_failure()
+        clock.now += 5
+        assert breaker.allow_request()
+        breaker.release()
+        assert breaker.allow_request()
+
+    @staticmethod
+    def test_on_change_callback(clock):
+        """State transitions notify the listener once per change."""
+        changes = []
+        breaker = CircuitBreaker(failure_threshold=1, on_change=lambda: changes.append(breaker.state), clock=clock)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        assert changes == [BREAKER_OPEN, BREAKER_CLOSED]
+
+    @staticmethod
+    def test_snapshot_restore_keeps_open_countdown(clock):
+        """A restored open breaker counts down from when it originally opened."""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now += 10
+        snapshot = breaker.snapshot()
+        assert snapshot == {"state": BREAKER_OPEN, "failures": 1, "open_for": 10.0}
+
+        restored = CircuitBreaker(failure_threshold=1, recovery_timeout=30, clock=clock)
+        restored.restore(snapshot, elapsed=15)
+        assert restored.state == BREAKER_OPEN
+        clock.now += 5
+        assert restored.state == BREAKER_HALF_OPEN
+
+    @staticmethod
+    def test_restore_half_open_and_closed(clock):
+        """A half-open snapshot allows a trial at once; closed keeps the failure count."""
+        breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=30, clock=clock)
+        breaker.restore({"state": BREAKER_HALF_OPEN, "failures": 3, "open_for": 30.0})
+        assert breaker.state == BREAKER_HALF_OPEN
+        assert breaker.allow_request()
+
+        breaker = CircuitBreaker(failure_threshold=3, clock=clock)
+        breaker.restore({"state": BREAKER_CLOSED, "failures": 2, "open_for": None})
+        assert breaker.snapshot()["failures"] == 2
+        breaker.record_failure()
+        assert breaker.state == BREAKER_OPEN
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Tests for the single-pass workspace/mode command router."""
+
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from command_router import (
+    AliasTrie,
+    COMMAND_AFFIRMATIVE,
+    COMMAND_MODE_QUERY,
+    COMMAND_PASS_THROUGH,
+    COMMAND_WORKSPACE_QUERY,
+    COMMAND_WORKSPACE_SWITCH,
+    CommandDecision,
+    CommandRouter,
+    parse_workspace_aliases,
+    sanitize_workspace_slug,
+)
+from mode_patterns import MODE_KEYWORDS, MODE_QUERY_KEYWORDS
+
+ALIASES = {
+    "analysis": "analysis",
+    "analyze": "analysis",
+    "research": "research",
+    "code": "investigation",
+    "code-review": "investigation",
+    "guest": "default",
+    "default": "default",
+}
+MODE_TO_WORKSPACE = {
+    "analysis": "analysis",
+    "research": "research",
+    "code_review": "investigation",
+    "guest": "default",
+    "default": "default",
+}
+
+ROUTER = CommandRouter(ALIASES, MODE_KEYWORDS, MODE_TO_WORKSPACE, MODE_QUERY_KEYWORDS)
+
+
+def switch(slug):
+    return CommandDecision(COMMAND_WORKSPACE_SWITCH, slug)
+
+
+class TestCommandRouter:
+    """Test routing decisions and their precedence."""
+
+    @staticmethod
+    def test_workspace_queries():
+        """Workspace queries are answered locally."""
+        for text in ("!workspace", "What workspace are you in?", "which workspace", "current workspace please"):
+            assert ROUTER.route(text) == CommandDecision(COMMAND_WORKSPACE_QUERY), text
+
+    @staticmethod
+    def test_switch_phrasings():
+        """Every supported phrasing yields the sanitized target slug."""
+        assert ROUTER.route("!workspace Finance") == switch("finance")
+        assert ROUTER.route("switch to finance workspace") == switch("finance")
+        assert ROUTER.route("use home office workspace") == switch("home-office")
+        assert ROUTER.route("change workspace to finance.") == switch("finance")
+        assert ROUTER.route("switch workspace to finance") == switch("finance")
+        assert ROUTER.route("switch to research mode") == switch("research")
+        assert ROUTER.route("use guest mode") == switch("default")
+        assert ROUTER.route("change mode to analysis") == switch("analysis")
+        assert ROUTER.route("switch mode to code review") == switch("investigation")
+
+    @staticmethod
+    def test_aliases_resolve_to_longest_contained_alias():
+        """An exact alias wins, otherwise the longest alias among the words."""
+        assert ROUTER.route("switch to analyze workspace") == switch("analysis")
+        assert ROUTER.route("switch to the analysis workspace") == switch("analysis")
+        assert ROUTER.route("!workspace my code-review space") == switch("investigation")
+
+    @staticmethod
+    def test_bare_mode_keyword():
+        """A known mode keyword at the end of the utterance switches modes."""
+        assert ROUTER.route("analysis mode") == switch("analysis")
+        assert ROUTER.route("Go into code review mode") == switch("investigation")
+        assert ROUTER.route("from guest mode to research mode") == switch("research")
+        assert ROUTER.route("party mode").kind == COMMAND_PASS_THROUGH
+
+    @staticmethod
+    def test_mode_query_anywhere():
+        """Mode queries match anywhere but lose to explicit commands."""
+        assert ROUTER.route("tell me what mode you are in").kind == COMMAND_MODE_QUERY
+        assert ROUTER.route("what mode").kind == COMMAND_MODE_QUERY
+        assert ROUTER.route("what mode is analysis mode") == switch("analysis")
+
+    @staticmethod
+    def test_affirmative():
+        """Affirmative replies are recognized only as the whole utterance."""
+        for text in ("yes", " Sure! ", "go  ahead.", "sounds good", "okay"):
+            assert ROUTER.route(text).kind == COMMAND_AFFIRMATIVE, text
+        assert ROUTER.route("yes turn on the lights").kind == COMMAND_PASS_THROUGH
+
+    @staticmethod
+    def test_pass_through():
+        """Everything else goes to the LLM."""
+        for text in ("turn on the kitchen lights", "use the fan", "", "switch to the next song"):
+            assert ROUTER.route(text).kind == COMMAND_PASS_THROUGH, text
+
+    @staticmethod
+    def test_empty_target():
+        """A name that sanitizes to nothing yields an empty slug."""
+        assert ROUTER.route("!workspace ???") == switch("")
+        assert ROUTER.route("use  mode").kind == COMMAND_PASS_THROUGH
+
+    @staticmethod
+    def test_prefix_is_stripped_once():
+        """Only the leading command prefix is removed from the target."""
+        assert ROUTER.route("use the house workspace") == switch("the-house")
+
+    @staticmethod
+    def test_sanitize_workspace_slug():
+        """Slugs are URL-safe."""
+        assert sanitize_workspace_slug(" ../Etc/Passwd ") == "etc-passwd"
+        assert sanitize_workspace_slug("finance.") == "finance"
+
+
+class TestAliasTrie:
+    """Test longest whole-token alias resolution."""
+
+    @staticmethod
+    def test_longest_alias_wins():
+        """The longest alias in the slug wins; exact matches are longest."""
+        trie = AliasTrie({"code": "investigation", "code-review": "review", "review": "other"})
+        assert trie.resolve("code") == "investigation"
+        assert trie.resolve("my-code-review-space") == "review"
+        assert trie.resolve("the-review") == "other"
+
+    @staticmethod
+    def test_whole_tokens_only():
+        """Aliases must cover whole hyphen-separated tokens."""
+        trie = AliasTrie({"code": "investigation", "guest": "default"})
+        assert trie.resolve("encoder") is None
+        assert trie.resolve("guests") is None
+        assert trie.resolve("") is None
+
+    @staticmethod
+    def test_ties_go_to_leftmost():
+        """Equal-length aliases resolve to the first one spoken."""
+        trie = AliasTrie({"debug": "investigation", "guest": "default"})
+        assert trie.resolve("guest-debug") == "default"
+
+
+class TestUserAliases:
+    """Test user-defined aliases from options."""
+
+    @staticmethod
+    def test_parse_workspace_aliases():
+        """Pairs are sanitized; malformed entries are skipped."""
+        assert parse_workspace_aliases("Money=finance, home office = Office,bad,=x,y=") == {
+            "money": "finance",
+            "home-office": "office",
+        }
+        assert parse_workspace_aliases("") == {}
+
+    @staticmethod
+    def test_user_aliases_extend_and_override():
+        """User aliases are resolved like the built-in ones."""
+        router = CommandRouter(
+            {**ALIASES, **parse_workspace_aliases("money=finance, guest=guests")},
+            MODE_KEYWORDS,
+            MODE_TO_WORKSPACE,
+            MODE_QUERY_KEYWORDS,
+        )
+        assert router.route("switch to the money workspace") == switch("finance")
+        assert router.route("!workspace guest") == switch("guests")
+        assert router.route("use analyze workspace") == switch("analysis")
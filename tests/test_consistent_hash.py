@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Tests for conversation-affine consistent-hash routing."""
+
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from consistent_hash import AffinityRouter, routing_key
+
+NODES = ["primary", "failover", "node-3", "node-4"]
+KEYS = [f"conversation:{index}" for index in range(400)]
+
+
+class TestAffinityRouter:
+    """Test ring order, remapping and load-bounded spillover."""
+
+    @staticmethod
+    def test_same_key_same_endpoint():
+        """A key keeps its endpoint, also in a new router (after a restart)."""
+        first = AffinityRouter().route("conversation:abc", NODES, {})
+        assert AffinityRouter().route("conversation:abc", NODES, {}) == first
+        assert sorted(first) == sorted(NODES)
+
+    @staticmethod
+    def test_keys_spread_over_endpoints():
+        """Every endpoint owns a fair share of the keys."""
+        router = AffinityRouter()
+        owners = [router.ring_order(key, NODES)[0] for key in KEYS]
+        for node in NODES:
+            assert owners.count(node) > len(KEYS) / len(NODES) / 2
+
+    @staticmethod
+    def test_leaving_endpoint_only_moves_its_keys():
+        """Keys owned by the other endpoints stay where they are."""
+        router = AffinityRouter()
+        before = {key: router.ring_order(key, NODES) for key in KEYS}
+        remaining = [node for node in NODES if node != "node-3"]
+        for key, order in before.items():
+            after = router.ring_order(key, remaining)[0]
+            # A key of the leaving endpoint goes to its next one on the ring.
+            expected = order[1] if order[0] == "node-3" else order[0]
+            assert after == expected
+
+    @staticmethod
+    def test_unhealthy_owner_keeps_ring_order():
+        """When the owner is not a candidate, the next endpoint on the ring goes first."""
+        router = AffinityRouter()
+        order = router.ring_order("workspace:kitchen", NODES)
+        candidates = order[1:]
+        assert router.route("workspace:kitchen", NODES, {}, candidates) == order[1:2] + [
+            order[0]
+        ] + order[2:]
+
+    @staticmethod
+    def test_overloaded_owner_spills():
+        """An owner far above the average load hands the request to the next endpoint."""
+        router = AffinityRouter(load_factor=2.0)
+        order = router.ring_order("conversation:busy", NODES)
+        # Capacity: ceil(2.0 * (2 + 1) / 4) = 2, the owner has 2 in flight.
+        assert router.route("conversation:busy", NODES, {order[0]: 2})[0] == order[1]
+        assert router.stats == {"routed": 1, "spilled": 1}
+        # With more load elsewhere the same count is below the bound: ceil(2.0 * 5 / 4) = 3.
+        assert router.route("conversation:busy", NODES, {order[0]: 2, order[2]: 2})[0] == order[0]
+        assert router.stats == {"routed": 2, "spilled": 1}
+
+    @staticmethod
+    def test_no_candidates_returns_ring_order():
+        """Without usable endpoints the ring order is returned unchanged."""
+        router = AffinityRouter()
+        order = router.ring_order("conversation:x", NODES)
+        assert router.route("conversation:x", NODES, {}, []) == order
+        assert router.stats["routed"] == 0
+
+
+class TestRoutingKey:
+    """Test the ring key every turn of a conversation is routed by."""
+
+    @staticmethod
+    def test_turns_of_one_conversation_share_a_key():
+        """Streamed and blocking turns, and workspace switches, keep the conversation's key."""
+        # Both chat paths pass the chat log's conversation ID, set from the first turn.
+        streamed = routing_key("01JABC", "default-workspace", per_conversation=True)
+        blocking = routing_key("01JABC", "default-workspace", per_conversation=True)
+        switched = routing_key("01JABC", "analysis", per_conversation=True)
+        assert streamed == blocking == switched == "conversation:01JABC"
+
+    @staticmethod
+    def test_missing_conversation_id_falls_back_to_workspace():
+        """Without a conversation ID the workspace is the key."""
+        assert routing_key(None, "analysis", per_conversation=True) == "workspace:analysis"
+
+    @staticmethod
+    def test_workspace_affinity_ignores_conversation():
+        """Per workspace, different conversations in one workspace share a key."""
+        assert routing_key("a", "analysis", False) == routing_key("b", "analysis", False)
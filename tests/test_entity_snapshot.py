@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Tests for the versioned exposed-entity snapshot."""
+
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from entity_snapshot import EntitySnapshot, build_entity_row
+
+
+def _row(entity_id, state):
+    return build_entity_row(entity_id, entity_id, state, [])
+
+
+class TestBuildEntityRow:
+    """Test prompt row sanitization."""
+
+    @staticmethod
+    def test_row_values_are_sanitized():
+        """CSV/Jinja structural characters never reach the prompt."""
+        row = build_entity_row("light.a", "Desk, {{ lamp }}\n", "on", ["x|y"])
+        assert row["entity_id"] == "light.a"
+        assert row["name"].split() == ["Desk", "lamp"]
+        assert row["state"] == "on"
+        assert row["aliases"] == ["x y"]
+
+
+class TestEntitySnapshot:
+    """Test snapshot versioning and copy-on-write reads."""
+
+    @staticmethod
+    def test_version_moves_only_on_real_changes():
+        """Writing an identical row does not bump the version."""
+        snapshot = EntitySnapshot()
+        assert snapshot.set_row("light.a", _row("light.a", "on"))
+        assert snapshot.version == 1
+        assert not snapshot.set_row("light.a", _row("light.a", "on"))
+        assert snapshot.version == 1
+        assert snapshot.set_row("light.a", _row("light.a", "off"))
+        assert snapshot.version == 2
+
+    @staticmethod
+    def test_reads_between_changes_reuse_the_same_list():
+        """The entity list is built once per version."""
+        snapshot = EntitySnapshot()
+        snapshot.set_row("light.a", _row("light.a", "on"))
+        assert snapshot.entities is snapshot.entities
+
+    @staticmethod
+    def test_old_views_are_not_mutated():
+        """A list read before an update still shows the old rows."""
+        snapshot = EntitySnapshot()
+        snapshot.set_row("light.a", _row("light.a", "on"))
+        snapshot.set_row("light.b", _row("light.b", "off"))
+        before = snapshot.entities
+        snapshot.set_row("light.a", _row("light.a", "off"))
+        snapshot.remove("light.b")
+        assert [row["state"] for row in before] == ["on", "off"]
+        assert [row["state"] for row in snapshot.entities] == ["off"]
+
+    @staticmethod
+    def test_update_keeps_position():
+        """Updating a row keeps its position in the list."""
+        snapshot = EntitySnapshot()
+        for entity_id in ("light.a", "light.b", "light.c"):
+            snapshot.set_row(entity_id, _row(entity_id, "off"))
+        snapshot.set_row("light.b", _row("light.b", "on"))
+        assert [row["entity_id"] for row in snapshot.entities] == ["light.a", "light.b", "light.c"]
+
+    @staticmethod
+    def test_remove_missing_row_is_a_no_op():
+        """Removing an unknown entity does not bump the version."""
+        snapshot = EntitySnapshot()
+        assert not snapshot.remove("light.a")
+        assert snapshot.version == 0
+
+    @staticmethod
+    def test_replace_all():
+        """A full rebuild bumps the version only if something differs."""
+        snapshot = EntitySnapshot()
+        rows = {"light.a": _row("light.a", "on")}
+        assert snapshot.replace_all(rows)
+        assert not snapshot.replace_all(dict(rows))
+        assert snapshot.version == 1
+        assert "light.a" in snapshot
+        assert len(snapshot) == 1
+
+    @staticmethod
+    def test_views_are_immutable():
+        """Shared views cannot be appended to or reordered by a caller."""
+        snapshot = EntitySnapshot()
+        snapshot.set_row("light.a", _row("light.a", "on"))
+        assert isinstance(snapshot.entities, tuple)
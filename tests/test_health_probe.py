@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Tests for the activity-driven health probe schedule."""
+
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from resilience import HealthProbeScheduler
+
+
+def make_scheduler(clock, rng=lambda: 0.0):
+    return HealthProbeScheduler(
+        interval=30, backoff_base=5, backoff_max=300, idle_suspend=3600, clock=clock, rng=rng
+    )
+
+
+class TestHealthProbeScheduler:
+    """Test when active probes run."""
+
+    @staticmethod
+    def test_first_probe_is_immediate(clock):
+        """An endpoint that was never checked is probed at once."""
+        scheduler = make_scheduler(clock)
+        assert scheduler.healthy is None
+        assert scheduler.next_probe_in() == 0
+
+    @staticmethod
+    def test_real_traffic_replaces_probes(clock):
+        """Successful chats count as checks and push the probe back."""
+        scheduler = make_scheduler(clock)
+        scheduler.record_probe(True)
+        clock.now += 25
+        scheduler.record_passive(True)
+        clock.now += 25
+        assert scheduler.next_probe_in() == 5
+        clock.now += 5
+        assert scheduler.next_probe_in() == 0
+        assert (scheduler.probes, scheduler.passive_checks) == (1, 1)
+
+    @staticmethod
+    def test_exponential_backoff_while_down(clock):
+        """A down endpoint is probed at doubling intervals up to the cap."""
+        scheduler = make_scheduler(clock)
+        delays = []
+        for _ in range(8):
+            scheduler.record_probe(False)
+            delays.append(scheduler.next_probe_in())
+        assert delays == [5, 10, 20, 40, 80, 160, 300, 300]
+        scheduler.record_probe(True)
+        assert scheduler.next_probe_in() == 30
+
+    @staticmethod
+    def test_backoff_jitter_shortens_delay(clock):
+        """Jitter shortens each backoff delay by up to half."""
+        scheduler = make_scheduler(clock, rng=lambda: 1.0)
+        scheduler.record_passive(False)
+        scheduler.record_probe(False)
+        assert scheduler.next_probe_in() == 5
+
+    @staticmethod
+    def test_idle_home_suspends_probing(clock):
+        """Probing stops after idle_suspend without activity and resumes on activity."""
+        scheduler = make_scheduler(clock)
+        scheduler.record_probe(True)
+        clock.now += 3599
+        assert scheduler.next_probe_in() == 0
+        clock.now += 1
+        assert scheduler.suspended
+        assert scheduler.next_probe_in() is None
+        assert scheduler.stats["suspended"]
+        scheduler.note_activity()
+        assert scheduler.next_probe_in() == 0
+
+    @staticmethod
+    def test_probe_latency(clock):
+        """Only probes that reached the endpoint update its probe latency."""
+        scheduler = make_scheduler(clock)
+        scheduler.record_probe(True, 0.12)
+        scheduler.record_probe(False, 3.0)
+        assert scheduler.probe_latency == 0.12
+        assert scheduler.stats["probe_latency_ms"] == 120.0
+        assert scheduler.stats["healthy"] is False
+
+    @staticmethod
+    def test_probes_do_not_count_as_activity(clock):
+        """Probe results alone never keep the schedule awake."""
+        scheduler = make_scheduler(clock)
+        for _ in range(120):
+            clock.now += 30
+            scheduler.record_probe(True)
+        assert scheduler.suspended
+
+    @staticmethod
+    def test_restore_probes_immediately(clock):
+        """Restored health is reported at once but re-checked with the first probe."""
+        scheduler = make_scheduler(clock)
+        scheduler.restore(False, 0.25)
+        assert scheduler.healthy is False
+        assert scheduler.probe_latency == 0.25
+        assert scheduler.next_probe_in() == 0.0
+
+
+def make_deep_scheduler(clock):
+    return HealthProbeScheduler(
+        interval=30, backoff_base=5, backoff_max=300, idle_suspend=3600,
+        clock=clock, rng=lambda: 0.0, deep_interval=300, degraded_after=10,
+    )
+
+
+class TestDeepProbe:
+    """Test deep probes through the LLM."""
+
+    @staticmethod
+    def test_disabled_without_deep_interval(clock):
+        """Without a canary workspace no probe is ever deep."""
+        scheduler = make_scheduler(clock)
+        assert not scheduler.deep_probe_due()
+
+    @staticmethod
+    def test_rate_limited(clock):
+        """A deep probe runs at most once per deep_interval while it succeeds."""
+        scheduler = make_deep_scheduler(clock)
+        assert scheduler.deep_probe_due()
+        scheduler.record_deep_probe(True, 1.5)
+        clock.now += 299
+        assert not scheduler.deep_probe_due()
+        clock.now += 1
+        assert scheduler.deep_probe_due()
+        assert scheduler.deep_latency == 1.5
+        assert scheduler.degraded is False
+
+    @staticmethod
+    def test_slow_answer_degrades(clock):
+        """An answer slower than degraded_after keeps the endpoint up but degraded."""
+        scheduler = make_deep_scheduler(clock)
+        scheduler.record_deep_probe(True, 12.0)
+        assert scheduler.healthy is True
+        assert scheduler.degraded is True
+        assert scheduler.stats["deep_latency_ms"] == 12000.0
+
+    @staticmethod
+    def test_failed_llm_needs_deep_recovery(clock):
+        """After a failed deep probe only a deep probe or real chat revives the endpoint."""
+        scheduler = make_deep_scheduler(clock)
+        scheduler.record_probe(True)
+        scheduler.record_deep_probe(False, 30.0)
+        assert scheduler.healthy is False
+        clock.now += 5
+        scheduler.record_probe(True)
+        assert scheduler.healthy is False
+        assert scheduler.deep_probe_due()
+        scheduler.record_passive(True)
+        assert scheduler.healthy is True
+        assert not scheduler.deep_probe_due()
+
+    @staticmethod
+    def test_inconclusive_probe_only_counts(clock):
+        """A rejected canary request changes nothing but the rate limit."""
+        scheduler = make_deep_scheduler(clock)
+        scheduler.record_probe(True)
+        scheduler.record_deep_probe(None, 0.1)
+        assert scheduler.healthy is True
+        assert scheduler.deep_probes == 1
+        assert not scheduler.deep_probe_due()
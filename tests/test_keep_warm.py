@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Tests for the keep-warm scheduler."""
+
+import math
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from keep_warm import KeepWarmScheduler, in_window, parse_hours
+
+
+def make_scheduler(clock, rng=lambda: 0.0):
+    return KeepWarmScheduler(interval=240, jitter=0.2, clock=clock, rng=rng)
+
+
+NOON = 12 * 60
+
+
+class TestHours:
+    """Test parsing and evaluating the keep-warm window."""
+
+    @staticmethod
+    def test_parse_hours():
+        """Windows are minutes since midnight; empty means all day."""
+        assert parse_hours("06:00-23:00") == (360, 1380)
+        assert parse_hours(" 7:30 - 24:00 ") == (450, 1440)
+        assert parse_hours("") == (0, 1440)
+        assert parse_hours("6-23") is None
+        assert parse_hours("06:60-23:00") is None
+        assert parse_hours("25:00-23:00") is None
+
+    @staticmethod
+    def test_in_window():
+        """The end is exclusive and windows may wrap past midnight."""
+        assert in_window((360, 1380), 360)
+        assert not in_window((360, 1380), 1380)
+        assert in_window((1320, 120), 1400)
+        assert in_window((1320, 120), 60)
+        assert not in_window((1320, 120), NOON)
+        assert in_window((0, 1440), 0)
+
+
+class TestKeepWarmScheduler:
+    """Test when workspaces are due for a keep-warm request."""
+
+    @staticmethod
+    def test_due_immediately_then_every_interval(clock):
+        """A new workspace is warmed at once, then once per interval."""
+        scheduler = make_scheduler(clock)
+        scheduler.set_targets("agent", ["finance", "office"], (0, 1440))
+        assert scheduler.due(NOON) == ["finance", "office"]
+        assert scheduler.due(NOON) == []
+        assert scheduler.seconds_until_due() == 240
+        clock.now += 240
+        assert scheduler.due(NOON) == ["finance", "office"]
+
+    @staticmethod
+    def test_jitter_only_shortens_the_interval(clock):
+        """Jitter pulls the next request forward by up to jitter * interval."""
+        scheduler = make_scheduler(clock, rng=lambda: 1.0)
+        scheduler.set_targets("agent", ["finance"], (0, 1440))
+        scheduler.due(NOON)
+        assert scheduler.seconds_until_due() == 192
+        clock.now += 192
+        assert scheduler.due(NOON) == ["finance"]
+
+    @staticmethod
+    def test_real_traffic_defers_keep_warm(clock):
+        """Real requests push the next keep-warm request back."""
+        scheduler = make_scheduler(clock)
+        scheduler.set_targets("agent", ["finance"], (0, 1440))
+        scheduler.due(NOON)
+        clock.now += 200
+        scheduler.note_traffic("finance")
+        clock.now += 100
+        assert scheduler.due(NOON) == []
+        clock.now += 140
+        assert scheduler.due(NOON) == ["finance"]
+        scheduler.note_traffic("unrelated")
+        assert scheduler.stats["deferred_by_traffic"] == 1
+
+    @staticmethod
+    def test_outside_hours_nothing_is_due(clock):
+        """Workspaces are only warmed inside one of their agents' windows."""
+        scheduler = make_scheduler(clock)
+        scheduler.set_targets("day", ["finance"], (360, 1380))
+        scheduler.set_targets("night", ["office"], (1320, 120))
+        assert scheduler.due(60) == ["office"]
+        assert scheduler.due(NOON) == ["finance"]
+        assert scheduler.due(300) == []
+
+    @staticmethod
+    def test_targets_per_agent(clock):
+        """Agents register and remove their own workspaces."""
+        scheduler = make_scheduler(clock)
+        scheduler.set_targets("a", ["finance"], (0, 1440))
+        scheduler.set_targets("b", ["finance", "office"], (0, 1440))
+        scheduler.remove("b")
+        assert scheduler.workspaces == {"finance"}
+        scheduler.set_targets("a", [""], (0, 1440))
+        assert not scheduler.active
+        assert scheduler.seconds_until_due() == math.inf
+
+    @staticmethod
+    def test_outcomes(clock):
+        """Sent and failed requests are counted with their last result."""
+        scheduler = make_scheduler(clock)
+        scheduler.set_targets("agent", ["finance"], (0, 1440))
+        scheduler.record("finance", 1.5)
+        scheduler.record("finance", 0.2, "HTTP 500")
+        stats = scheduler.stats
+        assert (stats["sent"], stats["failed"]) == (2, 1)
+        assert stats["last"]["finance"] == {"age_s": 0, "ms": 200.0, "error": "HTTP 500"}
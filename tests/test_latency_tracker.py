@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Tests for per-endpoint latency tracking used by request hedging."""
+
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from resilience import LatencyTracker
+
+
+class TestLatencyTracker:
+    """Test rolling latency percentiles."""
+
+    @staticmethod
+    def test_empty_tracker():
+        """No samples means no percentile."""
+        tracker = LatencyTracker()
+        assert len(tracker) == 0
+        assert tracker.percentile(95) is None
+
+    @staticmethod
+    def test_nearest_rank_percentiles():
+        """Percentiles use the nearest-rank method."""
+        tracker = LatencyTracker()
+        for value in range(1, 21):
+            tracker.record(float(value))
+        assert tracker.percentile(50) == 10.0
+        assert tracker.percentile(95) == 19.0
+        assert tracker.percentile(100) == 20.0
+        assert tracker.percentile(0) == 1.0
+
+    @staticmethod
+    def test_window_drops_old_samples():
+        """Only the most recent samples are kept."""
+        tracker = LatencyTracker(window=3)
+        for value in (30.0, 1.0, 2.0, 3.0):
+            tracker.record(value)
+        assert len(tracker) == 3
+        assert tracker.percentile(100) == 3.0
+
+    @staticmethod
+    def test_samples_round_trip():
+        """The window can be exported and replayed into a new tracker."""
+        tracker = LatencyTracker(window=3)
+        for value in (1.0, 2.0, 3.0, 4.0):
+            tracker.record(value)
+        assert tracker.samples == [2.0, 3.0, 4.0]
+        restored = LatencyTracker(window=3)
+        for value in tracker.samples:
+            restored.record(value)
+        assert restored.percentile(100) == 4.0
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Tests for least-outstanding / EWMA endpoint ranking."""
+
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from load_balancer import DEFAULT_COST, LoadBalancer
+
+
+class TestLoadBalancer:
+    """Test endpoint ranking."""
+
+    @staticmethod
+    def test_ties_keep_configured_order(clock):
+        """Without any requests the listed order is kept."""
+        balancer = LoadBalancer(clock=clock)
+        assert balancer.rank(["a", "b", "c"]) == ["a", "b", "c"]
+        assert balancer.cost("a") == DEFAULT_COST
+
+    @staticmethod
+    def test_fewest_outstanding_first(clock):
+        """With equal latency the endpoint with fewer requests in flight wins."""
+        balancer = LoadBalancer(clock=clock)
+        balancer.begin("a")
+        balancer.begin("a")
+        balancer.begin("b")
+        assert balancer.rank(["a", "b", "c"]) == ["c", "b", "a"]
+        balancer.end("a")
+        balancer.end("a")
+        balancer.end("a")
+        assert balancer.outstanding["a"] == 0
+
+    @staticmethod
+    def test_ewma_outweighs_a_busy_fast_endpoint_only_so_far(clock):
+        """A fast endpoint takes extra requests until its queue costs more."""
+        balancer = LoadBalancer(alpha=0.5, clock=clock)
+        balancer.record("fast", 1.0)
+        balancer.record("slow", 4.0)
+        assert balancer.rank(["slow", "fast"]) == ["fast", "slow"]
+        for _ in range(4):
+            balancer.begin("fast")
+        assert balancer.rank(["slow", "fast"]) == ["slow", "fast"]
+
+    @staticmethod
+    def test_ewma_smoothing(clock):
+        """Each sample moves the EWMA by alpha of the difference."""
+        balancer = LoadBalancer(alpha=0.5, clock=clock)
+        balancer.record("a", 2.0)
+        balancer.record("a", 4.0)
+        assert balancer.ewma("a") == 3.0
+        assert balancer.stats(["a", "b"]) == {
+            "a": {"outstanding": 0, "ewma_ms": 3000.0},
+            "b": {"outstanding": 0, "ewma_ms": None},
+        }
+
+    @staticmethod
+    def test_unknown_endpoint_is_average(clock):
+        """An endpoint without samples is assumed to be as fast as the others."""
+        balancer = LoadBalancer(clock=clock)
+        balancer.record("a", 1.0)
+        balancer.record("b", 3.0)
+        assert balancer.ewma("c") == 2.0
+
+    @staticmethod
+    def test_idle_endpoint_relaxes_towards_average(clock):
+        """One slow answer does not keep an endpoint at the bottom for good."""
+        balancer = LoadBalancer(half_life=30, clock=clock)
+        balancer.record("a", 1.0)
+        balancer.record("b", 9.0)
+        clock.now += 30
+        assert balancer.ewma("b") == 5.0
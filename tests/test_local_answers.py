@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Tests for local answers to simple device-state questions."""
+
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from entity_snapshot import build_entity_row
+from local_answers import (
+    EntityNameIndex,
+    LocalStateAnswerer,
+    format_state_answer,
+    parse_state_question,
+    spoken_state,
+)
+
+ENTITIES = tuple(
+    build_entity_row(*row)
+    for row in (
+        ("cover.garage_door", "Garage Door", "closed", []),
+        ("binary_sensor.front_door", "Front Door", "on", ["Entrance"]),
+        ("sensor.living_room_temperature", "Living Room Temperature", "21.5", []),
+        ("light.kitchen_lights", "Kitchen Lights", "off", []),
+        ("light.living_room", "Living Room", "on", []),
+        ("person.alex", "Alex", "not_home", []),
+        ("light.lamp_1", "Lamp", "on", []),
+        ("light.lamp_2", "Lamp", "off", []),
+    )
+)
+ATTRIBUTES = {
+    "binary_sensor.front_door": {"device_class": "door"},
+    "sensor.living_room_temperature": {"device_class": "temperature", "unit_of_measurement": "°C"},
+}
+STATES = {e["entity_id"]: (e["state"], ATTRIBUTES.get(e["entity_id"], {})) for e in ENTITIES}
+
+
+def answer(text):
+    return LocalStateAnswerer().answer(text, ENTITIES, STATES.get)
+
+
+class TestParseStateQuestion:
+    """Test question shapes."""
+
+    @staticmethod
+    def test_yes_no():
+        """Yes/no questions keep the subject, expected state and verb."""
+        question = parse_state_question("Are the kitchen lights on?")
+        assert question.subjects == ("kitchen lights",)
+        assert question.expected == "on"
+        assert question.verb == "are"
+        assert parse_state_question("is the door shut").expected == "closed"
+
+    @staticmethod
+    def test_attribute_questions():
+        """Attribute questions try the attribute-qualified names first."""
+        question = parse_state_question("What's the temperature in the living room?")
+        assert question.subjects == ("living room temperature", "temperature living room")
+        question = parse_state_question("what is the state of the living room")
+        assert question.subjects[-1] == "living room"
+
+    @staticmethod
+    def test_other_utterances():
+        """Commands and open questions are not state questions."""
+        assert parse_state_question("turn on the lights") is None
+        assert parse_state_question("why is the sky blue") is None
+
+
+class TestEntityNameIndex:
+    """Test name resolution confidence."""
+
+    @staticmethod
+    def test_exact_alias_and_object_id():
+        """Names, aliases and object ids resolve exactly."""
+        index = EntityNameIndex(ENTITIES)
+        assert index.resolve("garage door") == ("cover.garage_door", 1.0)
+        assert index.resolve("entrance") == ("binary_sensor.front_door", 1.0)
+        assert index.resolve("kitchen_lights") == ("light.kitchen_lights", 1.0)
+
+    @staticmethod
+    def test_word_order_and_fuzzy():
+        """Reordered words and small misspellings still resolve."""
+        index = EntityNameIndex(ENTITIES)
+        assert index.resolve("door garage") == ("cover.garage_door", 0.9)
+        entity_id, confidence = index.resolve("garge door")
+        assert entity_id == "cover.garage_door"
+        assert 0.85 < confidence < 1.0
+
+    @staticmethod
+    def test_ambiguous_or_unknown():
+        """Shared names and unknown phrases do not resolve."""
+        index = EntityNameIndex(ENTITIES)
+        assert index.resolve("lamp") is None
+        assert index.resolve("capital of france") is None
+
+
+class TestAnswers:
+    """Test spoken answers end to end."""
+
+    @staticmethod
+    def test_spoken_state():
+        """Binary sensors, people and units are spoken naturally."""
+        assert spoken_state("binary_sensor", "door", "on") == "open"
+        assert spoken_state("binary_sensor", None, "off") == "off"
+        assert spoken_state("person", None, "not_home") == "away"
+        assert spoken_state("sensor", "temperature", "21.5", "°C") == "21.5 °C"
+
+    @staticmethod
+    def test_answers():
+        """Confident matches are answered locally."""
+        assert answer("Is the garage door open?") == "No, Garage Door is closed."
+        assert answer("is the entrance open") == "Yes, Front Door is open."
+        assert answer("are the kitchen lights on") == "No, Kitchen Lights are off."
+        assert answer("what's the living room temperature") == "Living Room Temperature is 21.5 °C."
+        assert answer("what is the temperature in the living room") == "Living Room Temperature is 21.5 °C."
+        assert answer("is alex home") == "No, Alex is away."
+
+    @staticmethod
+    def test_falls_back_to_llm():
+        """Anything uncertain returns None so the LLM handles it."""
+        assert answer("is the lamp on") is None
+        assert answer("is the garage door loud") is None
+        assert answer("what is the capital of france") is None
+        assert answer("turn on the kitchen lights") is None
+
+    @staticmethod
+    def test_unsupported_expected_state():
+        """A yes/no question about a state the entity cannot have is not answered."""
+        question = parse_state_question("is the garage door on")
+        assert format_state_answer(question, "Garage Door", "cover", None, "closed") is None
+
+    @staticmethod
+    def test_stats_and_index_reuse():
+        """Answers are counted and the index is reused for the same snapshot."""
+        answerer = LocalStateAnswerer()
+        answerer.answer("is the garage door open", ENTITIES, STATES.get)
+        index = answerer._index
+        answerer.answer("is the lamp on", ENTITIES, STATES.get)
+        assert answerer._index is index
+        stats = answerer.stats
+        assert stats["answered"] == 1
+        assert stats["low_confidence"] == 1
+        assert stats["indexed_entities"] == len(ENTITIES)
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Tests for detecting mode-switch questions in LLM replies (L5)."""
+
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from mode_patterns import response_mode_hint
+
+
+class TestResponseModeHint:
+    """Test which replies store a pending mode suggestion."""
+
+    @staticmethod
+    def test_question_suggests_mode():
+        """A reply asking to switch modes yields that mode's key."""
+        reply = "That needs a closer look. Want me to switch to Analysis Mode?"
+        assert response_mode_hint(reply, "default") == "analysis"
+
+    @staticmethod
+    def test_current_workspace_is_not_suggested():
+        """The mode the conversation is already in is never suggested again."""
+        reply = "You are in analysis mode. Shall I break the numbers down by room?"
+        assert response_mode_hint(reply, "analysis") is None
+
+    @staticmethod
+    def test_statement_is_not_a_suggestion():
+        """Mentioning a mode without asking anything stores no suggestion."""
+        assert response_mode_hint("Switched to research mode.", "default") is None
+
+    @staticmethod
+    def test_no_workspace_yet():
+        """Conversations without an active workspace still get suggestions."""
+        assert response_mode_hint("Try code review mode?", None) == "investigation"
+
+    @staticmethod
+    def test_legacy_mode_key_maps_to_workspace():
+        """Legacy mode keys come back as the workspace slug they now use."""
+        assert response_mode_hint("Shall I use troubleshooting mode?", "default") == "investigation"
+        assert response_mode_hint("Switch to guest mode?", "analysis") == "default"
+        # Compared as slugs: the conversation is already in that workspace.
+        assert response_mode_hint("Shall I use troubleshooting mode?", "investigation") is None
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Tests for the Aho-Corasick mode-suggestion matcher."""
+
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from mode_patterns import MODE_SUGGESTION_PATTERNS
+from pattern_automaton import PatternAutomaton
+
+
+class TestPatternAutomaton:
+    """Test single-pass, word-boundary aware pattern counting."""
+
+    @staticmethod
+    def test_counts_every_label_in_one_pass():
+        """Hits are counted per label."""
+        automaton = PatternAutomaton({"a": ["energy usage", "this month"], "b": ["offline"]})
+        assert automaton.count("energy usage this month, sensor offline") == {"a": 2, "b": 1}
+
+    @staticmethod
+    def test_word_boundaries():
+        """Patterns only match whole words."""
+        automaton = PatternAutomaton({"research": ["vs"], "analysis": ["count"]})
+        assert automaton.count("new tvs in my account") == {}
+        assert automaton.count("zigbee vs z-wave, count them") == {"research": 1, "analysis": 1}
+
+    @staticmethod
+    def test_punctuation_is_a_boundary():
+        """Punctuation next to a phrase still counts as a word boundary."""
+        automaton = PatternAutomaton({"troubleshooting": ["offline"]})
+        assert automaton.count("is it offline?") == {"troubleshooting": 1}
+        assert automaton.count("(offline)") == {"troubleshooting": 1}
+
+    @staticmethod
+    def test_overlapping_phrases_count_once_per_label():
+        """Within a label, the longest phrase at a position wins."""
+        automaton = PatternAutomaton({"analysis": ["compared to", "compared to last"]})
+        assert automaton.count("compared to last week") == {"analysis": 1}
+
+    @staticmethod
+    def test_shared_phrase_counts_for_each_label():
+        """A phrase listed under two labels counts for both."""
+        automaton = PatternAutomaton({"analysis": ["versus"], "research": ["versus"]})
+        assert automaton.count("this versus that") == {"analysis": 1, "research": 1}
+
+    @staticmethod
+    def test_suffix_patterns_found_through_failure_links():
+        """Shorter patterns ending inside longer ones are still found."""
+        automaton = PatternAutomaton({"a": ["how does", "does it"], "b": ["it"]})
+        assert automaton.find("how does it") == [(0, 8, "how does"), (4, 11, "does it"), (9, 11, "it")]
+
+    @staticmethod
+    def test_results_follow_label_order():
+        """Counts are returned in the order labels were declared."""
+        automaton = PatternAutomaton({"first": ["b"], "second": ["a"]})
+        assert list(automaton.count("a b")) == ["first", "second"]
+
+    @staticmethod
+    def test_real_patterns():
+        """The shipped suggestion patterns classify typical queries."""
+        automaton = PatternAutomaton(MODE_SUGGESTION_PATTERNS)
+        assert automaton.count("how much energy did i use this month")["analysis"] >= 2
+        assert automaton.count("my bedroom sensor is offline and disconnected")["troubleshooting"] >= 2
+        assert automaton.count("turn on the lights") == {}
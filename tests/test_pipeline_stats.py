@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Tests for per-stage pipeline statistics."""
+
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from pipeline_stats import STAGE_COMMANDS, STAGE_LLM, STAGE_LOCAL_INTENTS, PipelineStats
+
+
+class TestPipelineStats:
+    """Test hit rates, timing and avoided LLM traffic."""
+
+    @staticmethod
+    def test_hit_rate_and_mean_time(clock):
+        """Attempts, hits and mean time are tracked per stage."""
+        stats = PipelineStats(clock=clock)
+        for hit, duration in ((True, 0.002), (False, 0.004)):
+            started = stats.start()
+            clock.now += duration
+            stats.record(STAGE_LOCAL_INTENTS, hit, started)
+        stage = stats.stats["stages"][STAGE_LOCAL_INTENTS]
+        assert stage == {"attempts": 2, "hits": 1, "hit_rate": 0.5, "mean_ms": 3.0}
+
+    @staticmethod
+    def test_llm_avoided_rate(clock):
+        """Turns that never reach the LLM count as avoided."""
+        stats = PipelineStats(clock=clock)
+        for reached_llm in (True, False, False, False):
+            started = stats.begin_turn()
+            stats.record(STAGE_COMMANDS, False, started)
+            if reached_llm:
+                stats.record(STAGE_LLM, True, stats.start())
+        result = stats.stats
+        assert result["turns"] == 4
+        assert result["llm_avoided_rate"] == 0.75
+        assert result["stages"][STAGE_COMMANDS]["hit_rate"] == 0.0
+
+    @staticmethod
+    def test_empty():
+        """No turns yields zeroed stats."""
+        assert PipelineStats().stats == {"turns": 0, "llm_avoided_rate": 0.0, "stages": {}}
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Tests for the native entity CSV renderer."""
+
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from const import DEFAULT_PROMPT
+from modes import PROMPT_MODES, WORKSPACE_SYSTEM_PROMPTS
+from prompt_renderer import (
+    CompiledPromptCache,
+    render_entities_csv,
+    rewrite_entity_block,
+    uses_entities_csv,
+)
+
+ENTITIES = (
+    {"entity_id": "light.kitchen", "name": "Kitchen", "state": "on", "aliases": ["cooking light", "counter"]},
+    {"entity_id": "lock.front", "name": "Front Door", "state": "locked", "aliases": []},
+)
+
+
+class TestRewriteEntityBlock:
+    """Test detection of the canonical entity loop."""
+
+    @staticmethod
+    def test_all_shipped_prompts_are_rewritten():
+        """Every built-in prompt with the entity loop uses the native renderer."""
+        prompts = [DEFAULT_PROMPT]
+        prompts += [c["system_prompt"] for c in WORKSPACE_SYSTEM_PROMPTS.values() if c["system_prompt"]]
+        prompts += [m["system_prompt"] for m in PROMPT_MODES.values()]
+        for prompt in prompts:
+            rewritten = rewrite_entity_block(prompt)
+            assert uses_entities_csv(rewritten)
+            assert "{% for entity" not in rewritten
+
+    @staticmethod
+    def test_whitespace_after_loop_is_consumed():
+        """The endfor tag's '-%}' strips the whitespace that follows it."""
+        prompt = DEFAULT_PROMPT
+        rewritten = rewrite_entity_block(prompt)
+        assert "entity_id,name,state,aliases\n{{ exposed_entities_csv }}```" in rewritten
+
+    @staticmethod
+    def test_non_canonical_loop_is_left_to_jinja():
+        """Loops with other columns are not touched."""
+        prompt = (
+            "{% for entity in exposed_entities -%}\n"
+            "{{ entity.entity_id }},{{ entity.state }}\n"
+            "{% endfor -%}"
+        )
+        assert rewrite_entity_block(prompt) == prompt
+
+    @staticmethod
+    def test_prompt_without_loop_is_unchanged():
+        """Prompts without the loop pass through unchanged."""
+        assert rewrite_entity_block("Current Time: {{ now() }}") == "Current Time: {{ now() }}"
+
+
+class TestRenderEntitiesCsv:
+    """Test the native CSV output."""
+
+    @staticmethod
+    def test_rows_match_jinja_loop_output():
+        """One newline-terminated row per entity, aliases joined with '/'."""
+        assert render_entities_csv(ENTITIES) == (
+            "light.kitchen,Kitchen,on,cooking light/counter\n"
+            "lock.front,Front Door,locked,\n"
+        )
+
+    @staticmethod
+    def test_no_entities():
+        """No entities renders nothing, like an empty loop."""
+        assert render_entities_csv(()) == ""
+
+
+class TestCompiledPromptCache:
+    """Test the compiled template cache."""
+
+    @staticmethod
+    def test_compiles_once_per_key():
+        """A prompt is compiled on first use and reused afterwards."""
+        compiled = []
+        cache = CompiledPromptCache()
+
+        def compile_fn():
+            compiled.append(1)
+            return object()
+
+        first = cache.get(("default", "default", "prompt"), compile_fn)
+        assert cache.get(("default", "default", "prompt"), compile_fn) is first
+        assert len(compiled) == 1
+        cache.get(("research", "default", "prompt"), compile_fn)
+        assert len(compiled) == 2
+
+    @staticmethod
+    def test_stats_report_saved_compile_time(clock):
+        """Hits are credited with the mean compile time of the misses."""
+        # One second passes per clock reading, so every compile takes 1 s.
+        clock.step = 1.0
+        cache = CompiledPromptCache(clock=clock)
+        cache.get("a", object)
+        for _ in range(3):
+            cache.get("a", object)
+        assert cache.stats == {
+            "hits": 3,
+            "misses": 1,
+            "entries": 1,
+            "compile_seconds": 1.0,
+            "saved_seconds": 3.0,
+        }
+
+    @staticmethod
+    def test_bounded_lru():
+        """The least recently used template is evicted first."""
+        cache = CompiledPromptCache(max_entries=2)
+        cache.get("a", object)
+        cache.get("b", object)
+        cache.get("a", object)
+        cache.get("c", object)
+        assert len(cache) == 2
+        misses = cache.misses
+        cache.get("a", object)
+        assert cache.misses == misses
+        cache.get("b", object)
+        assert cache.misses == misses + 1
+
+    @staticmethod
+    def test_clear():
+        """Clearing forces recompilation."""
+        cache = CompiledPromptCache()
+        cache.get("a", object)
+        cache.clear()
+        cache.get("a", object)
+        assert cache.misses == 2
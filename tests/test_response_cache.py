@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Tests for the two-tier response cache."""
+
+import asyncio
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from response_cache import ResponseCache, make_cache_key
+
+
+class FakeStore:
+    """In-memory stand-in for Home Assistant's Store."""
+
+    def __init__(self, data=None):
+        self.data = data
+        self.saves = 0
+
+    async def async_load(self):
+        return self.data
+
+    def async_delay_save(self, data_func, delay):
+        self.data = data_func()
+        self.saves += 1
+
+
+class TestCacheKey:
+    """Test cache key construction."""
+
+    @staticmethod
+    def test_key_depends_on_every_part():
+        """Workspace, message and system prompt all change the key."""
+        base = make_cache_key("research", "what is zigbee", None)
+        assert base == make_cache_key("research", "what is zigbee", "")
+        assert base != make_cache_key("default", "what is zigbee", None)
+        assert base != make_cache_key("research", "what is z-wave", None)
+        assert base != make_cache_key("research", "what is zigbee", "prompt")
+
+    @staticmethod
+    def test_parts_cannot_run_together():
+        """Moving text between parts yields a different key."""
+        assert make_cache_key("ab", "c", None) != make_cache_key("a", "bc", None)
+
+
+class TestResponseCache:
+    """Test the memory tier, TTL and disk tier."""
+
+    @staticmethod
+    def test_hit_and_miss_counters():
+        """Gets are counted as hits or misses."""
+        cache = ResponseCache()
+        assert cache.get("k") is None
+        cache.put("k", {"textResponse": "Zigbee is a mesh protocol."}, ttl=60)
+        assert cache.get("k") == {"textResponse": "Zigbee is a mesh protocol."}
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 1
+
+    @staticmethod
+    def test_returned_response_is_a_copy():
+        """Mutating a returned response does not change the cache."""
+        cache = ResponseCache()
+        cache.put("k", {"textResponse": "a"}, ttl=60)
+        cache.get("k")["textResponse"] = "b"
+        assert cache.get("k") == {"textResponse": "a"}
+
+    @staticmethod
+    def test_entries_expire(clock):
+        """Entries are dropped once their TTL has elapsed."""
+        cache = ResponseCache(clock=clock)
+        cache.put("k", {"textResponse": "a"}, ttl=60)
+        clock.now += 59
+        assert cache.get("k") is not None
+        clock.now += 1
+        assert cache.get("k") is None
+        assert cache.stats["memory_entries"] == 0
+
+    @staticmethod
+    def test_lru_eviction():
+        """The least recently used entry is evicted first."""
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", {"textResponse": "a"}, ttl=60)
+        cache.put("b", {"textResponse": "b"}, ttl=60)
+        cache.get("a")
+        cache.put("c", {"textResponse": "c"}, ttl=60)
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    @staticmethod
+    def test_persisted_entries_survive_restart(clock):
+        """Persisted entries are reloaded from the store by a new cache."""
+        store = FakeStore()
+        cache = ResponseCache(clock=clock)
+        asyncio.run(cache.async_attach_store(store))
+        cache.put("kept", {"textResponse": "a"}, ttl=60, persist=True)
+        cache.put("memory_only", {"textResponse": "b"}, ttl=60)
+        assert store.saves == 1
+
+        restarted = ResponseCache(clock=clock)
+        asyncio.run(restarted.async_attach_store(store))
+        assert restarted.get("memory_only") is None
+        assert restarted.get("kept") == {"textResponse": "a"}
+        assert restarted.stats["disk_hits"] == 1
+        # Promoted to memory: the next hit does not touch the disk tier.
+        restarted.get("kept")
+        assert restarted.stats["disk_hits"] == 1
+
+    @staticmethod
+    def test_expired_entries_are_not_loaded(clock):
+        """Entries that expired while Home Assistant was down are skipped."""
+        store = FakeStore({"entries": {"old": [clock.now - 1, {"textResponse": "a"}]}})
+        cache = ResponseCache(clock=clock)
+        asyncio.run(cache.async_attach_store(store))
+        assert cache.stats["disk_entries"] == 0
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Tests for coalescing identical concurrent chat requests."""
+
+import asyncio
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+import pytest
+
+from resilience import SingleFlight
+
+
+class TestSingleFlight:
+    """Test the singleflight request coalescer."""
+
+    @staticmethod
+    def test_concurrent_duplicates_share_one_call():
+        """Concurrent callers with the same key share a single call."""
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"textResponse": "Good morning"}
+
+        async def main():
+            flight = SingleFlight()
+            results = await asyncio.gather(*(flight.run("key", call) for _ in range(5)))
+            return flight, results
+
+        flight, results = asyncio.run(main())
+        assert len(calls) == 1
+        assert flight.coalesced == 4
+        assert len(flight) == 0
+        assert all(result == {"textResponse": "Good morning"} for result in results)
+
+    @staticmethod
+    def test_different_keys_are_not_coalesced():
+        """Different keys run independently."""
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        async def main():
+            flight = SingleFlight()
+            await asyncio.gather(flight.run("a", call), flight.run("b", call))
+            return flight
+
+        flight = asyncio.run(main())
+        assert len(calls) == 2
+        assert flight.coalesced == 0
+
+    @staticmethod
+    def test_sequential_calls_are_not_cached():
+        """Once a call finishes, the next caller starts a fresh one."""
+        calls = []
+
+        async def call():
+            calls.append(1)
+            return len(calls)
+
+        async def main():
+            flight = SingleFlight()
+            return [await flight.run("key", call), await flight.run("key", call)]
+
+        assert asyncio.run(main()) == [1, 2]
+
+    @staticmethod
+    def test_exception_reaches_every_waiter():
+        """A failing shared call raises in every coalesced caller."""
+        async def call():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("endpoint down")
+
+        async def main():
+            flight = SingleFlight()
+            return await asyncio.gather(
+                flight.run("key", call), flight.run("key", call), return_exceptions=True
+            )
+
+        results = asyncio.run(main())
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @staticmethod
+    def test_cancelled_waiter_does_not_cancel_shared_call():
+        """Cancelling the first caller leaves the shared call running for others."""
+        async def call():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        async def main():
+            flight = SingleFlight()
+            first = asyncio.ensure_future(flight.run("key", call))
+            second = asyncio.ensure_future(flight.run("key", call))
+            await asyncio.sleep(0)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+
+        assert asyncio.run(main()) == "done"
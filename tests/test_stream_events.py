@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Tests for parsing AnythingLLM stream-chat server-sent events."""
+
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from response_processor import parse_stream_event
+
+
+class TestStreamEvents:
+    """Test SSE line parsing."""
+
+    @staticmethod
+    def test_text_chunk():
+        """A data line decodes to the event payload."""
+        event = parse_stream_event(
+            'data: {"uuid": "1", "type": "textResponseChunk", "textResponse": "Hello", "close": false}'
+        )
+        assert event["type"] == "textResponseChunk"
+        assert event["textResponse"] == "Hello"
+        assert event["close"] is False
+
+    @staticmethod
+    def test_data_without_space():
+        """The space after the field name is optional in SSE."""
+        event = parse_stream_event('data:{"textResponse": "Hi"}')
+        assert event == {"textResponse": "Hi"}
+
+    @staticmethod
+    def test_ignored_lines():
+        """Blank lines, comments, other fields and malformed JSON are skipped."""
+        for line in ("", ": keep-alive", "event: message", "data:", "data: {not json", "data: [1, 2]"):
+            assert parse_stream_event(line) is None, f"Expected None for {line!r}"
+
+    @staticmethod
+    def test_abort_event():
+        """Abort events are returned so the caller can surface the error."""
+        event = parse_stream_event('data: {"type": "abort", "error": "Ollama unreachable", "close": true}')
+        assert event["type"] == "abort"
+        assert event["error"] == "Ollama unreachable"
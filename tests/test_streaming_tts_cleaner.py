@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Tests for the incremental TTS cleaner used with streamed responses."""
+
+import random
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+import response_processor
+from response_processor import StreamingTTSCleaner, clean_response_for_tts
+
+
+def stream_clean(text: str, chunk_sizes) -> tuple[list[str], str]:
+    """Feed text through a StreamingTTSCleaner using the given chunk sizes."""
+    cleaner = StreamingTTSCleaner()
+    outputs = []
+    pos = 0
+    sizes = iter(chunk_sizes)
+    while pos < len(text):
+        size = next(sizes)
+        outputs.append(cleaner.feed(text[pos:pos + size]))
+        pos += size
+    outputs.append(cleaner.flush())
+    return outputs, "".join(outputs)
+
+
+class TestStreamingTTSCleaner:
+    """Test chunk-safe TTS cleaning."""
+
+    SAMPLES = [
+        "<think>Analyzing...</think>The **temperature** is 72°F and humidity is 50%.",
+        "Check [this device](http://example.com)<br/>It's at 25C.",
+        "*Energy usage* is **$15** and **20%** above normal.&nbsp;<think>Should recommend</think>",
+        "<div><think>Process</think>**Result:**&nbsp;[Click here](url)&nbsp;for 72F</div>",
+        "&lt;think&gt;encoded reasoning&lt;/think&gt; Hello, a < b and c > d.",
+        "... leading punctuation then x < 5 with no closing bracket",
+        "<THINK> mixed case </Think> [unterminated link](http://example",
+        "   spaced    out \n\n text <br />  end  ",
+    ]
+
+    @staticmethod
+    def test_matches_batch_for_every_split():
+        """Every two-chunk split produces the batch output."""
+        for text in TestStreamingTTSCleaner.SAMPLES:
+            expected = clean_response_for_tts(text)
+            for split in range(len(text) + 1):
+                cleaner = StreamingTTSCleaner()
+                result = cleaner.feed(text[:split]) + cleaner.feed(text[split:]) + cleaner.flush()
+                assert result == expected, f"Split {split} of {text!r}\nGot: {result!r}\nExpected: {expected!r}"
+
+    @staticmethod
+    def test_matches_batch_for_random_chunks():
+        """Random small chunk sizes produce the batch output."""
+        rng = random.Random(42)
+        pieces = ["<think>", "</think>", "&lt;", "&amp;", "&nbsp;", "[", "](", ")", "<br>", "<", ">", " ", "word", "25C", "*", ".", "%"]
+        for _ in range(500):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 30)))
+            _, result = stream_clean(text, iter(lambda: rng.randint(1, 5), None))
+            assert result == clean_response_for_tts(text), f"Failed for {text!r}"
+
+    @staticmethod
+    def test_think_block_is_held_back():
+        """Nothing inside an open <think> block is released."""
+        cleaner = StreamingTTSCleaner()
+        assert cleaner.feed("<think>I should ") == ""
+        assert cleaner.feed("greet them ") == ""
+        assert cleaner.feed("</think>Hello ") == "Hello"
+        assert cleaner.feed("there. ") == " there."
+        assert cleaner.flush() == ""
+
+    @staticmethod
+    def test_split_link_and_entity():
+        """Links and entities split across chunks are spoken once complete."""
+        outputs, result = stream_clean(
+            "See [the docs](http://exa mple.com) &amp; enjoy ",
+            [7, 5, 10, 8, 3, 20],
+        )
+        assert "http" not in "".join(outputs)
+        assert result == "See the docs & enjoy"
+
+    @staticmethod
+    def test_text_released_before_flush():
+        """Plain sentences are released as soon as a word completes."""
+        cleaner = StreamingTTSCleaner()
+        assert cleaner.feed("The garage door is ") == "The garage door is"
+        assert cleaner.feed("open") == ""
+        assert cleaner.flush() == " open"
+        assert cleaner.text == "The garage door is open"
+
+    @staticmethod
+    def test_work_per_chunk_is_bounded():
+        """Each chunk cleans only the unreleased suffix, not the whole stream."""
+        cleaned_sizes = []
+        strip_markup = response_processor._strip_markup
+
+        def counting_strip_markup(text):
+            cleaned_sizes.append(len(text))
+            return strip_markup(text)
+
+        text = "The **kitchen** is 21°C, see [the docs](http://example.com). " * 400
+        response_processor._strip_markup = counting_strip_markup
+        try:
+            _, result = stream_clean(text, iter(lambda: 5, None))
+        finally:
+            response_processor._strip_markup = strip_markup
+        assert result == clean_response_for_tts(text)
+        # Re-cleaning the decoded prefix on every chunk would be quadratic.
+        assert max(cleaned_sizes) < 100
+        assert sum(cleaned_sizes) < 2 * len(text)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Tests for the cached workspace catalog."""
+
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from workspace_catalog import WorkspaceCatalog
+
+
+def make_catalog(clock):
+    return WorkspaceCatalog(ttl=300, retry=60, missing_ttl=600, clock=clock)
+
+
+class TestWorkspaceCatalog:
+    """Test refresh scheduling, validation and the negative cache."""
+
+    @staticmethod
+    def test_refresh_schedule(clock):
+        """The list goes stale after the TTL; 304s and failures reschedule."""
+        catalog = make_catalog(clock)
+        assert catalog.stale
+        catalog.update(["finance", "office"], etag='"v1"')
+        assert not catalog.stale and catalog.etag == '"v1"'
+        clock.now += 300
+        assert catalog.stale
+        catalog.touch()
+        assert not catalog.stale
+        clock.now += 300
+        catalog.refresh_failed()
+        assert catalog.slugs == {"finance", "office"}
+        clock.now += 59
+        assert not catalog.stale
+        clock.now += 1
+        assert catalog.stale
+        stats = catalog.stats
+        assert (stats["refreshes"], stats["not_modified"], stats["refresh_failures"]) == (1, 1, 1)
+
+    @staticmethod
+    def test_validate_before_first_refresh(clock):
+        """Without a list nothing can be rejected."""
+        catalog = make_catalog(clock)
+        assert catalog.validate("anything") == (None, None)
+
+    @staticmethod
+    def test_validate_suggests_closest_slug(clock):
+        """Unknown slugs are rejected with the closest listed slug, if any."""
+        catalog = make_catalog(clock)
+        catalog.update(["finance", "office", "research"])
+        assert catalog.validate("finance") == (True, None)
+        assert catalog.validate("finanse") == (False, "finance")
+        assert catalog.validate("zzz") == (False, None)
+        assert catalog.stats["rejected_switches"] == 2
+
+    @staticmethod
+    def test_missing_slugs_expire(clock):
+        """A 404'd slug is rejected until it expires."""
+        catalog = make_catalog(clock)
+        catalog.update(["finance", "office"])
+        catalog.mark_missing("office")
+        assert catalog.is_missing("office")
+        assert catalog.validate("office")[0] is False
+        assert catalog.slugs == {"finance"}
+        clock.now += 600
+        assert not catalog.is_missing("office")
+        assert catalog.stats["missing"] == []
+
+    @staticmethod
+    def test_missing_without_list(clock):
+        """The negative cache works before the list was ever loaded."""
+        catalog = make_catalog(clock)
+        catalog.mark_missing("finance")
+        assert catalog.validate("finance") == (False, None)
+
+    @staticmethod
+    def test_refresh_clears_missing(clock):
+        """A refreshed list that contains a missing slug un-marks it."""
+        catalog = make_catalog(clock)
+        catalog.mark_missing("finance")
+        catalog.update(["finance"])
+        assert not catalog.is_missing("finance")
+        assert catalog.validate("finance") == (True, None)
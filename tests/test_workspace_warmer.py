@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Tests for workspace warm-up deduplication and rate limiting."""
+
+import sys
+sys.path.insert(0, 'custom_components/anything_llm_conversation')
+
+from workspace_warmer import (
+    WARMUP_IN_FLIGHT,
+    WARMUP_RATE_LIMITED,
+    WARMUP_STARTED,
+    WorkspaceWarmer,
+)
+
+
+class TestWorkspaceWarmer:
+    """Test per-workspace warm-up bookkeeping."""
+
+    @staticmethod
+    def test_in_flight_warmups_are_deduplicated(clock):
+        """A second warm-up for the same workspace waits for the first."""
+        warmer = WorkspaceWarmer(interval=300, clock=clock)
+        assert warmer.begin("finance") == WARMUP_STARTED
+        assert warmer.begin("finance") == WARMUP_IN_FLIGHT
+        assert warmer.begin("office") == WARMUP_STARTED
+        assert warmer.stats["in_flight"] == ["finance", "office"]
+        assert warmer.stats["deduplicated"] == 1
+
+    @staticmethod
+    def test_rate_limited_per_workspace(clock):
+        """A workspace is warmed at most once per interval, whatever the outcome."""
+        warmer = WorkspaceWarmer(interval=300, clock=clock)
+        warmer.begin("finance")
+        clock.now += 2
+        warmer.finish("finance", "HTTP 500")
+        clock.now += 297
+        assert warmer.begin("finance") == WARMUP_RATE_LIMITED
+        clock.now += 1
+        assert warmer.begin("finance") == WARMUP_STARTED
+        assert warmer.stats["rate_limited"] == 1
+
+    @staticmethod
+    def test_outcomes_and_timings(clock):
+        """Successes, failures and durations are recorded per workspace."""
+        warmer = WorkspaceWarmer(clock=clock)
+        warmer.begin("finance")
+        warmer.begin("office")
+        clock.now += 0.5
+        warmer.finish("finance")
+        clock.now += 1.0
+        warmer.finish("office", "HTTP 404")
+        stats = warmer.stats
+        assert (stats["started"], stats["succeeded"], stats["failed"]) == (2, 1, 1)
+        assert stats["mean_ms"] == 1000.0
+        assert stats["workspaces"]["finance"] == {"ms": 500.0, "error": None, "age_s": 2}
+        assert stats["workspaces"]["office"]["error"] == "HTTP 404"
+        assert stats["in_flight"] == []
+
+    @staticmethod
+    def test_finish_without_begin_is_ignored(clock):
+        """Finishing twice (or never starting) records nothing."""
+        warmer = WorkspaceWarmer(clock=clock)
+        warmer.finish("finance", "cancelled")
+        assert warmer.stats["failed"] == 0
+        assert warmer.stats["mean_ms"] is None